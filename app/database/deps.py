@@ -1,9 +1,9 @@
-
-from app.database.db import SessionLocal
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
+
+from app.database.db import SessionLocal
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
         db.close()
\ No newline at end of file
@@ -1,1394 +1,1932 @@
-import pandas as pd
-from fastapi import FastAPI,UploadFile,File,HTTPException,Depends,Query,Form
-from sqlalchemy.orm import Session
-from app.routes import auth
-from sqlalchemy import func
-
-
-
-from app.database.deps import get_db  # Dependency to get database session which helps to interact with the database
-from app.routes import templates # Import templates router
-
-# LLM Services
-from app.services.ai import generate_agriculture_financial_explanation
-from app.services.ai import generate_manufacturing_financial_explanation
-from app.services.ai import generate_retail_financial_explanation
-from app.services.ai import generate_logistics_financial_explanation
-from app.services.ai import generate_ecommerce_financial_explanation
-
-# Agricultural Endpoints
-
-from app.services.analysis import analyze_agricultural_financials as analyze_agri_df
-from app.services.scoring import agricultural_health_score
-from app.services.credit import agriculture_credit_risk
-from app.services.persistence import save_agriculture_financial_analysis
-
-from app.models.agriculture import AgricultureFinancialAnalysis
-
-
-# Manufacturing Endpoints
-
-from app.services.analysis import analyze_manufacturing_financials as analyze_manufacturing_df
-from app.services.scoring import manufacturing_health_score
-from app.services.credit import manufacturing_credit_risk
-from app.services.persistence import save_manufacturing_financial_analysis
-
-from app.models.manufacture import ManufacturingFinancialAnalysis
-
-
-# Retail Endpoints
-
-from app.services.analysis import analyze_retail_financials as analyze_retail_df
-from app.services.scoring import retail_health_score
-from app.services.credit import retail_credit_risk
-from app.services.persistence import save_retail_financial_analysis
-
-from app.models.retail import RetailFinancialAnalysis
-
-
-# Logestic Endpoints
-from app.services.analysis import analyze_logistics_financials as analyze_logistics_df
-from app.services.scoring import logistics_health_score
-from app.services.credit import logistics_credit_risk
-from app.services.persistence import save_logistics_financial_analysis
-
-from app.models.logistics import LogisticsFinancialAnalysis
-
-
-# Ecommerce Endpoints
-from app.services.analysis import analyze_ecommerce_financials as analyze_ecommerce_df
-from app.services.scoring import ecommerce_health_score
-from app.services.credit import ecommerce_credit_risk
-from app.services.persistence import save_ecommerce_financial_analysis
-
-from app.models.ecommerce import EcommerceFinancialAnalysis
-
-
-# Products Endpoints
-from app.services.products import recommend_financial_products
-
-from fastapi.middleware.cors import CORSMiddleware
-
-ALLOWED_EXTENSIONS = (".csv", ".xlsx")
-
-app = FastAPI(title="SME Financial App", description="SME Financial App", version="1.0.0")
-app.include_router(auth.router)
-app.include_router(templates.router)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-@app.get("/")
-def home():
-    return {"message": "Welcome to the SME Financial App"}
-
-
-
-
-# Agricultural Endpoints
-
-from app.auth.deps import get_current_user
-from app.models.user import User
-
-
-@app.post("/analyze/agricultural")
-def analyze_agricultural_financials(file: UploadFile = File(...),db: Session = Depends(get_db),language: str = Form("en"),current_user: User = Depends(get_current_user)):
-    
-    if not file.filename.lower().endswith(ALLOWED_EXTENSIONS):
-        raise HTTPException(status_code=400,detail="Invalid file type. Please upload a CSV or XLSX file.")
-    
-    filename = file.filename.lower()
-
-    if filename.endswith(".csv"):
-        df = pd.read_csv(file.file)
-    elif filename.endswith(".xlsx"):
-        df = pd.read_excel(file.file)
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file format")
-
-
-    required_columns = {
-        "month", "season", "primary_crop_type","year",
-        "total_revenue", "quantity_sold", "avg_selling_price",
-        "total_expenses", "input_cost_percentage",
-        "harvested_inventory_quantity", "inventory_loss_percentage",
-        "storage_type",
-        "loan_outstanding_amount", "emi_amount", "loan_type"
-    }
-
-    if not required_columns.issubset(df.columns):
-        missing = required_columns - set(df.columns)
-        raise HTTPException(status_code=400,detail=f"Missing columns: {missing}")
-
-    metrics = analyze_agri_df(df)
-    year = int(df["year"].iloc[0]) # get the year from the first row
-
-    
-    
-    health_score,health_status = agricultural_health_score(metrics)
-
-    credit_risk = agriculture_credit_risk(health_score)
-
-    products = recommend_financial_products(
-        industry="Agriculture",
-        credit_risk=credit_risk,
-        health_score=health_score
-    )
-    products_for_prompt = "\n".join(f"- {p}" for p in products)
-
-    # AI Explanation
-    ai_explanation = None
-    try:
-        ai_explanation = generate_agriculture_financial_explanation(
-            metrics,
-            health_score,
-            health_status,
-            credit_risk,
-            products_for_prompt,
-            language
-        )
-    except Exception as e:
-        print("❌ AI ERROR:", str(e))
-        ai_explanation = None
-    
-    # Save the result to agriculture_financial_analysis_results table
-    saved_record = save_agriculture_financial_analysis(
-        db=db,
-        metrics=metrics,
-        year=year,
-        health_score=health_score,
-        health_status=health_status,
-        credit_risk=credit_risk,
-        user_id=current_user.id,
-        ai_explanation=ai_explanation
-        
-
-    )
-
-    return {
-        "status": "success",
-        "record_id": saved_record.id,
-        "industry": "Agriculture",
-        "year": year,
-        "season": metrics['season'],
-        "crop": metrics['primary_crop_type'],
-
-        **metrics,
-
-        "health_score": health_score,
-        "health_status": health_status,
-        "credit_risk": credit_risk,
-        "products": products_for_prompt,
-        "ai_explanation": ai_explanation,
-        "created_at": saved_record.created_at
-    }
-
-# Agriculture GET Endpoints
-
-# 1) For all data
-
-@app.get("/agriculture/analyses")
-def get_agriculture_analyses(
-    year: int | None = Query(None),
-    limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    query = db.query(AgricultureFinancialAnalysis).filter(AgricultureFinancialAnalysis.user_id == current_user.id)
-
-    if year:
-        query = query.filter(AgricultureFinancialAnalysis.year == year)
-
-    records = (
-        query
-        .order_by(AgricultureFinancialAnalysis.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
-
-    return {
-        "count": len(records),
-        "results": [
-            {
-                "id": r.id,
-                "year": r.year,
-                "season": r.season,
-                "crop": r.primary_crop_type,
-                "profit": r.profit,
-                "profit_margin": r.profit_margin,
-                "health_score": r.health_score,
-                "health_status": r.health_status,
-                "created_at": r.created_at
-            }
-            for r in records
-        ]
-    }
-
-
-# 2) GET agriculture analysis by ID
-
-@app.get("/agriculture/analyses/{analysis_id}")
-def get_agriculture_analysis_by_id(
-    analysis_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    record = db.query(AgricultureFinancialAnalysis).filter(
-        AgricultureFinancialAnalysis.id == analysis_id,
-        AgricultureFinancialAnalysis.user_id == current_user.id
-    ).first()
-
-    if not record:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-
-    return {
-        "id": record.id,
-        "year": record.year,
-        "industry": "Agriculture",
-        "season": record.season,
-        "crop": record.primary_crop_type,
-
-        "financials": {
-            "total_revenue": record.total_revenue,
-            "total_expenses": record.total_expenses,
-            "profit": record.profit,
-            "effective_profit": record.effective_profit,
-            "profit_margin": record.profit_margin
-        },
-
-        "risks": {
-            "inventory_loss_percentage": record.inventory_loss_percentage,
-            "inventory_loss_value": record.inventory_loss_value,
-            "storage_risk_score": record.storage_risk_score,
-            "cost_pressure_ratio": record.cost_pressure_ratio,
-            "debt_service_ratio": record.debt_service_ratio
-        },
-
-        "health": {
-            "health_score": record.health_score,
-            "health_status": record.health_status,
-            "credit_risk": record.credit_risk
-        },
-
-        "ai_explanation": record.ai_explanation,
-        "created_at": record.created_at
-    }
-
-# 3) GET agriculture dashboard summary (KPIs)
-
-from sqlalchemy import func
-
-@app.get("/agriculture/dashboard")
-def agriculture_dashboard(
-    year: int | None = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    query = db.query(AgricultureFinancialAnalysis).filter(AgricultureFinancialAnalysis.user_id == current_user.id)
-
-    if year:
-        query = query.filter(AgricultureFinancialAnalysis.year == year)
-
-    total_records = query.count()
-
-    totals = query.with_entities(
-        func.sum(AgricultureFinancialAnalysis.total_revenue),
-        func.sum(AgricultureFinancialAnalysis.profit),
-        func.avg(AgricultureFinancialAnalysis.health_score)
-    ).first()
-
-    return {
-        "year": year,
-        "total_farms_analyzed": total_records,
-        "total_revenue": totals[0] or 0,
-        "total_profit": totals[1] or 0,
-        "average_health_score": round(totals[2], 2) if totals[2] else 0
-    }
-
-
-# 4) GET agriculture AI explanation only
-
-@app.get("/agriculture/analyses/{analysis_id}/ai")
-def get_agriculture_ai_explanation(
-    analysis_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    record = db.query(AgricultureFinancialAnalysis).filter(
-        AgricultureFinancialAnalysis.id == analysis_id,
-        AgricultureFinancialAnalysis.user_id == current_user.id
-    ).first()
-
-    if not record:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-
-    return {
-        "id": record.id,
-        "ai_explanation": record.ai_explanation
-    }
-
-
-
-
-
-
-
-
-
-
-
-# Manufacturing Endpoints
-
-@app.post("/analyze/manufacturing")
-def analyze_manufacturing_financials(file: UploadFile = File(...),db: Session = Depends(get_db),language: str = Form("en"),current_user: User = Depends(get_current_user)):
-
-    if not file.filename.lower().endswith(ALLOWED_EXTENSIONS):
-        return HTTPException(status_code=400,detail="Invalid file type. Please upload a CSV or XLSX file.")
-    
-    filename = file.filename.lower()
-
-    if filename.endswith(".csv"):
-        df = pd.read_csv(file.file)
-    elif filename.endswith(".xlsx"):
-        df = pd.read_excel(file.file)
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file format")
-
-    
-    BASE_REQUIRED_COLUMNS = {
-    "month", "product_type","year",
-    "production_capacity", "actual_production",
-    "total_revenue", "units_sold", "avg_selling_price", "sales_channel",
-    "raw_material_cost", "direct_labor_cost",
-    "raw_material_inventory_value",
-    "wip_inventory_value",
-    "finished_goods_inventory_value",
-    "loan_outstanding_amount", "emi_amount", "loan_type"
-    }
-
-    OVERHEAD_DIRECT = {"overhead_cost"}
-    OVERHEAD_SPLIT = {"power_cost", "rent_cost", "maintenance_cost"}
-
-    missing_base = BASE_REQUIRED_COLUMNS - set(df.columns)
-    if missing_base:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Missing required columns: {missing_base}"
-        )
-
-    # Overhead validation
-    if not (
-        OVERHEAD_DIRECT.issubset(df.columns)
-        or OVERHEAD_SPLIT.issubset(df.columns)
-    ):
-        raise HTTPException(
-            status_code=400,
-            detail=(
-                "Missing overhead cost columns. "
-                "Provide either 'overhead_cost' "
-                "or all of 'power_cost', 'rent_cost', 'maintenance_cost'."
-            )
-        )
-
-    metrics = analyze_manufacturing_df(df)
-    year = int(df["year"].iloc[0])
-
-    health_score, health_status = manufacturing_health_score(metrics)
-    credit_risk = manufacturing_credit_risk(health_score)
-
-    products = recommend_financial_products(
-        industry="Manufacturing",
-        credit_risk=credit_risk,
-        health_score=health_score
-    )
-
-    products_for_prompt = "\n".join(f"- {p}" for p in products)
-
-    # AI Explanation
-    ai_explanation = None
-    try:
-        ai_explanation = generate_manufacturing_financial_explanation(
-            metrics,
-            health_score,
-            health_status,
-            credit_risk,
-            products_for_prompt,
-            language
-        )
-    except Exception:
-        ai_explanation = None
-
-    # Save the manufacturing financial analysis results to the database
-    saved_record = save_manufacturing_financial_analysis(
-        db=db,
-        metrics=metrics,
-        year=year,
-        health_score=health_score,
-        health_status=health_status,
-        credit_risk=credit_risk,
-        user_id=current_user.id,
-        ai_explanation=ai_explanation
-        
-    )
-
-    return {
-        "status": "success",
-        "record_id": saved_record.id,
-        "industry": "Manufacturing",
-
-        **metrics,
-
-        "health_score": health_score,
-        "health_status": health_status,
-        "credit_risk": credit_risk,
-        "products": products,
-        "ai_explanation": ai_explanation,
-        "created_at": saved_record.created_at
-    }
-
-
-# Manufacture GET Endpoints
-
-@app.get("/manufacturing/analyses")
-def get_manufacturing_analyses(
-    year: int | None = Query(None),
-    limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    query = db.query(ManufacturingFinancialAnalysis).filter(ManufacturingFinancialAnalysis.user_id == current_user.id)
-
-    if year:
-        query = query.filter(ManufacturingFinancialAnalysis.year == year)
-
-    records = (
-        query
-        .order_by(ManufacturingFinancialAnalysis.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
-
-    return {
-        "count": len(records),
-        "results": [
-            {
-                "id": r.id,
-                "year": r.year,
-                "industry": r.industry,
-                "profit": r.profit,
-                "profit_margin": r.profit_margin,
-                "health_score": r.health_score,
-                "health_status": r.health_status,
-                "created_at": r.created_at
-            }
-            for r in records
-        ]
-    }
-
-
-# 2) GET manufacturing analysis by ID
-
-@app.get("/manufacturing/analyses/{analysis_id}")
-def get_manufacturing_analysis_by_id(
-    analysis_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    record = db.query(ManufacturingFinancialAnalysis).filter(
-        ManufacturingFinancialAnalysis.id == analysis_id,
-        ManufacturingFinancialAnalysis.user_id == current_user.id
-    ).first()
-
-    if not record:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-
-    return {
-        "id": record.id,
-        "industry": record.industry,
-        "year": record.year,
-
-        "financials": {
-            "total_revenue": record.total_revenue,
-            "total_expenses": record.total_expenses,
-            "profit": record.profit,
-            "profit_margin": record.profit_margin
-        },
-
-        "operations": {
-            "capacity_utilization": record.capacity_utilization,
-            "inventory_blockage_ratio": record.inventory_blockage_ratio,
-            "cost_efficiency_ratio": record.cost_efficiency_ratio,
-            "debt_service_ratio": record.debt_service_ratio
-        },
-
-        "health": {
-            "health_score": record.health_score,
-            "health_status": record.health_status,
-            "credit_risk": record.credit_risk
-        },
-
-        "ai_explanation": record.ai_explanation,
-        "created_at": record.created_at
-    }
-
-# 3 GET manufacturing dashboard KPIs
-
-from sqlalchemy import func
-
-@app.get("/manufacturing/dashboard")
-def manufacturing_dashboard(
-    year: int | None = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    query = db.query(ManufacturingFinancialAnalysis).filter(ManufacturingFinancialAnalysis.user_id == current_user.id)
-
-    if year:
-        query = query.filter(ManufacturingFinancialAnalysis.year == year)
-
-    total_records = query.count()
-
-    totals = query.with_entities(
-        func.sum(ManufacturingFinancialAnalysis.total_revenue),
-        func.sum(ManufacturingFinancialAnalysis.profit),
-        func.avg(ManufacturingFinancialAnalysis.health_score)
-    ).first()
-
-    return {
-        "year": year,
-        "total_factories_analyzed": total_records,
-        "total_revenue": totals[0] or 0,
-        "total_profit": totals[1] or 0,
-        "average_health_score": round(totals[2], 2) if totals[2] else 0
-    }
-
-# 4) GET manufacturing AI explanation
-
-@app.get("/manufacturing/analyses/{analysis_id}/ai")
-def get_manufacturing_ai_explanation(
-    analysis_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    record = db.query(ManufacturingFinancialAnalysis).filter(
-        ManufacturingFinancialAnalysis.id == analysis_id,
-        ManufacturingFinancialAnalysis.user_id == current_user.id
-    ).first()
-
-    if not record:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-
-    return {
-        "id": record.id,
-        "ai_explanation": record.ai_explanation
-    }
-
-
-
-
-
-
-
-
-
-
-# Retail Endpoints
-@app.post("/analyze/retail")
-def analyze_retail_financials(file: UploadFile = File(...),db: Session = Depends(get_db),language: str = Form("en"),current_user: User = Depends(get_current_user)):
-
-    if not file.filename.lower().endswith(".csv"):
-        raise HTTPException(status_code=400, detail="Upload a CSV file")
-
-    filename = file.filename.lower()
-
-    if filename.endswith(".csv"):
-        df = pd.read_csv(file.file)
-    elif filename.endswith(".xlsx"):
-        df = pd.read_excel(file.file)
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file format")
-
-    required_columns = {
-        "month", "store_type", "product_category","year",
-        "total_revenue", "quantity_sold", "avg_selling_price",
-        "discount_percentage", "sales_channel",
-        "cost_of_goods_sold", "store_operating_cost",
-        "logistics_cost", "loss_cost",
-        "inventory_value",
-        "slow_moving_inventory_percentage",
-        "expired_inventory_percentage",
-        "stock_age_days_avg",
-        "loan_outstanding_amount", "emi_amount", "loan_type"
-    }
-
-    if not required_columns.issubset(df.columns):
-        raise HTTPException(
-            status_code=400,
-            detail=f"Missing required columns: {required_columns - set(df.columns)}"
-        )
-
-    metrics = analyze_retail_df(df)
-    year = int(df["year"].iloc[0])
-
-    health_score, health_status = retail_health_score(metrics)
-    credit_risk = retail_credit_risk(health_score)
-
-    products = recommend_financial_products(
-        industry="Retail",
-        credit_risk=credit_risk,
-        health_score=health_score
-    )
-
-    products_for_prompt = "\n".join(f"- {p}" for p in products)
-
-    # AI Explanation
-    ai_explanation = None
-    try:
-        ai_explanation = generate_retail_financial_explanation(
-            metrics,
-            health_score,
-            health_status,
-            credit_risk,
-            products_for_prompt,
-            language
-        )
-    except Exception:
-        ai_explanation = None
-    
-    # Save the retail financial analysis results to the database
-    saved_record = save_retail_financial_analysis(
-        db=db,
-        metrics=metrics,
-        year=year,
-        health_score=health_score,
-        health_status=health_status,
-        credit_risk=credit_risk,
-        user_id=current_user.id,
-        ai_explanation=ai_explanation
-        
-    )
-
-    return {
-        "status": "success",
-        "record_id": saved_record.id,
-        "industry": "Retail",
-        **metrics,
-        "health_score": health_score,
-        "health_status": health_status,
-        "credit_risk": credit_risk,
-        "products": products,
-        "ai_explanation": ai_explanation,
-        "created_at": saved_record.created_at
-    }
-
-
-# Retail GET Endpoints
-
-@app.get("/retail/analyses")
-def get_retail_analyses(
-    year: int | None = Query(None),
-    limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    query = db.query(RetailFinancialAnalysis).filter(RetailFinancialAnalysis.user_id == current_user.id)
-
-    if year:
-        query = query.filter(RetailFinancialAnalysis.year == year)
-
-    records = (
-        query
-        .order_by(RetailFinancialAnalysis.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
-
-    return {
-        "count": len(records),
-        "results": [
-            {
-                "id": r.id,
-                "year": r.year,
-                "industry": r.industry,
-                "profit": r.profit,
-                "profit_margin": r.profit_margin,
-                "health_score": r.health_score,
-                "health_status": r.health_status,
-                "created_at": r.created_at
-            }
-            for r in records
-        ]
-    }
-
-
-# 2) GET retail analysis by ID
-
-@app.get("/retail/analyses/{analysis_id}")
-def get_retail_analysis_by_id(
-    analysis_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    record = db.query(RetailFinancialAnalysis).filter(
-        RetailFinancialAnalysis.id == analysis_id,
-        RetailFinancialAnalysis.user_id == current_user.id
-    ).first()
-
-    if not record:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-
-    return {
-        "id": record.id,
-        "industry": record.industry,
-        "year": record.year,
-
-        "financials": {
-            "total_revenue": record.total_revenue,
-            "total_expenses": record.total_expenses,
-            "profit": record.profit,
-            "profit_margin": record.profit_margin
-        },
-
-        "retail_metrics": {
-            "inventory_blockage_ratio": record.inventory_blockage_ratio,
-            "inventory_risk_score": record.inventory_risk_score,
-            "discount_impact_ratio": record.discount_impact_ratio,
-            "loss_cost_ratio": record.loss_cost_ratio,
-            "debt_service_ratio": record.debt_service_ratio
-        },
-
-        "health": {
-            "health_score": record.health_score,
-            "health_status": record.health_status,
-            "credit_risk": record.credit_risk
-        },
-
-        "ai_explanation": record.ai_explanation,
-        "created_at": record.created_at
-    }
-
-
-
-# 3) GET retail dashboard KPIs
-
-from sqlalchemy import func
-
-@app.get("/retail/dashboard")
-def retail_dashboard(
-    year: int | None = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    query = db.query(RetailFinancialAnalysis).filter(RetailFinancialAnalysis.user_id == current_user.id)
-
-    if year:
-        query = query.filter(RetailFinancialAnalysis.year == year)
-
-    total_records = query.count()
-
-    totals = query.with_entities(
-        func.sum(RetailFinancialAnalysis.total_revenue),
-        func.sum(RetailFinancialAnalysis.profit),
-        func.avg(RetailFinancialAnalysis.health_score)
-    ).first()
-
-    return {
-        "year": year,
-        "total_stores_analyzed": total_records,
-        "total_revenue": totals[0] or 0,
-        "total_profit": totals[1] or 0,
-        "average_health_score": round(totals[2], 2) if totals[2] else 0
-    }
-
-# 4) GET retail AI Explaination
-
-@app.get("/retail/analyses/{analysis_id}/ai")
-def get_retail_ai_explanation(
-    analysis_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    record = db.query(RetailFinancialAnalysis).filter(
-        RetailFinancialAnalysis.id == analysis_id,
-        RetailFinancialAnalysis.user_id == current_user.id
-    ).first()
-
-    if not record:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-
-    return {
-        "id": record.id,
-        "ai_explanation": record.ai_explanation
-    }
-
-
-
-
-
-
-#  Logestic Endpoints
-
-@app.post("/analyze/logistics")
-def analyze_logistics_financials(file: UploadFile = File(...),db: Session = Depends(get_db),language: str = Form("en"),current_user: User = Depends(get_current_user)):
-
-    if not file.filename.lower().endswith(".csv"):
-        raise HTTPException(status_code=400, detail="Upload a CSV file")
-
-    filename = file.filename.lower()
-
-    if filename.endswith(".csv"):
-        df = pd.read_csv(file.file)
-    elif filename.endswith(".xlsx"):
-        df = pd.read_excel(file.file)
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file format")
-
-    required_columns = {
-        "month", "service_type", "delivery_type","year",
-        "total_revenue", "distance_km", "weight_volume", "rate_per_unit", "fuel_surcharge",
-        "fuel_cost", "driver_wages", "vehicle_cost", "warehouse_cost", "other_operating_cost",
-        "total_shipments", "on_time_delivery_percentage",
-        "avg_goods_in_transit_value", "avg_storage_days",
-        "loan_outstanding_amount", "emi_amount", "loan_type"
-    }
-
-    if not required_columns.issubset(df.columns):
-        raise HTTPException(
-            status_code=400,
-            detail=f"Missing required columns: {required_columns - set(df.columns)}"
-        )
-
-    metrics = analyze_logistics_df(df)
-    year = int(df["year"].iloc[0])
-
-    health_score, health_status = logistics_health_score(metrics)
-    credit_risk = logistics_credit_risk(health_score)
-
-    products = recommend_financial_products(
-        industry="Logistics",
-        credit_risk=credit_risk,
-        health_score=health_score
-    )
-
-    products_for_prompt = "\n".join(f"- {p}" for p in products)
-
-    # AI Explanation
-    ai_explanation = None
-    try:
-        ai_explanation = generate_logistics_financial_explanation(
-            metrics,
-            health_score,
-            health_status,
-            credit_risk,
-            products_for_prompt,
-            language
-        )
-    except Exception:
-        ai_explanation = None
-
-    # Save the logistic financial analysis results to the database
-    saved_record = save_logistics_financial_analysis(
-        db=db,
-        metrics=metrics,
-        year=year,
-        health_score=health_score,
-        health_status=health_status,
-        credit_risk=credit_risk,
-        user_id=current_user.id,
-        ai_explanation=ai_explanation
-    )
-
-    return {
-        "status": "success",
-        "record_id": saved_record.id,
-        "industry": "Logistics",
-        **metrics,
-        "health_score": health_score,
-        "health_status": health_status,
-        "credit_risk": credit_risk,
-        "products": products,
-        "ai_explanation": ai_explanation,
-        "created_at": saved_record.created_at
-    }
-
-
-# Logestic GET Endpoints
-
-#1) GET all logistics analyses
-
-@app.get("/logistics/analyses")
-def get_logistics_analyses(
-    year: int | None = Query(None),
-    limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    query = db.query(LogisticsFinancialAnalysis).filter(LogisticsFinancialAnalysis.user_id == current_user.id)
-
-    if year:
-        query = query.filter(LogisticsFinancialAnalysis.year == year)
-
-    records = (
-        query
-        .order_by(LogisticsFinancialAnalysis.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
-
-    return {
-        "count": len(records),
-        "results": [
-            {
-                "id": r.id,
-                "year": r.year,
-                "industry": r.industry,
-                "profit": r.profit,
-                "profit_margin": r.profit_margin,
-                "health_score": r.health_score,
-                "health_status": r.health_status,
-                "created_at": r.created_at
-            }
-            for r in records
-        ]
-    }
-
-# 2) GET logistics analysis by ID
-
-@app.get("/logistics/analyses/{analysis_id}")
-def get_logistics_analysis_by_id(
-    analysis_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    record = db.query(LogisticsFinancialAnalysis).filter(
-        LogisticsFinancialAnalysis.id == analysis_id,
-        LogisticsFinancialAnalysis.user_id == current_user.id
-    ).first()
-
-    if not record:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-
-    return {
-        "id": record.id,
-        "industry": record.industry,
-        "year": record.year,
-
-        "financials": {
-            "total_revenue": record.total_revenue,
-            "total_expenses": record.total_expenses,
-            "profit": record.profit,
-            "profit_margin": record.profit_margin
-        },
-
-        "logistics_metrics": {
-            "cost_per_km": record.cost_per_km,
-            "revenue_per_shipment": record.revenue_per_shipment,
-            "fuel_cost_ratio": record.fuel_cost_ratio,
-            "asset_blockage_ratio": record.asset_blockage_ratio,
-            "on_time_delivery_percentage": record.on_time_delivery_percentage,
-            "debt_service_ratio": record.debt_service_ratio
-        },
-
-        "health": {
-            "health_score": record.health_score,
-            "health_status": record.health_status,
-            "credit_risk": record.credit_risk
-        },
-
-        "ai_explanation": record.ai_explanation,
-        "created_at": record.created_at
-    }
-
-
-# 3) GET logistics dashboard KPIs
-
-from sqlalchemy import func
-
-@app.get("/logistics/dashboard")
-def logistics_dashboard(
-    year: int | None = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    query = db.query(LogisticsFinancialAnalysis).filter(LogisticsFinancialAnalysis.user_id == current_user.id)
-
-    if year:
-        query = query.filter(LogisticsFinancialAnalysis.year == year)
-
-    total_records = query.count()
-
-    totals = query.with_entities(
-        func.sum(LogisticsFinancialAnalysis.total_revenue),
-        func.sum(LogisticsFinancialAnalysis.profit),
-        func.avg(LogisticsFinancialAnalysis.health_score),
-        func.avg(LogisticsFinancialAnalysis.on_time_delivery_percentage)
-    ).first()
-
-    return {
-        "year": year,
-        "total_logistics_companies": total_records,
-        "total_revenue": totals[0] or 0,
-        "total_profit": totals[1] or 0,
-        "average_health_score": round(totals[2], 2) if totals[2] else 0,
-        "average_on_time_delivery": round(totals[3], 2) if totals[3] else 0
-    }
-
-# 4) GET logistics AI
-
-@app.get("/logistics/analyses/{analysis_id}/ai")
-def get_logistics_ai_explanation(
-    analysis_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    record = db.query(LogisticsFinancialAnalysis).filter(
-        LogisticsFinancialAnalysis.id == analysis_id,
-        LogisticsFinancialAnalysis.user_id == current_user.id
-    ).first()
-
-    if not record:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-
-    return {
-        "id": record.id,
-        "ai_explanation": record.ai_explanation
-    }
-
-
-
-    
-#  Ecommerce Endpoints
-
-@app.post("/analyze/ecommerce")
-def analyze_ecommerce_financials(file: UploadFile = File(...),db: Session = Depends(get_db),language: str = Form("en"),current_user: User = Depends(get_current_user)):
-
-    if not file.filename.lower().endswith(".csv"):
-        raise HTTPException(status_code=400, detail="Upload a CSV file")
-
-    filename = file.filename.lower()
-
-    if filename.endswith(".csv"):
-        df = pd.read_csv(file.file)
-    elif filename.endswith(".xlsx"):
-        df = pd.read_excel(file.file)
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file format")
-
-    required_columns = {
-        "month", "seller_type", "product_category", "sales_region","year",
-        "total_revenue", "orders_count", "avg_order_value",
-        "discount_percentage", "platform_fee_percentage",
-        "cost_of_goods_sold", "fulfillment_cost", "shipping_cost",
-        "payment_gateway_cost", "marketing_cost", "returns_cost",
-        "inventory_value", "stock_age_days_avg", "return_rate_percentage",
-        "loan_outstanding_amount", "emi_amount", "loan_type"
-    }
-
-    if not required_columns.issubset(df.columns):
-        raise HTTPException(
-            status_code=400,
-            detail=f"Missing required columns: {required_columns - set(df.columns)}"
-        )
-
-    metrics = analyze_ecommerce_df(df)
-    year = int(df["year"].iloc[0])
-
-    health_score, health_status = ecommerce_health_score(metrics)
-    credit_risk = ecommerce_credit_risk(health_score)
-
-    products = recommend_financial_products(
-        industry="Ecommerce",
-        credit_risk=credit_risk,
-        health_score=health_score
-    )
-
-    products_for_prompt = "\n".join(f"- {p}" for p in products)
-
-    # AI Explanation
-    ai_explanation = None
-    try:
-        ai_explanation = generate_ecommerce_financial_explanation(
-            metrics,
-            health_score,
-            health_status,
-            credit_risk,
-            products_for_prompt,
-            language
-        )
-    except Exception:
-        ai_explanation = None
-
-    # Save the ecommerce financial analysis results to the database
-    saved_record = save_ecommerce_financial_analysis(
-        db=db,
-        metrics=metrics,
-        year=year,
-        health_score=health_score,
-        health_status=health_status,
-        credit_risk=credit_risk,
-        user_id=current_user.id,
-        ai_explanation=ai_explanation
-    )
-
-    return {
-        "status": "success",
-        "record_id": saved_record.id,
-        "industry": "Ecommerce",
-        **metrics,
-        "health_score": health_score,
-        "health_status": health_status,
-        "credit_risk": credit_risk,
-        "products": products,
-        "ai_explanation": ai_explanation,
-        "created_at": saved_record.created_at
-    }
-
-
-# GET Ecommerce Endpoints
-
-# 1) GET all e-commerce analyse
-
-@app.get("/ecommerce/analyses")
-def get_ecommerce_analyses(
-    year: int | None = Query(None),
-    limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    query = db.query(EcommerceFinancialAnalysis).filter(EcommerceFinancialAnalysis.user_id == current_user.id)
-
-    if year:
-        query = query.filter(EcommerceFinancialAnalysis.year == year)
-
-    records = (
-        query
-        .order_by(EcommerceFinancialAnalysis.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
-
-    return {
-        "count": len(records),
-        "results": [
-            {
-                "id": r.id,
-                "year": r.year,
-                "industry": r.industry,
-                "profit": r.profit,
-                "profit_margin": r.profit_margin,
-                "health_score": r.health_score,
-                "health_status": r.health_status,
-                "created_at": r.created_at
-            }
-            for r in records
-        ]
-    }
-
-
-# 2) GET e-commerce analysis by ID
-
-@app.get("/ecommerce/analyses/{analysis_id}")
-def get_ecommerce_analysis_by_id(
-    analysis_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    record = db.query(EcommerceFinancialAnalysis).filter(
-        EcommerceFinancialAnalysis.id == analysis_id,
-        EcommerceFinancialAnalysis.user_id == current_user.id
-    ).first()
-
-    if not record:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-
-    return {
-        "id": record.id,
-        "industry": record.industry,
-        "year": record.year,
-
-        "financials": {
-            "total_revenue": record.total_revenue,
-            "total_expenses": record.total_expenses,
-            "profit": record.profit,
-            "profit_margin": record.profit_margin
-        },
-
-        "unit_economics": {
-            "contribution_margin": record.contribution_margin,
-            "platform_fee_ratio": record.platform_fee_ratio,
-            "inventory_blockage_ratio": record.inventory_blockage_ratio,
-            "order_profitability": record.order_profitability,
-            "return_rate_percentage": record.return_rate_percentage,
-            "debt_service_ratio": record.debt_service_ratio
-        },
-
-        "health": {
-            "health_score": record.health_score,
-            "health_status": record.health_status,
-            "credit_risk": record.credit_risk
-        },
-
-        "ai_explanation": record.ai_explanation,
-        "created_at": record.created_at
-    }
-
-
-# 3) GET e-commerce dashboard KPIs
-
-from sqlalchemy import func
-
-@app.get("/ecommerce/dashboard")
-def ecommerce_dashboard(
-    year: int | None = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    query = db.query(EcommerceFinancialAnalysis).filter(EcommerceFinancialAnalysis.user_id == current_user.id)
-
-    if year:
-        query = query.filter(EcommerceFinancialAnalysis.year == year)
-
-    total_records = query.count()
-
-    totals = query.with_entities(
-        func.sum(EcommerceFinancialAnalysis.total_revenue),
-        func.sum(EcommerceFinancialAnalysis.profit),
-        func.avg(EcommerceFinancialAnalysis.health_score),
-        func.avg(EcommerceFinancialAnalysis.return_rate_percentage)
-    ).first()
-
-    return {
-        "year": year,
-        "total_sellers": total_records,
-        "total_revenue": totals[0] or 0,
-        "total_profit": totals[1] or 0,
-        "average_health_score": round(totals[2], 2) if totals[2] else 0,
-        "average_return_rate": round(totals[3], 2) if totals[3] else 0
-    }
-
-
-# 4) GET e-commerce AI explanation
-
-@app.get("/ecommerce/analyses/{analysis_id}/ai")
-def get_ecommerce_ai_explanation(
-    analysis_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    record = db.query(EcommerceFinancialAnalysis).filter(
-        EcommerceFinancialAnalysis.id == analysis_id,
-        EcommerceFinancialAnalysis.user_id == current_user.id
-    ).first()
-
-    if not record:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-
-    return {
-        "id": record.id,
-        "ai_explanation": record.ai_explanation
-    }
-
-
-
-@app.get("/dashboard")
-def dashboard(
-    industry: str | None = Query(None),
-    year: int | None = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    models = {
-        "Agriculture": AgricultureFinancialAnalysis,
-        "Manufacturing": ManufacturingFinancialAnalysis,
-        "Retail": RetailFinancialAnalysis,
-        "Logistics": LogisticsFinancialAnalysis,
-        "Ecommerce": EcommerceFinancialAnalysis,
-    }
-
-    total_analyses = 0
-    scores = []
-
-    profit_by_year: dict[int, float] = {}
-    revenue_by_year: dict[int, float] = {}
-    expenses_by_year: dict[int, float] = {}
-    year_breakdown: dict[int, int] = {}
-    industry_breakdown = {}
-    recent = []
-
-    for name, model in models.items():
-
-        if industry and name != industry:
-            continue
-
-        q = db.query(model).filter(model.user_id == current_user.id)
-
-        if year:
-            q = q.filter(model.year == year)
-
-        records = q.all()
-        industry_breakdown[name] = len(records)
-        total_analyses += len(records)
-
-        for r in records:
-            scores.append(r.health_score)
-
-            # PROFIT
-            profit = r.total_revenue - r.total_expenses
-            profit_by_year[r.year] = profit_by_year.get(r.year, 0) + profit
-
-            # REVENUE & EXPENSES
-            revenue_by_year[r.year] = revenue_by_year.get(r.year, 0) + r.total_revenue
-            expenses_by_year[r.year] = expenses_by_year.get(r.year, 0) + r.total_expenses
-
-            # YEAR COUNT
-            year_breakdown[r.year] = year_breakdown.get(r.year, 0) + 1
-
-        recent += (
-            q.order_by(model.created_at.desc())
-            .limit(5)
-            .all()
-        )
-
-    return {
-        "filters": {
-            "industry": industry,
-            "year": year,
-        },
-        "total_analyses": total_analyses,
-        "average_health_score": round(sum(scores) / len(scores), 2) if scores else 0,
-        "best_health_score": max(scores) if scores else 0,
-        "worst_health_score": min(scores) if scores else 0,
-
-        # ✅ CHART DATA
-        "profit_by_year": profit_by_year,
-        "revenue_by_year": revenue_by_year,
-        "expenses_by_year": expenses_by_year,
-        "year_breakdown": year_breakdown,
-        "industry_breakdown": industry_breakdown,
-
-        "recent_activity": [
-            {
-                "industry": industry or "Mixed",
-                "year": r.year,
-                "health_score": r.health_score,
-                "created_at": r.created_at,
-            }
-            for r in recent
-        ],
-    }
+from fastapi import FastAPI,UploadFile,File,HTTPException,Depends,Query,Form
+from sqlalchemy.orm import Session
+from app.routes import auth
+from sqlalchemy import func
+
+
+
+from app.database.deps import get_db  # Dependency to get database session which helps to interact with the database
+from app.routes import templates # Import templates router
+
+# LLM Services
+from app.services.ai import generate_agriculture_financial_explanation
+from app.services.ai import generate_manufacturing_financial_explanation
+from app.services.ai import generate_retail_financial_explanation
+from app.services.ai import generate_logistics_financial_explanation
+from app.services.ai import generate_ecommerce_financial_explanation
+
+# Agricultural Endpoints
+
+from app.services.analysis import agricultural_metrics, AGRICULTURE_AGGREGATIONS
+from app.services.scoring import agricultural_health_score
+from app.services.credit import agriculture_credit_risk
+from app.services.persistence import save_agriculture_financial_analysis
+
+from app.models.agriculture import AgricultureFinancialAnalysis
+
+
+# Manufacturing Endpoints
+
+from app.services.analysis import manufacturing_metrics, MANUFACTURING_AGGREGATIONS
+from app.services.scoring import manufacturing_health_score
+from app.services.credit import manufacturing_credit_risk
+from app.services.persistence import save_manufacturing_financial_analysis
+
+from app.models.manufacture import ManufacturingFinancialAnalysis
+
+
+# Retail Endpoints
+
+from app.services.analysis import retail_metrics, RETAIL_AGGREGATIONS
+from app.services.scoring import retail_health_score
+from app.services.credit import retail_credit_risk
+from app.services.persistence import save_retail_financial_analysis
+
+from app.models.retail import RetailFinancialAnalysis
+
+
+# Logestic Endpoints
+from app.services.analysis import logistics_metrics, LOGISTICS_AGGREGATIONS
+from app.services.scoring import logistics_health_score
+from app.services.credit import logistics_credit_risk
+from app.services.persistence import save_logistics_financial_analysis
+
+from app.models.logistics import LogisticsFinancialAnalysis
+
+
+# Ecommerce Endpoints
+from app.services.analysis import ecommerce_metrics, ECOMMERCE_AGGREGATIONS
+from app.services.scoring import ecommerce_health_score
+from app.services.credit import ecommerce_credit_risk
+from app.services.persistence import save_ecommerce_financial_analysis
+
+from app.models.ecommerce import EcommerceFinancialAnalysis
+
+
+# Products Endpoints
+from app.services.products import recommend_financial_products
+
+# Upload reading and deduplication
+from app.services.persistence import find_duplicate_analysis
+from app.services.peers import peer_benchmarks
+from app.services.metrics import metric_groups
+from app.services.ingestion import FinancialUpload, UploadTooLarge
+from app.services.pipeline import upload_trends, upload_forecast
+from app.services.validation import UploadValidationError
+from app.services.ingestion import UPLOAD_LIMITS, UPLOAD_MAX_BATCH_BYTES, UPLOAD_SPOOL_THRESHOLD_BYTES
+from starlette.formparsers import MultiPartParser
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from app.services.templates import REQUIRED_COLUMNS, OVERHEAD_DIRECT, OVERHEAD_SPLIT
+
+from fastapi.middleware.cors import CORSMiddleware
+
+ALLOWED_EXTENSIONS = (".csv", ".csv.gz", ".csv.zst", ".xlsx", ".parquet", ".arrow", ".feather")
+
+app = FastAPI(title="SME Financial App", description="SME Financial App", version="1.0.0")
+app.include_router(auth.router)
+app.include_router(templates.router)
+
+# Uploads larger than this are written to a temp file instead of being kept in memory
+MultiPartParser.spool_max_size = UPLOAD_SPOOL_THRESHOLD_BYTES
+
+# Room for the multipart boundaries and the other form fields
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+def max_request_bytes(path: str):
+    # /analyze/{industry} and /analyze/{industry}/batch
+    parts = path.strip("/").split("/")
+    if len(parts) < 2 or parts[0] != "analyze":
+        return None
+    if len(parts) == 3 and parts[2] == "batch":
+        return UPLOAD_MAX_BATCH_BYTES + FORM_OVERHEAD_BYTES
+
+    industry = "agriculture" if parts[1] == "agricultural" else parts[1]
+    if industry not in UPLOAD_LIMITS:
+        return None
+    return UPLOAD_LIMITS[industry]["max_bytes"] + FORM_OVERHEAD_BYTES
+
+
+class UploadSizeLimit:
+    """
+    Rejects an upload over the limit of its route with 413 before the body is spooled:
+    at once from its Content-Length header, else (chunked uploads) as soon as the bytes
+    received pass the limit. FastAPI re-raises an HTTPException from reading the body.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        limit = max_request_bytes(scope["path"]) if scope["type"] == "http" and scope["method"] == "POST" else None
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        detail = f"Upload is larger than {limit} bytes"
+        length = Headers(scope=scope).get("content-length")
+        if length and length.isdigit() and int(length) > limit:
+            return await JSONResponse(status_code=413, content={"detail": detail})(scope, receive, send)
+
+        received = 0
+
+        async def receive_within_limit():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, receive_within_limit, send)
+
+
+# Registered before CORS so the 413 responses still carry the CORS headers
+app.add_middleware(UploadSizeLimit)
+
+
+@app.exception_handler(UploadTooLarge)
+def upload_too_large_handler(request: Request, exc: UploadTooLarge):
+    return JSONResponse(status_code=413, content={"detail": str(exc)})
+
+
+@app.exception_handler(UploadValidationError)
+def upload_validation_handler(request: Request, exc: UploadValidationError):
+    return JSONResponse(status_code=422, content={"detail": "Uploaded file failed validation", "errors": exc.report})
+
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+@app.get("/")
+def home():
+    return {"message": "Welcome to the SME Financial App"}
+
+
+
+
+# Agricultural Endpoints
+
+from app.auth.deps import get_current_user
+from app.models.user import User
+
+
+@app.post("/analyze/agricultural")
+def analyze_agricultural_financials(file: UploadFile = File(...),db: Session = Depends(get_db),language: str = Form("en"),stream: bool | None = Form(None),current_user: User = Depends(get_current_user)):
+    
+    if not file.filename.lower().endswith(ALLOWED_EXTENSIONS):
+        raise HTTPException(status_code=400,detail="Invalid file type. Please upload a CSV (optionally .gz or .zst compressed), XLSX, Parquet or Arrow file.")
+    
+    filename = file.filename.lower()
+
+    try:
+        upload = FinancialUpload(file.file, filename, "agriculture", stream=stream)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+    required_columns = REQUIRED_COLUMNS["agriculture"]
+
+    if not required_columns.issubset(upload.columns):
+        missing = required_columns - set(upload.columns)
+        raise HTTPException(status_code=400,detail=f"Missing columns: {missing}")
+
+    try:
+        aggregates, year = upload.aggregate(AGRICULTURE_AGGREGATIONS)
+        metrics = agricultural_metrics(aggregates)
+        trends = upload_trends(upload, "agriculture", aggregates)
+        forecast = upload_forecast(upload, "agriculture", aggregates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    
+    
+    # Percentile ranks among the analyses of the same industry and year saved before this
+    # one, so it is not ranked against itself
+    benchmarks = peer_benchmarks(db, "agriculture", year, metrics)
+
+    # Same data already analyzed for this user and language under the current scoring rules:
+    # no new LLM call or row, and the stored scores its explanation was written for
+    saved_record = find_duplicate_analysis(db, "agriculture", current_user.id, upload.content_hash, language)
+
+    if saved_record is not None:
+        health_score, health_status = saved_record.health_score, saved_record.health_status
+        credit_risk = saved_record.credit_risk
+    else:
+        health_score, health_status = agricultural_health_score(metrics)
+        credit_risk = agriculture_credit_risk(health_score, metrics)
+
+    products = recommend_financial_products(
+        industry="Agriculture",
+        credit_risk=credit_risk,
+        health_score=health_score
+    )
+    products_for_prompt = "\n".join(f"- {p}" for p in products)
+
+    if saved_record is not None:
+        ai_explanation = saved_record.ai_explanation
+    else:
+        # AI Explanation
+        ai_explanation = None
+        try:
+            ai_explanation = generate_agriculture_financial_explanation(
+                metrics,
+                health_score,
+                health_status,
+                credit_risk,
+                products_for_prompt,
+                language
+            )
+        except Exception as e:
+            print("❌ AI ERROR:", str(e))
+            ai_explanation = None
+
+        # Save the result to agriculture_financial_analysis_results table
+        saved_record = save_agriculture_financial_analysis(
+            db=db,
+            metrics=metrics,
+            year=year,
+            health_score=health_score,
+            health_status=health_status,
+            credit_risk=credit_risk,
+            user_id=current_user.id,
+            ai_explanation=ai_explanation,
+            language=language,
+            content_hash=upload.content_hash,
+            statistics=upload.statistics,
+            trends=trends
+        )
+
+    return {
+        "status": "success",
+        "record_id": saved_record.id,
+        "industry": "Agriculture",
+        "year": year,
+        "season": metrics['season'],
+        "crop": metrics['primary_crop_type'],
+
+        **metrics,
+
+        "health_score": health_score,
+        "health_status": health_status,
+        "credit_risk": credit_risk,
+        "products": products_for_prompt,
+        "trends": trends,
+        "forecast": forecast,
+        "benchmarks": benchmarks,
+        "ai_explanation": ai_explanation,
+        "created_at": saved_record.created_at
+    }
+
+# Agriculture GET Endpoints
+
+# 1) For all data
+
+@app.get("/agriculture/analyses")
+def get_agriculture_analyses(
+    year: int | None = Query(None),
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(AgricultureFinancialAnalysis).filter(AgricultureFinancialAnalysis.user_id == current_user.id)
+
+    if year:
+        query = query.filter(AgricultureFinancialAnalysis.year == year)
+
+    records = (
+        query
+        .order_by(AgricultureFinancialAnalysis.created_at.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+    return {
+        "count": len(records),
+        "results": [
+            {
+                "id": r.id,
+                "year": r.year,
+                "season": r.season,
+                "crop": r.primary_crop_type,
+                "profit": r.profit,
+                "profit_margin": r.profit_margin,
+                "health_score": r.health_score,
+                "health_status": r.health_status,
+                "created_at": r.created_at
+            }
+            for r in records
+        ]
+    }
+
+
+# 2) GET agriculture analysis by ID
+
+@app.get("/agriculture/analyses/{analysis_id}")
+def get_agriculture_analysis_by_id(
+    analysis_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    record = db.query(AgricultureFinancialAnalysis).filter(
+        AgricultureFinancialAnalysis.id == analysis_id,
+        AgricultureFinancialAnalysis.user_id == current_user.id
+    ).first()
+
+    if not record:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    return {
+        "id": record.id,
+        "year": record.year,
+        "industry": "Agriculture",
+        "season": record.season,
+        "crop": record.primary_crop_type,
+
+        **metric_groups("agriculture", record),
+
+        "health": {
+            "health_score": record.health_score,
+            "health_status": record.health_status,
+            "credit_risk": record.credit_risk
+        },
+
+        "trends": record.trends,
+
+        "ai_explanation": record.ai_explanation,
+        "created_at": record.created_at
+    }
+
+# 3) GET agriculture dashboard summary (KPIs)
+
+from sqlalchemy import func
+
+@app.get("/agriculture/dashboard")
+def agriculture_dashboard(
+    year: int | None = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(AgricultureFinancialAnalysis).filter(AgricultureFinancialAnalysis.user_id == current_user.id)
+
+    if year:
+        query = query.filter(AgricultureFinancialAnalysis.year == year)
+
+    total_records = query.count()
+
+    totals = query.with_entities(
+        func.sum(AgricultureFinancialAnalysis.total_revenue),
+        func.sum(AgricultureFinancialAnalysis.profit),
+        func.avg(AgricultureFinancialAnalysis.health_score)
+    ).first()
+
+    return {
+        "year": year,
+        "total_farms_analyzed": total_records,
+        "total_revenue": totals[0] or 0,
+        "total_profit": totals[1] or 0,
+        "average_health_score": round(totals[2], 2) if totals[2] else 0
+    }
+
+
+# 4) GET agriculture AI explanation only
+
+@app.get("/agriculture/analyses/{analysis_id}/ai")
+def get_agriculture_ai_explanation(
+    analysis_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    record = db.query(AgricultureFinancialAnalysis).filter(
+        AgricultureFinancialAnalysis.id == analysis_id,
+        AgricultureFinancialAnalysis.user_id == current_user.id
+    ).first()
+
+    if not record:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    return {
+        "id": record.id,
+        "ai_explanation": record.ai_explanation
+    }
+
+
+
+
+
+
+
+
+
+
+
+# Manufacturing Endpoints
+
+@app.post("/analyze/manufacturing")
+def analyze_manufacturing_financials(file: UploadFile = File(...),db: Session = Depends(get_db),language: str = Form("en"),stream: bool | None = Form(None),current_user: User = Depends(get_current_user)):
+
+    if not file.filename.lower().endswith(ALLOWED_EXTENSIONS):
+        raise HTTPException(status_code=400,detail="Invalid file type. Please upload a CSV (optionally .gz or .zst compressed), XLSX, Parquet or Arrow file.")
+    
+    filename = file.filename.lower()
+
+    try:
+        upload = FinancialUpload(file.file, filename, "manufacturing", stream=stream)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    
+    BASE_REQUIRED_COLUMNS = REQUIRED_COLUMNS["manufacturing"]
+
+    missing_base = BASE_REQUIRED_COLUMNS - set(upload.columns)
+    if missing_base:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing required columns: {missing_base}"
+        )
+
+    # Overhead validation
+    if not (
+        OVERHEAD_DIRECT.issubset(upload.columns)
+        or OVERHEAD_SPLIT.issubset(upload.columns)
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                "Missing overhead cost columns. "
+                "Provide either 'overhead_cost' "
+                "or all of 'power_cost', 'rent_cost', 'maintenance_cost'."
+            )
+        )
+
+    try:
+        aggregates, year = upload.aggregate(MANUFACTURING_AGGREGATIONS)
+        metrics = manufacturing_metrics(aggregates)
+        trends = upload_trends(upload, "manufacturing", aggregates)
+        forecast = upload_forecast(upload, "manufacturing", aggregates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Percentile ranks among the analyses of the same industry and year saved before this
+    # one, so it is not ranked against itself
+    benchmarks = peer_benchmarks(db, "manufacturing", year, metrics)
+
+    # Same data already analyzed for this user and language under the current scoring rules:
+    # no new LLM call or row, and the stored scores its explanation was written for
+    saved_record = find_duplicate_analysis(db, "manufacturing", current_user.id, upload.content_hash, language)
+
+    if saved_record is not None:
+        health_score, health_status = saved_record.health_score, saved_record.health_status
+        credit_risk = saved_record.credit_risk
+    else:
+        health_score, health_status = manufacturing_health_score(metrics)
+        credit_risk = manufacturing_credit_risk(health_score, metrics)
+
+    products = recommend_financial_products(
+        industry="Manufacturing",
+        credit_risk=credit_risk,
+        health_score=health_score
+    )
+
+    products_for_prompt = "\n".join(f"- {p}" for p in products)
+
+    if saved_record is not None:
+        ai_explanation = saved_record.ai_explanation
+    else:
+        # AI Explanation
+        ai_explanation = None
+        try:
+            ai_explanation = generate_manufacturing_financial_explanation(
+                metrics,
+                health_score,
+                health_status,
+                credit_risk,
+                products_for_prompt,
+                language
+            )
+        except Exception:
+            ai_explanation = None
+
+        # Save the manufacturing financial analysis results to the database
+        saved_record = save_manufacturing_financial_analysis(
+            db=db,
+            metrics=metrics,
+            year=year,
+            health_score=health_score,
+            health_status=health_status,
+            credit_risk=credit_risk,
+            user_id=current_user.id,
+            ai_explanation=ai_explanation,
+            language=language,
+            content_hash=upload.content_hash,
+            statistics=upload.statistics,
+            trends=trends
+        )
+
+    return {
+        "status": "success",
+        "record_id": saved_record.id,
+        "industry": "Manufacturing",
+
+        **metrics,
+
+        "health_score": health_score,
+        "health_status": health_status,
+        "credit_risk": credit_risk,
+        "products": products,
+        "trends": trends,
+        "forecast": forecast,
+        "benchmarks": benchmarks,
+        "ai_explanation": ai_explanation,
+        "created_at": saved_record.created_at
+    }
+
+
+# Manufacture GET Endpoints
+
+@app.get("/manufacturing/analyses")
+def get_manufacturing_analyses(
+    year: int | None = Query(None),
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(ManufacturingFinancialAnalysis).filter(ManufacturingFinancialAnalysis.user_id == current_user.id)
+
+    if year:
+        query = query.filter(ManufacturingFinancialAnalysis.year == year)
+
+    records = (
+        query
+        .order_by(ManufacturingFinancialAnalysis.created_at.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+    return {
+        "count": len(records),
+        "results": [
+            {
+                "id": r.id,
+                "year": r.year,
+                "industry": r.industry,
+                "profit": r.profit,
+                "profit_margin": r.profit_margin,
+                "health_score": r.health_score,
+                "health_status": r.health_status,
+                "created_at": r.created_at
+            }
+            for r in records
+        ]
+    }
+
+
+# 2) GET manufacturing analysis by ID
+
+@app.get("/manufacturing/analyses/{analysis_id}")
+def get_manufacturing_analysis_by_id(
+    analysis_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    record = db.query(ManufacturingFinancialAnalysis).filter(
+        ManufacturingFinancialAnalysis.id == analysis_id,
+        ManufacturingFinancialAnalysis.user_id == current_user.id
+    ).first()
+
+    if not record:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    return {
+        "id": record.id,
+        "industry": record.industry,
+        "year": record.year,
+
+        **metric_groups("manufacturing", record),
+
+        "health": {
+            "health_score": record.health_score,
+            "health_status": record.health_status,
+            "credit_risk": record.credit_risk
+        },
+
+        "trends": record.trends,
+
+        "ai_explanation": record.ai_explanation,
+        "created_at": record.created_at
+    }
+
+# 3 GET manufacturing dashboard KPIs
+
+from sqlalchemy import func
+
+@app.get("/manufacturing/dashboard")
+def manufacturing_dashboard(
+    year: int | None = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(ManufacturingFinancialAnalysis).filter(ManufacturingFinancialAnalysis.user_id == current_user.id)
+
+    if year:
+        query = query.filter(ManufacturingFinancialAnalysis.year == year)
+
+    total_records = query.count()
+
+    totals = query.with_entities(
+        func.sum(ManufacturingFinancialAnalysis.total_revenue),
+        func.sum(ManufacturingFinancialAnalysis.profit),
+        func.avg(ManufacturingFinancialAnalysis.health_score)
+    ).first()
+
+    return {
+        "year": year,
+        "total_factories_analyzed": total_records,
+        "total_revenue": totals[0] or 0,
+        "total_profit": totals[1] or 0,
+        "average_health_score": round(totals[2], 2) if totals[2] else 0
+    }
+
+# 4) GET manufacturing AI explanation
+
+@app.get("/manufacturing/analyses/{analysis_id}/ai")
+def get_manufacturing_ai_explanation(
+    analysis_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    record = db.query(ManufacturingFinancialAnalysis).filter(
+        ManufacturingFinancialAnalysis.id == analysis_id,
+        ManufacturingFinancialAnalysis.user_id == current_user.id
+    ).first()
+
+    if not record:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    return {
+        "id": record.id,
+        "ai_explanation": record.ai_explanation
+    }
+
+
+
+
+
+
+
+
+
+
+# Retail Endpoints
+@app.post("/analyze/retail")
+def analyze_retail_financials(file: UploadFile = File(...),db: Session = Depends(get_db),language: str = Form("en"),stream: bool | None = Form(None),current_user: User = Depends(get_current_user)):
+
+    if not file.filename.lower().endswith(ALLOWED_EXTENSIONS):
+        raise HTTPException(status_code=400,detail="Invalid file type. Please upload a CSV (optionally .gz or .zst compressed), XLSX, Parquet or Arrow file.")
+
+    filename = file.filename.lower()
+
+    try:
+        upload = FinancialUpload(file.file, filename, "retail", stream=stream)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    required_columns = REQUIRED_COLUMNS["retail"]
+
+    if not required_columns.issubset(upload.columns):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing required columns: {required_columns - set(upload.columns)}"
+        )
+
+    try:
+        aggregates, year = upload.aggregate(RETAIL_AGGREGATIONS)
+        metrics = retail_metrics(aggregates)
+        trends = upload_trends(upload, "retail", aggregates)
+        forecast = upload_forecast(upload, "retail", aggregates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Percentile ranks among the analyses of the same industry and year saved before this
+    # one, so it is not ranked against itself
+    benchmarks = peer_benchmarks(db, "retail", year, metrics)
+
+    # Same data already analyzed for this user and language under the current scoring rules:
+    # no new LLM call or row, and the stored scores its explanation was written for
+    saved_record = find_duplicate_analysis(db, "retail", current_user.id, upload.content_hash, language)
+
+    if saved_record is not None:
+        health_score, health_status = saved_record.health_score, saved_record.health_status
+        credit_risk = saved_record.credit_risk
+    else:
+        health_score, health_status = retail_health_score(metrics)
+        credit_risk = retail_credit_risk(health_score, metrics)
+
+    products = recommend_financial_products(
+        industry="Retail",
+        credit_risk=credit_risk,
+        health_score=health_score
+    )
+
+    products_for_prompt = "\n".join(f"- {p}" for p in products)
+
+    if saved_record is not None:
+        ai_explanation = saved_record.ai_explanation
+    else:
+        # AI Explanation
+        ai_explanation = None
+        try:
+            ai_explanation = generate_retail_financial_explanation(
+                metrics,
+                health_score,
+                health_status,
+                credit_risk,
+                products_for_prompt,
+                language
+            )
+        except Exception:
+            ai_explanation = None
+
+        # Save the retail financial analysis results to the database
+        saved_record = save_retail_financial_analysis(
+            db=db,
+            metrics=metrics,
+            year=year,
+            health_score=health_score,
+            health_status=health_status,
+            credit_risk=credit_risk,
+            user_id=current_user.id,
+            ai_explanation=ai_explanation,
+            language=language,
+            content_hash=upload.content_hash,
+            statistics=upload.statistics,
+            trends=trends
+        )
+
+    return {
+        "status": "success",
+        "record_id": saved_record.id,
+        "industry": "Retail",
+        **metrics,
+        "health_score": health_score,
+        "health_status": health_status,
+        "credit_risk": credit_risk,
+        "products": products,
+        "trends": trends,
+        "forecast": forecast,
+        "benchmarks": benchmarks,
+        "ai_explanation": ai_explanation,
+        "created_at": saved_record.created_at
+    }
+
+
+# Retail GET Endpoints
+
+@app.get("/retail/analyses")
+def get_retail_analyses(
+    year: int | None = Query(None),
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(RetailFinancialAnalysis).filter(RetailFinancialAnalysis.user_id == current_user.id)
+
+    if year:
+        query = query.filter(RetailFinancialAnalysis.year == year)
+
+    records = (
+        query
+        .order_by(RetailFinancialAnalysis.created_at.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+    return {
+        "count": len(records),
+        "results": [
+            {
+                "id": r.id,
+                "year": r.year,
+                "industry": r.industry,
+                "profit": r.profit,
+                "profit_margin": r.profit_margin,
+                "health_score": r.health_score,
+                "health_status": r.health_status,
+                "created_at": r.created_at
+            }
+            for r in records
+        ]
+    }
+
+
+# 2) GET retail analysis by ID
+
+@app.get("/retail/analyses/{analysis_id}")
+def get_retail_analysis_by_id(
+    analysis_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    record = db.query(RetailFinancialAnalysis).filter(
+        RetailFinancialAnalysis.id == analysis_id,
+        RetailFinancialAnalysis.user_id == current_user.id
+    ).first()
+
+    if not record:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    return {
+        "id": record.id,
+        "industry": record.industry,
+        "year": record.year,
+
+        **metric_groups("retail", record),
+
+        "health": {
+            "health_score": record.health_score,
+            "health_status": record.health_status,
+            "credit_risk": record.credit_risk
+        },
+
+        "trends": record.trends,
+
+        "ai_explanation": record.ai_explanation,
+        "created_at": record.created_at
+    }
+
+
+
+# 3) GET retail dashboard KPIs
+
+from sqlalchemy import func
+
+@app.get("/retail/dashboard")
+def retail_dashboard(
+    year: int | None = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(RetailFinancialAnalysis).filter(RetailFinancialAnalysis.user_id == current_user.id)
+
+    if year:
+        query = query.filter(RetailFinancialAnalysis.year == year)
+
+    total_records = query.count()
+
+    totals = query.with_entities(
+        func.sum(RetailFinancialAnalysis.total_revenue),
+        func.sum(RetailFinancialAnalysis.profit),
+        func.avg(RetailFinancialAnalysis.health_score)
+    ).first()
+
+    return {
+        "year": year,
+        "total_stores_analyzed": total_records,
+        "total_revenue": totals[0] or 0,
+        "total_profit": totals[1] or 0,
+        "average_health_score": round(totals[2], 2) if totals[2] else 0
+    }
+
+# 4) GET retail AI Explaination
+
+@app.get("/retail/analyses/{analysis_id}/ai")
+def get_retail_ai_explanation(
+    analysis_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    record = db.query(RetailFinancialAnalysis).filter(
+        RetailFinancialAnalysis.id == analysis_id,
+        RetailFinancialAnalysis.user_id == current_user.id
+    ).first()
+
+    if not record:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    return {
+        "id": record.id,
+        "ai_explanation": record.ai_explanation
+    }
+
+
+
+
+
+
+#  Logestic Endpoints
+
+@app.post("/analyze/logistics")
+def analyze_logistics_financials(file: UploadFile = File(...),db: Session = Depends(get_db),language: str = Form("en"),stream: bool | None = Form(None),current_user: User = Depends(get_current_user)):
+
+    if not file.filename.lower().endswith(ALLOWED_EXTENSIONS):
+        raise HTTPException(status_code=400,detail="Invalid file type. Please upload a CSV (optionally .gz or .zst compressed), XLSX, Parquet or Arrow file.")
+
+    filename = file.filename.lower()
+
+    try:
+        upload = FinancialUpload(file.file, filename, "logistics", stream=stream)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    required_columns = REQUIRED_COLUMNS["logistics"]
+
+    if not required_columns.issubset(upload.columns):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing required columns: {required_columns - set(upload.columns)}"
+        )
+
+    try:
+        aggregates, year = upload.aggregate(LOGISTICS_AGGREGATIONS)
+        metrics = logistics_metrics(aggregates)
+        trends = upload_trends(upload, "logistics", aggregates)
+        forecast = upload_forecast(upload, "logistics", aggregates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Percentile ranks among the analyses of the same industry and year saved before this
+    # one, so it is not ranked against itself
+    benchmarks = peer_benchmarks(db, "logistics", year, metrics)
+
+    # Same data already analyzed for this user and language under the current scoring rules:
+    # no new LLM call or row, and the stored scores its explanation was written for
+    saved_record = find_duplicate_analysis(db, "logistics", current_user.id, upload.content_hash, language)
+
+    if saved_record is not None:
+        health_score, health_status = saved_record.health_score, saved_record.health_status
+        credit_risk = saved_record.credit_risk
+    else:
+        health_score, health_status = logistics_health_score(metrics)
+        credit_risk = logistics_credit_risk(health_score, metrics)
+
+    products = recommend_financial_products(
+        industry="Logistics",
+        credit_risk=credit_risk,
+        health_score=health_score
+    )
+
+    products_for_prompt = "\n".join(f"- {p}" for p in products)
+
+    if saved_record is not None:
+        ai_explanation = saved_record.ai_explanation
+    else:
+        # AI Explanation
+        ai_explanation = None
+        try:
+            ai_explanation = generate_logistics_financial_explanation(
+                metrics,
+                health_score,
+                health_status,
+                credit_risk,
+                products_for_prompt,
+                language
+            )
+        except Exception:
+            ai_explanation = None
+
+        # Save the logistic financial analysis results to the database
+        saved_record = save_logistics_financial_analysis(
+            db=db,
+            metrics=metrics,
+            year=year,
+            health_score=health_score,
+            health_status=health_status,
+            credit_risk=credit_risk,
+            user_id=current_user.id,
+            ai_explanation=ai_explanation,
+            language=language,
+            content_hash=upload.content_hash,
+            statistics=upload.statistics,
+            trends=trends
+        )
+
+    return {
+        "status": "success",
+        "record_id": saved_record.id,
+        "industry": "Logistics",
+        **metrics,
+        "health_score": health_score,
+        "health_status": health_status,
+        "credit_risk": credit_risk,
+        "products": products,
+        "trends": trends,
+        "forecast": forecast,
+        "benchmarks": benchmarks,
+        "ai_explanation": ai_explanation,
+        "created_at": saved_record.created_at
+    }
+
+
+# Logestic GET Endpoints
+
+#1) GET all logistics analyses
+
+@app.get("/logistics/analyses")
+def get_logistics_analyses(
+    year: int | None = Query(None),
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(LogisticsFinancialAnalysis).filter(LogisticsFinancialAnalysis.user_id == current_user.id)
+
+    if year:
+        query = query.filter(LogisticsFinancialAnalysis.year == year)
+
+    records = (
+        query
+        .order_by(LogisticsFinancialAnalysis.created_at.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+    return {
+        "count": len(records),
+        "results": [
+            {
+                "id": r.id,
+                "year": r.year,
+                "industry": r.industry,
+                "profit": r.profit,
+                "profit_margin": r.profit_margin,
+                "health_score": r.health_score,
+                "health_status": r.health_status,
+                "created_at": r.created_at
+            }
+            for r in records
+        ]
+    }
+
+# 2) GET logistics analysis by ID
+
+@app.get("/logistics/analyses/{analysis_id}")
+def get_logistics_analysis_by_id(
+    analysis_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    record = db.query(LogisticsFinancialAnalysis).filter(
+        LogisticsFinancialAnalysis.id == analysis_id,
+        LogisticsFinancialAnalysis.user_id == current_user.id
+    ).first()
+
+    if not record:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    return {
+        "id": record.id,
+        "industry": record.industry,
+        "year": record.year,
+
+        **metric_groups("logistics", record),
+
+        "health": {
+            "health_score": record.health_score,
+            "health_status": record.health_status,
+            "credit_risk": record.credit_risk
+        },
+
+        "trends": record.trends,
+
+        "ai_explanation": record.ai_explanation,
+        "created_at": record.created_at
+    }
+
+
+# 3) GET logistics dashboard KPIs
+
+from sqlalchemy import func
+
+@app.get("/logistics/dashboard")
+def logistics_dashboard(
+    year: int | None = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(LogisticsFinancialAnalysis).filter(LogisticsFinancialAnalysis.user_id == current_user.id)
+
+    if year:
+        query = query.filter(LogisticsFinancialAnalysis.year == year)
+
+    total_records = query.count()
+
+    totals = query.with_entities(
+        func.sum(LogisticsFinancialAnalysis.total_revenue),
+        func.sum(LogisticsFinancialAnalysis.profit),
+        func.avg(LogisticsFinancialAnalysis.health_score),
+        func.avg(LogisticsFinancialAnalysis.on_time_delivery_percentage)
+    ).first()
+
+    return {
+        "year": year,
+        "total_logistics_companies": total_records,
+        "total_revenue": totals[0] or 0,
+        "total_profit": totals[1] or 0,
+        "average_health_score": round(totals[2], 2) if totals[2] else 0,
+        "average_on_time_delivery": round(totals[3], 2) if totals[3] else 0
+    }
+
+# 4) GET logistics AI
+
+@app.get("/logistics/analyses/{analysis_id}/ai")
+def get_logistics_ai_explanation(
+    analysis_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    record = db.query(LogisticsFinancialAnalysis).filter(
+        LogisticsFinancialAnalysis.id == analysis_id,
+        LogisticsFinancialAnalysis.user_id == current_user.id
+    ).first()
+
+    if not record:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    return {
+        "id": record.id,
+        "ai_explanation": record.ai_explanation
+    }
+
+
+
+    
+#  Ecommerce Endpoints
+
+@app.post("/analyze/ecommerce")
+def analyze_ecommerce_financials(file: UploadFile = File(...),db: Session = Depends(get_db),language: str = Form("en"),stream: bool | None = Form(None),current_user: User = Depends(get_current_user)):
+
+    if not file.filename.lower().endswith(ALLOWED_EXTENSIONS):
+        raise HTTPException(status_code=400,detail="Invalid file type. Please upload a CSV (optionally .gz or .zst compressed), XLSX, Parquet or Arrow file.")
+
+    filename = file.filename.lower()
+
+    try:
+        upload = FinancialUpload(file.file, filename, "ecommerce", stream=stream)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    required_columns = REQUIRED_COLUMNS["ecommerce"]
+
+    if not required_columns.issubset(upload.columns):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing required columns: {required_columns - set(upload.columns)}"
+        )
+
+    try:
+        aggregates, year = upload.aggregate(ECOMMERCE_AGGREGATIONS)
+        metrics = ecommerce_metrics(aggregates)
+        trends = upload_trends(upload, "ecommerce", aggregates)
+        forecast = upload_forecast(upload, "ecommerce", aggregates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Percentile ranks among the analyses of the same industry and year saved before this
+    # one, so it is not ranked against itself
+    benchmarks = peer_benchmarks(db, "ecommerce", year, metrics)
+
+    # Same data already analyzed for this user and language under the current scoring rules:
+    # no new LLM call or row, and the stored scores its explanation was written for
+    saved_record = find_duplicate_analysis(db, "ecommerce", current_user.id, upload.content_hash, language)
+
+    if saved_record is not None:
+        health_score, health_status = saved_record.health_score, saved_record.health_status
+        credit_risk = saved_record.credit_risk
+    else:
+        health_score, health_status = ecommerce_health_score(metrics)
+        credit_risk = ecommerce_credit_risk(health_score, metrics)
+
+    products = recommend_financial_products(
+        industry="Ecommerce",
+        credit_risk=credit_risk,
+        health_score=health_score
+    )
+
+    products_for_prompt = "\n".join(f"- {p}" for p in products)
+
+    if saved_record is not None:
+        ai_explanation = saved_record.ai_explanation
+    else:
+        # AI Explanation
+        ai_explanation = None
+        try:
+            ai_explanation = generate_ecommerce_financial_explanation(
+                metrics,
+                health_score,
+                health_status,
+                credit_risk,
+                products_for_prompt,
+                language
+            )
+        except Exception:
+            ai_explanation = None
+
+        # Save the ecommerce financial analysis results to the database
+        saved_record = save_ecommerce_financial_analysis(
+            db=db,
+            metrics=metrics,
+            year=year,
+            health_score=health_score,
+            health_status=health_status,
+            credit_risk=credit_risk,
+            user_id=current_user.id,
+            ai_explanation=ai_explanation,
+            language=language,
+            content_hash=upload.content_hash,
+            statistics=upload.statistics,
+            trends=trends
+        )
+
+    return {
+        "status": "success",
+        "record_id": saved_record.id,
+        "industry": "Ecommerce",
+        **metrics,
+        "health_score": health_score,
+        "health_status": health_status,
+        "credit_risk": credit_risk,
+        "products": products,
+        "trends": trends,
+        "forecast": forecast,
+        "benchmarks": benchmarks,
+        "ai_explanation": ai_explanation,
+        "created_at": saved_record.created_at
+    }
+
+
+# GET Ecommerce Endpoints
+
+# 1) GET all e-commerce analyse
+
+@app.get("/ecommerce/analyses")
+def get_ecommerce_analyses(
+    year: int | None = Query(None),
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(EcommerceFinancialAnalysis).filter(EcommerceFinancialAnalysis.user_id == current_user.id)
+
+    if year:
+        query = query.filter(EcommerceFinancialAnalysis.year == year)
+
+    records = (
+        query
+        .order_by(EcommerceFinancialAnalysis.created_at.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+    return {
+        "count": len(records),
+        "results": [
+            {
+                "id": r.id,
+                "year": r.year,
+                "industry": r.industry,
+                "profit": r.profit,
+                "profit_margin": r.profit_margin,
+                "health_score": r.health_score,
+                "health_status": r.health_status,
+                "created_at": r.created_at
+            }
+            for r in records
+        ]
+    }
+
+
+# 2) GET e-commerce analysis by ID
+
+@app.get("/ecommerce/analyses/{analysis_id}")
+def get_ecommerce_analysis_by_id(
+    analysis_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    record = db.query(EcommerceFinancialAnalysis).filter(
+        EcommerceFinancialAnalysis.id == analysis_id,
+        EcommerceFinancialAnalysis.user_id == current_user.id
+    ).first()
+
+    if not record:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    return {
+        "id": record.id,
+        "industry": record.industry,
+        "year": record.year,
+
+        **metric_groups("ecommerce", record),
+
+        "health": {
+            "health_score": record.health_score,
+            "health_status": record.health_status,
+            "credit_risk": record.credit_risk
+        },
+
+        "trends": record.trends,
+
+        "ai_explanation": record.ai_explanation,
+        "created_at": record.created_at
+    }
+
+
+# 3) GET e-commerce dashboard KPIs
+
+from sqlalchemy import func
+
+@app.get("/ecommerce/dashboard")
+def ecommerce_dashboard(
+    year: int | None = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(EcommerceFinancialAnalysis).filter(EcommerceFinancialAnalysis.user_id == current_user.id)
+
+    if year:
+        query = query.filter(EcommerceFinancialAnalysis.year == year)
+
+    total_records = query.count()
+
+    totals = query.with_entities(
+        func.sum(EcommerceFinancialAnalysis.total_revenue),
+        func.sum(EcommerceFinancialAnalysis.profit),
+        func.avg(EcommerceFinancialAnalysis.health_score),
+        func.avg(EcommerceFinancialAnalysis.return_rate_percentage)
+    ).first()
+
+    return {
+        "year": year,
+        "total_sellers": total_records,
+        "total_revenue": totals[0] or 0,
+        "total_profit": totals[1] or 0,
+        "average_health_score": round(totals[2], 2) if totals[2] else 0,
+        "average_return_rate": round(totals[3], 2) if totals[3] else 0
+    }
+
+
+# 4) GET e-commerce AI explanation
+
+@app.get("/ecommerce/analyses/{analysis_id}/ai")
+def get_ecommerce_ai_explanation(
+    analysis_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    record = db.query(EcommerceFinancialAnalysis).filter(
+        EcommerceFinancialAnalysis.id == analysis_id,
+        EcommerceFinancialAnalysis.user_id == current_user.id
+    ).first()
+
+    if not record:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    return {
+        "id": record.id,
+        "ai_explanation": record.ai_explanation
+    }
+
+
+
+@app.get("/dashboard")
+def dashboard(
+    industry: str | None = Query(None),
+    year: int | None = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    models = {
+        "Agriculture": AgricultureFinancialAnalysis,
+        "Manufacturing": ManufacturingFinancialAnalysis,
+        "Retail": RetailFinancialAnalysis,
+        "Logistics": LogisticsFinancialAnalysis,
+        "Ecommerce": EcommerceFinancialAnalysis,
+    }
+
+    total_analyses = 0
+    scores = []
+
+    profit_by_year: dict[int, float] = {}
+    revenue_by_year: dict[int, float] = {}
+    expenses_by_year: dict[int, float] = {}
+    year_breakdown: dict[int, int] = {}
+    industry_breakdown = {}
+    recent = []
+
+    for name, model in models.items():
+
+        if industry and name != industry:
+            continue
+
+        q = db.query(model).filter(model.user_id == current_user.id)
+
+        if year:
+            q = q.filter(model.year == year)
+
+        records = q.all()
+        industry_breakdown[name] = len(records)
+        total_analyses += len(records)
+
+        for r in records:
+            scores.append(r.health_score)
+
+            # PROFIT
+            profit = r.total_revenue - r.total_expenses
+            profit_by_year[r.year] = profit_by_year.get(r.year, 0) + profit
+
+            # REVENUE & EXPENSES
+            revenue_by_year[r.year] = revenue_by_year.get(r.year, 0) + r.total_revenue
+            expenses_by_year[r.year] = expenses_by_year.get(r.year, 0) + r.total_expenses
+
+            # YEAR COUNT
+            year_breakdown[r.year] = year_breakdown.get(r.year, 0) + 1
+
+        recent += (
+            q.order_by(model.created_at.desc())
+            .limit(5)
+            .all()
+        )
+
+    return {
+        "filters": {
+            "industry": industry,
+            "year": year,
+        },
+        "total_analyses": total_analyses,
+        "average_health_score": round(sum(scores) / len(scores), 2) if scores else 0,
+        "best_health_score": max(scores) if scores else 0,
+        "worst_health_score": min(scores) if scores else 0,
+
+        # ✅ CHART DATA
+        "profit_by_year": profit_by_year,
+        "revenue_by_year": revenue_by_year,
+        "expenses_by_year": expenses_by_year,
+        "year_breakdown": year_breakdown,
+        "industry_breakdown": industry_breakdown,
+
+        "recent_activity": [
+            {
+                "industry": industry or "Mixed",
+                "year": r.year,
+                "health_score": r.health_score,
+                "created_at": r.created_at,
+            }
+            for r in recent
+        ],
+    }
+
+
+
+# Batch Endpoints
+
+import tempfile
+from app.services.ingestion import spool_batch_uploads
+from app.services.pipeline import INDUSTRY_PIPELINES, resolve_industry, analyze_files
+from app.services.persistence import save_financial_analyses, find_duplicate_analyses
+from app.services.credit import CREDIT_MODELS_VERSION
+
+
+@app.post("/analyze/{industry}/batch")
+def analyze_batch_financials(
+    industry: str,
+    files: list[UploadFile] = File(...),
+    stream: bool | None = Form(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Analyzes many files (or .zip archives of files) of one industry across a process pool
+    and saves every successful analysis in one transaction. The AI explanation is skipped.
+    """
+    try:
+        industry = resolve_industry(industry)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            jobs = spool_batch_uploads(files, tmp_dir, ALLOWED_EXTENSIONS)
+        except UploadTooLarge:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if not jobs:
+            raise HTTPException(status_code=400, detail="No CSV, XLSX, Parquet or Arrow files found in the upload")
+
+        results = analyze_files(industry, jobs, stream=stream)
+
+    succeeded = [r for r in results if "error" not in r]
+
+    # Data this user already analyzed under the same scoring rules and credit models, or
+    # repeated within the batch, keeps one record and its stored scores
+    duplicates = find_duplicate_analyses(db, industry, current_user.id, [r["content_hash"] for r in succeeded]) if succeeded else {}
+
+    record_ids = {}
+    fresh = {}
+    for r in succeeded:
+        record = duplicates.get(r["content_hash"])
+        if record is not None and record.rules_version == r["rules_version"] and record.credit_model_version == CREDIT_MODELS_VERSION:
+            record_ids[r["content_hash"]] = record.id
+            r.update(health_score=record.health_score, health_status=record.health_status, credit_risk=record.credit_risk)
+        else:
+            fresh.setdefault(r["content_hash"], r)
+
+    if fresh:
+        record_ids.update(zip(fresh, save_financial_analyses(db, industry, list(fresh.values()), current_user.id)))
+    for r in succeeded:
+        r["record_id"] = record_ids[r["content_hash"]]
+
+    return {
+        "status": "success",
+        "industry": INDUSTRY_PIPELINES[industry]["name"],
+        "files": len(results),
+        "analyzed": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "results": [
+            {
+                "filename": r["filename"],
+                "error": r["error"],
+                "errors": r.get("errors", [])
+            }
+            if "error" in r else
+            {
+                "filename": r["filename"],
+                "record_id": r["record_id"],
+                "year": r["year"],
+                **r["metrics"],
+                "health_score": r["health_score"],
+                "health_status": r["health_status"],
+                "credit_risk": r["credit_risk"]
+            }
+            for r in results
+        ]
+    }
+
+
+
+# Multi-period Endpoints
+
+from app.services.pipeline import PERIOD_KEYS, analyze_upload_periods
+
+
+@app.post("/analyze/{industry}/periods")
+def analyze_financials_by_period(
+    industry: str,
+    file: UploadFile = File(...),
+    period: str = Form("year"),
+    stream: bool | None = Form(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Splits one upload by year, year + month or year + season and saves one analysis
+    per period in one transaction. The AI explanation is skipped.
+    """
+    try:
+        industry = resolve_industry(industry)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    if not file.filename.lower().endswith(ALLOWED_EXTENSIONS):
+        raise HTTPException(status_code=400,detail="Invalid file type. Please upload a CSV (optionally .gz or .zst compressed), XLSX, Parquet or Arrow file.")
+
+    try:
+        upload = FinancialUpload(file.file, file.filename, industry, stream=stream)
+        results = analyze_upload_periods(upload, industry, period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    succeeded = [r for r in results if "error" not in r]
+    record_ids = save_financial_analyses(db, industry, succeeded, current_user.id) if succeeded else []
+    for r, record_id in zip(succeeded, record_ids):
+        r["record_id"] = record_id
+
+    period_columns = PERIOD_KEYS[period]
+
+    return {
+        "status": "success",
+        "industry": INDUSTRY_PIPELINES[industry]["name"],
+        "period": period,
+        "periods": len(results),
+        "analyzed": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "results": [
+            {
+                **{key: r[key] for key in period_columns},
+                "error": r["error"]
+            }
+            if "error" in r else
+            {
+                **{key: r[key] for key in period_columns},
+                "record_id": r["record_id"],
+                **r["metrics"],
+                "health_score": r["health_score"],
+                "health_status": r["health_status"],
+                "credit_risk": r["credit_risk"]
+            }
+            for r in results
+        ]
+    }
+
+
+# Portfolio Endpoints
+
+from app.services.pipeline import analyze_portfolio
+
+
+@app.post("/analyze/{industry}/portfolio")
+def analyze_financials_portfolio(
+    industry: str,
+    file: UploadFile = File(...),
+    stream: bool | None = Form(None),
+    save: bool = Form(True),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Analyzes one upload holding many businesses, told apart by the business_id column,
+    and saves one analysis per business in one transaction. The AI explanation is skipped.
+    """
+    try:
+        industry = resolve_industry(industry)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    if not file.filename.lower().endswith(ALLOWED_EXTENSIONS):
+        raise HTTPException(status_code=400,detail="Invalid file type. Please upload a CSV (optionally .gz or .zst compressed), XLSX, Parquet or Arrow file.")
+
+    try:
+        upload = FinancialUpload(file.file, file.filename, industry, stream=stream)
+        results = analyze_portfolio(upload, industry)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    succeeded = [r for r in results if "error" not in r]
+    if save and succeeded:
+        record_ids = save_financial_analyses(db, industry, succeeded, current_user.id)
+        for r, record_id in zip(succeeded, record_ids):
+            r["record_id"] = record_id
+
+    return {
+        "status": "success",
+        "industry": INDUSTRY_PIPELINES[industry]["name"],
+        "businesses": len(results),
+        "analyzed": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "results": [
+            {
+                "business_id": r["business_id"],
+                "error": r["error"]
+            }
+            if "error" in r else
+            {
+                "business_id": r["business_id"],
+                "record_id": r.get("record_id"),
+                "year": r["year"],
+                "rows": r["rows"],
+                **r["metrics"],
+                "health_score": r["health_score"],
+                "health_status": r["health_status"],
+                "credit_risk": r["credit_risk"],
+                "forecast": r["forecast"]
+            }
+            for r in results
+        ]
+    }
+
+
+# Incremental Endpoints
+
+from app.services.pipeline import analyze_upload
+from app.services.persistence import find_user_analysis, update_financial_analysis
+
+
+@app.post("/analyze/{industry}/{record_id}/append")
+def append_financial_rows(
+    industry: str,
+    record_id: int,
+    file: UploadFile = File(...),
+    stream: bool | None = Form(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Adds only the new rows (e.g. the latest month) to a saved analysis and updates its
+    metrics, health score and credit risk from the stored statistics, so the cost depends
+    on the new rows alone. The AI explanation of the old rows is cleared.
+    """
+    try:
+        industry = resolve_industry(industry)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    record = find_user_analysis(db, industry, current_user.id, record_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    # portfolio analyses keep monthly statistics only
+    if record.statistics is None or "sum" not in record.statistics:
+        raise HTTPException(status_code=409, detail="This analysis was saved without statistics. Upload the full file once to start incremental updates.")
+
+    if not file.filename.lower().endswith(ALLOWED_EXTENSIONS):
+        raise HTTPException(status_code=400,detail="Invalid file type. Please upload a CSV (optionally .gz or .zst compressed), XLSX, Parquet or Arrow file.")
+
+    try:
+        upload = FinancialUpload(file.file, file.filename, industry, stream=stream)
+        result = analyze_upload(upload, industry, record.statistics)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    record = update_financial_analysis(db, record, result)
+
+    return {
+        "status": "success",
+        "record_id": record.id,
+        "industry": INDUSTRY_PIPELINES[industry]["name"],
+        "year": result["year"],
+        "new_rows": result["rows"],
+        "total_rows": result["statistics"]["rows"],
+        "metrics": result["metrics"],
+        "trends": result["trends"],
+        "forecast": result["forecast"],
+        "health_score": result["health_score"],
+        "health_status": result["health_status"],
+        "credit_risk": result["credit_risk"]
+    }
+
+
+# Forecast Endpoints
+
+from app.services.forecast import FORECAST_HORIZON, MIN_FORECAST_HORIZON, MAX_FORECAST_HORIZON
+from app.services.pipeline import stored_forecasts
+from app.services.persistence import find_forecast_analyses
+
+
+@app.get("/forecast/{industry}")
+def forecast_financial_analyses(
+    industry: str,
+    horizon: int = Query(FORECAST_HORIZON, ge=MIN_FORECAST_HORIZON, le=MAX_FORECAST_HORIZON),
+    record_id: list[int] | None = Query(None),
+    limit: int = Query(1000, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Cash-flow forecasts of the user's saved analyses (the latest ones, or those in
+    record_id), from their stored monthly statistics, all fitted in one batch
+    """
+    try:
+        industry = resolve_industry(industry)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    records = find_forecast_analyses(db, industry, current_user.id, record_id, limit)
+    forecasts = stored_forecasts(industry, [record.statistics for record in records], horizon)
+
+    return {
+        "status": "success",
+        "industry": INDUSTRY_PIPELINES[industry]["name"],
+        "horizon": horizon,
+        "analyses": len(records),
+        "forecasted": sum(forecast is not None for forecast in forecasts),
+        "results": [
+            {
+                "record_id": record.id,
+                "business_id": record.business_id,
+                "year": record.year,
+                "error": "Not enough monthly history to forecast"
+            }
+            if forecast is None else
+            {
+                "record_id": record.id,
+                "business_id": record.business_id,
+                "year": record.year,
+                "forecast": forecast
+            }
+            for record, forecast in zip(records, forecasts)
+        ]
+    }
+
+
+# Stress Test Endpoints
+
+from app.services.stress import STRESS_SIMULATIONS, MAX_STRESS_SIMULATIONS, STRESS_MONTHS
+from app.services.pipeline import stress_analysis
+
+
+@app.get("/stress/{industry}/{record_id}")
+def stress_test_financial_analysis(
+    industry: str,
+    record_id: int,
+    simulations: int = Query(STRESS_SIMULATIONS, ge=100, le=MAX_STRESS_SIMULATIONS),
+    months: int = Query(STRESS_MONTHS, ge=1, le=36),
+    revenue_volatility: float | None = Query(None, ge=0, le=1),
+    cost_volatility: float | None = Query(None, ge=0, le=1),
+    revenue_shock: float = Query(0.0, gt=-100, le=100),
+    cost_shock: float = Query(0.0, ge=-100, le=500),
+    seed: int | None = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Simulates revenue and cost shock paths for a saved analysis and returns how likely
+    its health status or credit risk is to drop a tier. Volatilities default to the
+    business's own monthly history; the shocks shift the mean change, in percent.
+    """
+    try:
+        industry = resolve_industry(industry)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    record = find_user_analysis(db, industry, current_user.id, record_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    if record.statistics is None:
+        raise HTTPException(status_code=409, detail="This analysis was saved without statistics. Upload the full file again to stress test it.")
+
+    try:
+        result = stress_analysis(
+            industry,
+            record.statistics,
+            simulations=simulations,
+            months=months,
+            revenue_volatility=revenue_volatility,
+            cost_volatility=cost_volatility,
+            revenue_shock=revenue_shock,
+            cost_shock=cost_shock,
+            seed=seed,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "status": "success",
+        "record_id": record.id,
+        "industry": INDUSTRY_PIPELINES[industry]["name"],
+        "year": record.year,
+        **result
+    }
+
+
+# Scenario Endpoints
+
+from app.schema.scenario import ScenarioRequest
+from app.services.pipeline import scenario_analysis
+
+
+@app.post("/scenarios/{industry}/{record_id}")
+def run_financial_scenarios(
+    industry: str,
+    record_id: int,
+    request: ScenarioRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    What-if analysis of a saved analysis, e.g. {"grid": {"fuel_cost": [0, 15], "total_revenue": [0, -10]}}
+    for logistics. Every scenario gets its metrics, health score, credit risk and products,
+    all computed in one batch. Nothing is saved.
+    """
+    try:
+        industry = resolve_industry(industry)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    record = find_user_analysis(db, industry, current_user.id, record_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    if record.statistics is None:
+        raise HTTPException(status_code=409, detail="This analysis was saved without statistics. Upload the full file again to run scenarios on it.")
+
+    try:
+        baseline, results = scenario_analysis(industry, record.statistics, request.grid, request.scenarios)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "status": "success",
+        "record_id": record.id,
+        "industry": INDUSTRY_PIPELINES[industry]["name"],
+        "year": record.year,
+        "baseline": baseline,
+        "scenarios": len(results),
+        "results": results
+    }
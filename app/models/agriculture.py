@@ -1,49 +1,67 @@
-
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Text,ForeignKey
-from datetime import datetime
-from app.database.db import Base
-
-"""
-This class is used to store the agriculture financial analysis results
-It is used in the agriculture/routes.py file to store the agriculture financial analysis results
-"""
-
-class AgricultureFinancialAnalysis(Base):
-    __tablename__ = "agriculture_financial_analysis_results"
-
-    id = Column(Integer,primary_key=True,index=True)
-    user_id = Column(Integer,ForeignKey("users.id"),nullable=False)
-
-    industry = Column(String,default="Agriculture")
-    season = Column(String)
-    primary_crop_type = Column(String)
-    year = Column(Integer,nullable=False)
-
-    # Financial Metrics
-    total_revenue = Column(Float)
-    total_expenses = Column(Float)
-    profit = Column(Float)
-    effective_profit = Column(Float)
-    profit_margin = Column(Float)
-
-    # Inventory Risk
-    inventory_loss_percentage = Column(Float)
-    inventory_loss_value = Column(Float)
-    storage_risk_score = Column(String)
-
-    # Cost Pressure
-    cost_pressure_ratio = Column(Float)
-    debt_service_ratio = Column(Float)
-
-    # Health & Credit
-    health_score = Column(Float)
-    health_status = Column(String)
-    credit_risk = Column(String)
-
-    
-
-    ai_explanation = Column(JSON,nullable=True)
-
-    created_at = Column(DateTime,default=datetime.utcnow)
-
-
+
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Text,ForeignKey
+from datetime import datetime
+from app.database.db import Base
+
+"""
+This class is used to store the agriculture financial analysis results
+It is used in the agriculture/routes.py file to store the agriculture financial analysis results
+"""
+
+class AgricultureFinancialAnalysis(Base):
+    __tablename__ = "agriculture_financial_analysis_results"
+
+    id = Column(Integer,primary_key=True,index=True)
+    user_id = Column(Integer,ForeignKey("users.id"),nullable=False)
+
+    industry = Column(String,default="Agriculture")
+    season = Column(String)
+    primary_crop_type = Column(String)
+    year = Column(Integer,nullable=False)
+    month = Column(String, nullable=True)
+
+    # Financial Metrics
+    total_revenue = Column(Float)
+    total_expenses = Column(Float)
+    profit = Column(Float)
+    effective_profit = Column(Float)
+    profit_margin = Column(Float)
+
+    # Inventory Risk
+    inventory_loss_percentage = Column(Float)
+    inventory_loss_value = Column(Float)
+    storage_risk_score = Column(String)
+
+    # Cost Pressure
+    cost_pressure_ratio = Column(Float)
+    debt_service_ratio = Column(Float)
+
+    # Health & Credit
+    health_score = Column(Float)
+    health_status = Column(String)
+    credit_risk = Column(String)
+    # version of the scoring rules behind them, see services/scoring.py
+    rules_version = Column(Integer, nullable=True, index=True)
+    # hash of the credit models file behind credit_risk, see services/credit.py
+    credit_model_version = Column(String, nullable=True)
+
+    
+
+    # ---- Monthly series and trend indicators, see services/trends.py ----
+    trends = Column(JSON, nullable=True)
+
+    ai_explanation = Column(JSON,nullable=True)
+    language = Column(String, nullable=True)
+
+    # ---- Deduplication ----
+    content_hash = Column(String(64), nullable=True, index=True)
+
+    # ---- Portfolio ----
+    business_id = Column(String, nullable=True, index=True)
+
+    # ---- Incremental updates: sums, counts and histograms of every row so far ----
+    statistics = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime,default=datetime.utcnow)
+
+
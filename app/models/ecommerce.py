@@ -1,42 +1,59 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime,JSON,ForeignKey
-from sqlalchemy.sql import func
-from app.database.db import Base
-
-"""
-This class is used to store the ecommerce financial analysis results
-It is used in the ecommerce/routes.py file to store the ecommerce financial analysis results
-"""
-
-class EcommerceFinancialAnalysis(Base):
-    __tablename__ = "ecommerce_financial_analysis_results"
-
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer,ForeignKey("users.id"),nullable=False)
-
-    industry = Column(String, default="Ecommerce")
-    year = Column(Integer,nullable=False)
-    month = Column(String, nullable=True)
-
-    # ---- Financial Metrics ----
-    total_revenue = Column(Float)
-    total_expenses = Column(Float)
-    profit = Column(Float)
-    profit_margin = Column(Float)
-
-    # ---- E-commerce Unit Economics ----
-    contribution_margin = Column(Float)
-    platform_fee_ratio = Column(Float)
-    inventory_blockage_ratio = Column(Float)
-    order_profitability = Column(Float)
-    return_rate_percentage = Column(Float)
-    debt_service_ratio = Column(Float)
-
-    # ---- Health & Credit ----
-    health_score = Column(Integer)
-    health_status = Column(String)
-    credit_risk = Column(String)
-
-    # Ai Explanation
-    ai_explanation = Column(JSON, nullable=True)
-
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+from sqlalchemy import Column, Integer, String, Float, DateTime,JSON,ForeignKey
+from sqlalchemy.sql import func
+from app.database.db import Base
+
+"""
+This class is used to store the ecommerce financial analysis results
+It is used in the ecommerce/routes.py file to store the ecommerce financial analysis results
+"""
+
+class EcommerceFinancialAnalysis(Base):
+    __tablename__ = "ecommerce_financial_analysis_results"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer,ForeignKey("users.id"),nullable=False)
+
+    industry = Column(String, default="Ecommerce")
+    year = Column(Integer,nullable=False)
+    month = Column(String, nullable=True)
+
+    # ---- Financial Metrics ----
+    total_revenue = Column(Float)
+    total_expenses = Column(Float)
+    profit = Column(Float)
+    profit_margin = Column(Float)
+
+    # ---- E-commerce Unit Economics ----
+    contribution_margin = Column(Float)
+    platform_fee_ratio = Column(Float)
+    inventory_blockage_ratio = Column(Float)
+    order_profitability = Column(Float)
+    return_rate_percentage = Column(Float)
+    debt_service_ratio = Column(Float)
+
+    # ---- Health & Credit ----
+    health_score = Column(Integer)
+    health_status = Column(String)
+    credit_risk = Column(String)
+    # version of the scoring rules behind them, see services/scoring.py
+    rules_version = Column(Integer, nullable=True, index=True)
+    # hash of the credit models file behind credit_risk, see services/credit.py
+    credit_model_version = Column(String, nullable=True)
+
+    # Ai Explanation
+    # ---- Monthly series and trend indicators, see services/trends.py ----
+    trends = Column(JSON, nullable=True)
+
+    ai_explanation = Column(JSON, nullable=True)
+    language = Column(String, nullable=True)
+
+    # ---- Deduplication ----
+    content_hash = Column(String(64), nullable=True, index=True)
+
+    # ---- Portfolio ----
+    business_id = Column(String, nullable=True, index=True)
+
+    # ---- Incremental updates: sums, counts and histograms of every row so far ----
+    statistics = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database.db import Base
+
+"""
+This class is used to store the quantile sketch of one metric over all the saved analyses
+of one industry and year, for peer benchmarking
+It is used in the services/peers.py file to rank a new analysis against its peers
+"""
+
+class PeerMetricSketch(Base):
+    __tablename__ = "peer_metric_sketches"
+    __table_args__ = (UniqueConstraint("industry", "year", "metric"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    industry = Column(String, nullable=False)
+    year = Column(Integer, nullable=False)
+    metric = Column(String, nullable=False)
+
+    # ---- Analyses added so far, and their centroids, see QuantileSketch ----
+    count = Column(Integer, nullable=False, default=0)
+    sketch = Column(JSON, nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
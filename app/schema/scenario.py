@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+"""
+This class is used to store a what-if request on a saved analysis
+grid maps a parameter (an aggregated column, or all_costs) to the percentage changes
+to try, and every combination is run; scenarios lists more combinations one by one
+It is used in the main.py file by the scenario endpoint
+"""
+class ScenarioRequest(BaseModel):
+    grid: dict[str, list[float]] = {}
+    scenarios: list[dict[str, float]] = []
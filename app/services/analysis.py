@@ -1,311 +1,402 @@
-import pandas as pd
-
-
-"""
-This file is used to analyze the financial data of all the business types
-"""
-
-
-## Agricultral Industry Analysis
-
-def analyze_agricultural_financials(df: pd.DataFrame):
-
-
-    total_revenue = float(df["total_revenue"].sum())
-    total_expenses = float(df["total_expenses"].sum())
-
-    profit = total_revenue - total_expenses
-    profit_margin = profit / total_revenue * 100 if total_revenue > 0 else 0
-
-    avg_inventory_loss_pct = float(df["inventory_loss_percentage"].mean())
-    inventory_loss_value = total_revenue * (avg_inventory_loss_pct / 100)
-    effective_profit = profit - inventory_loss_value
-
-
-    cost_pressure_ratio = total_expenses / total_revenue if total_revenue > 0 else 0
-    debt_service_ratio = (
-        float(df["emi_amount"].mean()) / total_revenue
-        if total_revenue > 0 else 0
-    )
-
-    # ---- Storage Risk (mode-based) ----
-    def calculate_storage_risk(storage_type: str) -> int:
-        storage_type = storage_type.lower()
-        if storage_type == "open":
-            return 80
-        elif storage_type == "warehouse":
-            return 50
-        elif storage_type == "cold_storage":
-            return 20
-        return 50
-
-    dominant_storage = df["storage_type"].mode()[0]
-    storage_risk_score = calculate_storage_risk(dominant_storage)
-
-    season = df["season"].mode()[0]
-    primary_crop_type = df["primary_crop_type"].mode()[0]
-
-    return {
-        "total_revenue": round(total_revenue, 2),
-        "total_expenses": round(total_expenses, 2),
-        "profit": round(profit, 2),
-        "profit_margin": round(profit_margin, 2),
-        "effective_profit": round(effective_profit, 2),
-        "inventory_loss_percentage": round(avg_inventory_loss_pct, 2),
-        "inventory_loss_value": round(inventory_loss_value, 2),
-        "cost_pressure_ratio": round(cost_pressure_ratio, 2),
-        "debt_service_ratio": round(debt_service_ratio, 2),
-        "season": str(season),
-        "primary_crop_type": str(primary_crop_type),
-        "storage_risk_score": storage_risk_score
-    }
-
-
-## Manufacturing Industry Analysis
-
-def analyze_manufacturing_financials(df:pd.DataFrame):
-
-    total_revenue = float(df['total_revenue'].sum())
-
-    total_raw_material_cost = float(df['raw_material_cost'].sum())
-    total_labor_cost = float(df['direct_labor_cost'].sum())
-
-    if 'overhead_cost' in df.columns:
-        total_overhead_cost = float(df['overhead_cost'].sum())
-    else:
-        required_overhead_cols = {
-            "power_cost",
-            "rent_cost",
-            "maintenance_cost"
-        }
-
-        if required_overhead_cols.issubset(df.columns):
-            total_overhead_cost = float(df[list(required_overhead_cols)].sum().sum())
-        else:
-            missing_cols = required_overhead_cols - set(df.columns)
-            raise ValueError(f"Missing required columns for overhead cost calculation. Expected: {required_overhead_cols}")
-    
-    total_expenses = float(total_raw_material_cost + total_labor_cost + total_overhead_cost)
-
-    profit = float(total_revenue - total_expenses)
-    profit_margin = float(profit / total_revenue * 100 if total_revenue > 0 else 0)
-
-    actual_prod = float(df["actual_production"].sum())
-    capacity_prod = float(df["production_capacity"].sum())
-
-    capacity_utilization = (
-        actual_prod / capacity_prod
-        if capacity_prod > 0
-        else 0.0
-    )
-
-    avg_rm_inventory = float(df["raw_material_inventory_value"].mean())
-    avg_wip_inventory = float(df["wip_inventory_value"].mean())
-    avg_fg_inventory = float(df["finished_goods_inventory_value"].mean())
-
-    inventory_blockage_ratio = (
-        (avg_rm_inventory + avg_wip_inventory + avg_fg_inventory)
-        / total_revenue
-        if total_revenue > 0
-        else 0.0
-    )
-
-
-    cost_efficiency_ratio = total_expenses / total_revenue if total_revenue > 0 else 0.0
-    debt_service_ratio = float(df["emi_amount"].mean()) / total_revenue if total_revenue > 0 else 0.0
-
-    return {
-        "total_revenue": round(total_revenue, 2),
-        "total_expenses": round(total_expenses, 2),
-        "profit": round(profit, 2),
-        "profit_margin": round(profit_margin * 100, 2),
-
-        "capacity_utilization": round(capacity_utilization * 100, 2),
-        "inventory_blockage_ratio": round(inventory_blockage_ratio, 2),
-        "cost_efficiency_ratio": round(cost_efficiency_ratio, 2),
-        "debt_service_ratio": round(debt_service_ratio, 2)
-    }
-    
-
-# Retail Industry Analysis
-
-import pandas as pd
-
-def analyze_retail_financials(df: pd.DataFrame):
-
-    # ---- Aggregations ----
-    total_revenue = float(df["total_revenue"].sum())
-
-    total_cogs = float(df["cost_of_goods_sold"].sum())
-    total_store_cost = float(df["store_operating_cost"].sum())
-    total_logistics_cost = float(df["logistics_cost"].sum())
-    total_loss_cost = float(df["loss_cost"].sum())
-
-    total_expenses = (
-        total_cogs +
-        total_store_cost +
-        total_logistics_cost +
-        total_loss_cost
-    )
-
-    profit = total_revenue - total_expenses
-    profit_margin = profit / total_revenue if total_revenue > 0 else 0
-
-    # ---- Inventory Metrics (Average) ----
-    avg_inventory_value = float(df["inventory_value"].mean())
-
-    inventory_blockage_ratio = float(avg_inventory_value / total_revenue)
-
-    inventory_risk_score = (
-        float(df["slow_moving_inventory_percentage"].mean()) * 0.6 +
-        float(df["expired_inventory_percentage"].mean()) * 0.4
-    )
-
-    # ---- Discount & Loss ----
-    discount_impact_ratio = float(df["discount_percentage"].mean()) / 100
-    loss_cost_ratio = total_loss_cost / total_revenue
-
-    # ---- Debt ----
-    debt_service_ratio = float(df["emi_amount"].mean()) / total_revenue
-
-    return {
-        "total_revenue": round(total_revenue, 2),
-        "total_expenses": round(total_expenses, 2),
-        "profit": round(profit, 2),
-        "profit_margin": round(profit_margin * 100, 2),
-
-        "inventory_blockage_ratio": round(inventory_blockage_ratio, 2),
-        "inventory_risk_score": round(inventory_risk_score, 2),
-        "discount_impact_ratio": round(discount_impact_ratio, 2),
-        "loss_cost_ratio": round(loss_cost_ratio, 2),
-        "debt_service_ratio": round(debt_service_ratio, 2)
-    }
-
-
-# Logistic Industry Analysis
-
-
-
-def analyze_logistics_financials(df: pd.DataFrame):
-
-    # ---- Aggregations ----
-    total_revenue = float(df["total_revenue"].sum())
-
-    total_fuel_cost = float(df["fuel_cost"].sum())
-    total_driver_wages = float(df["driver_wages"].sum())
-    total_vehicle_cost = float(df["vehicle_cost"].sum())
-    total_warehouse_cost = float(df["warehouse_cost"].sum())
-    total_other_cost = float(df["other_operating_cost"].sum())
-
-    total_expenses = float(
-        total_fuel_cost +
-        total_driver_wages +
-        total_vehicle_cost +
-        total_warehouse_cost +
-        total_other_cost
-    )
-
-    profit = total_revenue - total_expenses
-    profit_margin = profit / total_revenue if total_revenue > 0 else 0
-
-    # ---- Logistics Metrics ----
-    total_distance = float(df["distance_km"].sum())
-    total_shipments = float(df["total_shipments"].sum())
-
-    cost_per_km = float(total_expenses / total_distance if total_distance > 0 else 0)
-    revenue_per_shipment = float(total_revenue / total_shipments if total_shipments > 0 else 0)
-
-    fuel_cost_ratio = float(total_fuel_cost / total_expenses if total_expenses > 0 else 0)
-
-    asset_blockage_ratio = float(
-        df["avg_goods_in_transit_value"].mean() / total_revenue
-        if total_revenue > 0 else 0
-    )
-
-    on_time_delivery_percentage = float(df["on_time_delivery_percentage"].mean())
-
-    debt_service_ratio = float(df["emi_amount"].mean() / total_revenue if total_revenue > 0 else 0)
-
-    return {
-        "total_revenue": round(total_revenue, 2),
-        "total_expenses": round(total_expenses, 2),
-        "profit": round(profit, 2),
-        "profit_margin": round(profit_margin * 100, 2),
-
-        "cost_per_km": round(cost_per_km, 2),
-        "revenue_per_shipment": round(revenue_per_shipment, 2),
-        "fuel_cost_ratio": round(fuel_cost_ratio, 2),
-        "asset_blockage_ratio": round(asset_blockage_ratio, 2),
-        "on_time_delivery_percentage": round(on_time_delivery_percentage, 2),
-        "debt_service_ratio": round(debt_service_ratio, 2)
-    }
-
-# Ecommerce Industry Analysis
-
-import pandas as pd
-
-def analyze_ecommerce_financials(df: pd.DataFrame):
-
-    # ---- Aggregations ----
-    total_revenue = float(df["total_revenue"].sum())
-    total_orders = float(df["orders_count"].sum())
-
-    total_cogs = float(df["cost_of_goods_sold"].sum())
-    total_fulfillment = float(df["fulfillment_cost"].sum())
-    total_shipping = float(df["shipping_cost"].sum())
-    total_payment = float(df["payment_gateway_cost"].sum())
-    total_marketing = float(df["marketing_cost"].sum())
-    total_returns = float(df["returns_cost"].sum())
-
-    total_expenses = float(
-        total_cogs +
-        total_fulfillment +
-        total_shipping +
-        total_payment +
-        total_marketing +
-        total_returns
-    )
-
-    profit = float(total_revenue - total_expenses)
-    profit_margin = float(profit / total_revenue if total_revenue > 0 else 0)
-
-    # ---- E-commerce Metrics ----
-    contribution_margin = float(
-        total_revenue -
-        (total_shipping + total_payment + total_returns)
-    )
-
-    platform_fee_ratio = float(df["platform_fee_percentage"].mean() / 100)
-
-    inventory_blockage_ratio = float(
-        df["inventory_value"].mean() / total_revenue
-        if total_revenue > 0 else 0
-    )
-
-    order_profitability = float(
-        profit / total_orders
-        if total_orders > 0 else 0
-    )
-
-    return_rate_percentage = float(df["return_rate_percentage"].mean())
-
-    debt_service_ratio = (
-        float(df["emi_amount"].mean() / total_revenue)
-        if total_revenue > 0 else 0
-    )
-
-    return {
-        "total_revenue": round(total_revenue, 2),
-        "total_expenses": round(total_expenses, 2),
-        "profit": round(profit, 2),
-        "profit_margin": round(profit_margin * 100, 2),
-
-        "contribution_margin": round(contribution_margin, 2),
-        "platform_fee_ratio": round(platform_fee_ratio, 2),
-        "inventory_blockage_ratio": round(inventory_blockage_ratio, 2),
-        "order_profitability": round(order_profitability, 2),
-        "return_rate_percentage": round(return_rate_percentage, 2),
-        "debt_service_ratio": round(debt_service_ratio, 2)
-    }
-
-
+import numpy as np
+import pandas as pd
+from app.services.metrics import METRIC_PLANS, run_metric_plan
+
+
+"""
+This file is used to analyze the financial data of all the business types
+"""
+
+
+"""
+Every industry analysis works on the same aggregates: column sums, column means and
+the most frequent value of a few text columns. The *_AGGREGATIONS specs list which
+columns need which aggregate, and the *_metrics functions turn those aggregates into
+the final ratios by running the industry's plan from app.services.metrics. This lets
+a full DataFrame and a chunked upload share one formula.
+"""
+
+def column_totals(df, columns: list):
+    """
+    Sums and non-null counts of numeric columns, reading each column once with no
+    copies. A plain sum is NaN only when the column has NaN, and only then is the
+    column summed again without them. Gives the same floats as Series.sum / count.
+
+    Parsed uploads keep one array per column, so this beats gathering them into one
+    2D array first (see benchmarks/aggregation.py).
+    """
+    sums = {}
+    counts = {}
+    for col in columns:
+        values = np.asarray(df[col], dtype="float64")
+        total = np.add.reduce(values)
+
+        if np.isnan(total):
+            present = ~np.isnan(values)
+            total = np.add.reduce(values, where=present)
+            counts[col] = int(np.count_nonzero(present))
+        else:
+            counts[col] = len(values)
+
+        sums[col] = float(total)
+
+    return sums, counts
+
+
+def column_mode(values):
+    if isinstance(values, np.ndarray):
+        # object array of the small CSV fast path: np.unique sorts, so this is Series.mode()[0]
+        uniques, counts = np.unique(values[~pd.isna(values)], return_counts=True)
+        return uniques[counts.argmax()]
+
+    # Categories are sorted, so the first highest count is Series.mode()[0]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(values.cat.categories))
+        if counts.any() and values.cat.categories.is_monotonic_increasing:
+            return values.cat.categories[counts.argmax()]
+    return values.mode()[0]
+
+
+def aggregate_financials(df, aggregations: dict):
+    """
+    Aggregates of a DataFrame, or of a dict of NumPy arrays (the small CSV fast path)
+    """
+    numeric = [
+        col for col in dict.fromkeys([*aggregations["sum"], *aggregations["mean"]])
+        if col in df
+    ]
+    sums, counts = column_totals(df, numeric)
+
+    return {
+        "sum": {
+            col: sums[col]
+            for col in aggregations["sum"] if col in df
+        },
+        "mean": {
+            col: sums[col] / counts[col] if counts[col] else float("nan")
+            for col in aggregations["mean"] if col in df
+        },
+        "mode": {
+            col: column_mode(df[col])
+            for col in aggregations["mode"] if col in df
+        },
+    }
+
+
+def column_histogram(values):
+    """
+    {value: count} of the non-empty cells of a text column, as plain Python values
+    """
+    if isinstance(values, np.ndarray):
+        uniques, counts = np.unique(values[~pd.isna(values)], return_counts=True)
+    elif isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(values.cat.categories))
+        uniques = values.cat.categories
+    else:
+        value_counts = values.value_counts(sort=False)
+        uniques, counts = value_counts.index, value_counts.to_numpy()
+
+    return {value: count for value, count in zip(uniques.tolist(), counts.tolist()) if count}
+
+
+def _mode_of_histogram(histogram: dict):
+    # Same tie-break as Series.mode()[0]: highest count, then smallest value
+    top = max(histogram.values())
+    return sorted(value for value, count in histogram.items() if count == top)[0]
+
+
+class RunningAggregator:
+    """
+    Keeps running sums, non-null counts and value histograms for the columns in an
+    aggregations spec, so an upload can be analyzed chunk by chunk.
+    result() returns the same shape as aggregate_financials.
+
+    Those are sufficient statistics: statistics() gives them as plain JSON, and
+    RunningAggregator(aggregations, statistics) carries on from them, so new rows
+    can be added to a saved analysis without reading its earlier rows again.
+    """
+
+    def __init__(self, aggregations: dict, statistics: dict | None = None):
+        statistics = statistics or {}
+        self.aggregations = aggregations
+        self.sums = dict(statistics.get("sum", {}))
+        self.counts = dict(statistics.get("count", {}))
+        self.histograms = {col: dict(histogram) for col, histogram in statistics.get("histogram", {}).items()}
+        self.first_row = {"year": statistics["year"]} if statistics.get("year") is not None else None
+        self.rows = statistics.get("rows", 0)
+
+    def update(self, chunk):
+        """
+        chunk is a DataFrame, or a dict of NumPy arrays from the small CSV fast path
+        """
+        if isinstance(chunk, pd.DataFrame):
+            rows = len(chunk)
+            first_row = chunk.iloc[0].to_dict() if rows else None
+        else:
+            rows = len(next(iter(chunk.values()), ()))
+            first_row = {col: values[0] for col, values in chunk.items()} if rows else None
+
+        if not rows:
+            return
+
+        if self.first_row is None:
+            self.first_row = first_row
+        self.rows += rows
+
+        numeric = [
+            col for col in dict.fromkeys([*self.aggregations["sum"], *self.aggregations["mean"]])
+            if col in chunk
+        ]
+        sums, counts = column_totals(chunk, numeric)
+        for col in numeric:
+            self.sums[col] = self.sums.get(col, 0.0) + sums[col]
+            self.counts[col] = self.counts.get(col, 0) + counts[col]
+
+        for col in self.aggregations["mode"]:
+            if col in chunk:
+                histogram = self.histograms.setdefault(col, {})
+                for value, count in column_histogram(chunk[col]).items():
+                    histogram[value] = histogram.get(value, 0) + count
+
+    def result(self):
+        return {
+            "sum": {
+                col: self.sums[col]
+                for col in self.aggregations["sum"] if col in self.sums
+            },
+            "mean": {
+                col: self.sums[col] / self.counts[col] if self.counts[col] else float("nan")
+                for col in self.aggregations["mean"] if col in self.sums
+            },
+            "mode": {
+                col: _mode_of_histogram(self.histograms[col])
+                for col in self.aggregations["mode"] if self.histograms.get(col)
+            },
+        }
+
+    def statistics(self):
+        return {
+            "rows": self.rows,
+            "year": int(self.first_row["year"]) if self.first_row else None,
+            "sum": dict(self.sums),
+            "count": dict(self.counts),
+            "histogram": {col: dict(histogram) for col, histogram in self.histograms.items()},
+        }
+
+
+"""
+Grouped analysis: the same aggregates for every group of an upload, e.g. every (year, month)
+of a multi-period upload or every business_id of a portfolio, with one groupby per chunk.
+Groups keep the order in which they first appear in the file, and rows with an empty key
+are skipped.
+"""
+
+class GroupedAggregator:
+    """
+    Running per-group sums, non-null counts, value counts (for the modes) and first
+    values, merged chunk by chunk with index alignment, so the cost does not grow
+    with the number of groups. result() returns (groups, aggregates): a DataFrame
+    of key values with one row per group, and aggregates shaped like
+    aggregate_financials but holding one NumPy array per column, in group order.
+    """
+
+    def __init__(self, aggregations: dict, keys: list, first: list = ()):
+        self.aggregations = aggregations
+        self.keys = list(keys)
+        self.first_columns = list(first)
+        self.sizes = None
+        self.sums = None
+        self.counts = None
+        self.firsts = None
+        self.value_counts = {}
+
+    def update(self, chunk: pd.DataFrame):
+        if chunk.empty:
+            return
+
+        numeric = [
+            col for col in dict.fromkeys([*self.aggregations["sum"], *self.aggregations["mean"]])
+            if col in chunk.columns
+        ]
+        first_columns = [col for col in self.first_columns if col in chunk.columns]
+        grouped = chunk.groupby(self.keys, observed=True, sort=False)
+
+        sizes = grouped.size()
+        sums = grouped[numeric].sum()
+        counts = grouped[numeric].count()
+        firsts = grouped[first_columns].first()
+
+        if self.sizes is None:
+            self.sizes, self.sums, self.counts, self.firsts = sizes, sums, counts, firsts
+        else:
+            new_groups = ~sizes.index.isin(self.sizes.index)
+            order = self.sizes.index.append(sizes.index[new_groups])
+
+            self.sizes = self.sizes.add(sizes, fill_value=0).reindex(order)
+            self.sums = self.sums.add(sums, fill_value=0).reindex(order)
+            self.counts = self.counts.add(counts, fill_value=0).reindex(order)
+            self.firsts = pd.concat([self.firsts, firsts[new_groups]])
+
+        for col in self.aggregations["mode"]:
+            # a key column is its own mode within a group
+            if col not in chunk.columns or col in self.keys:
+                continue
+            value_counts = chunk.groupby([*self.keys, col], observed=True).size()
+            value_counts = value_counts[value_counts > 0]
+            if col in self.value_counts:
+                value_counts = self.value_counts[col].add(value_counts, fill_value=0)
+            self.value_counts[col] = value_counts
+
+    def result(self):
+        order = self.sizes.index
+        groups = order.to_frame(index=False)
+
+        # Most frequent value of each group, smallest value first on ties like Series.mode()[0]
+        modes = {}
+        for col in self.aggregations["mode"]:
+            if col in self.keys:
+                modes[col] = groups[col].to_numpy()
+            elif col in self.value_counts:
+                counts = self.value_counts[col].rename("count").reset_index()
+                counts = counts.sort_values(["count", col], ascending=[False, True], kind="stable")
+                modes[col] = counts.drop_duplicates(self.keys).set_index(self.keys)[col].reindex(order).to_numpy()
+
+        counts = self.counts.to_numpy(dtype="float64")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = np.where(counts > 0, self.sums.to_numpy(dtype="float64") / counts, np.nan)
+        means = dict(zip(self.sums.columns, means.T))
+
+        return groups, {
+            "sum": {
+                col: self.sums[col].to_numpy(dtype="float64")
+                for col in self.aggregations["sum"] if col in self.sums.columns
+            },
+            "mean": {
+                col: means[col]
+                for col in self.aggregations["mean"] if col in means
+            },
+            "mode": modes,
+            "first": {
+                col: self.firsts[col].to_numpy()
+                for col in self.firsts.columns
+            },
+            "count": dict(zip(self.counts.columns, counts.T)),
+            "rows": self.sizes.to_numpy(dtype="int64"),
+        }
+
+
+def aggregate_financials_by_group(df: pd.DataFrame, aggregations: dict, keys: list, first: list = ()):
+    aggregator = GroupedAggregator(aggregations, keys, first)
+    aggregator.update(df)
+    if aggregator.sizes is None:
+        return pd.DataFrame(columns=keys), None
+    return aggregator.result()
+
+
+def split_groups(groups: pd.DataFrame, aggregates: dict):
+    """
+    Turns the columnar result of a GroupedAggregator into [(group, aggregates)] with
+    plain values, the shape aggregate_financials gives for a single group
+    """
+    if aggregates is None:
+        return []
+
+    return [
+        (
+            groups.iloc[i].to_dict(),
+            {
+                "sum": {col: float(values[i]) for col, values in aggregates["sum"].items()},
+                "mean": {col: float(values[i]) for col, values in aggregates["mean"].items()},
+                "mode": {col: values[i] for col, values in aggregates["mode"].items()},
+            },
+        )
+        for i in range(len(groups))
+    ]
+
+
+def aggregate_financials_by_period(df: pd.DataFrame, aggregations: dict, keys: list):
+    """
+    Returns [(period, aggregates)] where period is {key: value} and aggregates
+    has the same shape as aggregate_financials
+    """
+    return split_groups(*aggregate_financials_by_group(df, aggregations, keys))
+
+
+def broadcast_aggregates(aggregates: dict, size: int, factors: dict | None = None):
+    """
+    The aggregates of one business as arrays of size entries, e.g. one per simulated
+    path or scenario, with each column in factors multiplied by its array of factors
+    """
+    factors = factors or {}
+    return {
+        "sum": {col: value * factors[col] if col in factors else np.full(size, value, dtype="float64") for col, value in aggregates["sum"].items()},
+        "mean": {col: value * factors[col] if col in factors else np.full(size, value, dtype="float64") for col, value in aggregates["mean"].items()},
+        "mode": {col: np.full(size, value, dtype=object) for col, value in aggregates["mode"].items()},
+    }
+
+
+## Agricultral Industry Analysis
+
+AGRICULTURE_AGGREGATIONS = METRIC_PLANS["agriculture"]["aggregations"]
+
+
+def agricultural_metrics(aggregates: dict):
+    return run_metric_plan(METRIC_PLANS["agriculture"], aggregates)
+
+
+def analyze_agricultural_financials(df: pd.DataFrame):
+    return agricultural_metrics(aggregate_financials(df, AGRICULTURE_AGGREGATIONS))
+
+
+## Manufacturing Industry Analysis
+
+MANUFACTURING_AGGREGATIONS = METRIC_PLANS["manufacturing"]["aggregations"]
+
+
+def manufacturing_metrics(aggregates: dict):
+    return run_metric_plan(METRIC_PLANS["manufacturing"], aggregates)
+
+
+def analyze_manufacturing_financials(df:pd.DataFrame):
+    return manufacturing_metrics(aggregate_financials(df, MANUFACTURING_AGGREGATIONS))
+
+
+# Retail Industry Analysis
+
+RETAIL_AGGREGATIONS = METRIC_PLANS["retail"]["aggregations"]
+
+
+def retail_metrics(aggregates: dict):
+    return run_metric_plan(METRIC_PLANS["retail"], aggregates)
+
+
+def analyze_retail_financials(df: pd.DataFrame):
+    return retail_metrics(aggregate_financials(df, RETAIL_AGGREGATIONS))
+
+
+# Logistic Industry Analysis
+
+LOGISTICS_AGGREGATIONS = METRIC_PLANS["logistics"]["aggregations"]
+
+
+def logistics_metrics(aggregates: dict):
+    return run_metric_plan(METRIC_PLANS["logistics"], aggregates)
+
+
+def analyze_logistics_financials(df: pd.DataFrame):
+    return logistics_metrics(aggregate_financials(df, LOGISTICS_AGGREGATIONS))
+
+
+# Ecommerce Industry Analysis
+
+ECOMMERCE_AGGREGATIONS = METRIC_PLANS["ecommerce"]["aggregations"]
+
+
+def ecommerce_metrics(aggregates: dict):
+    return run_metric_plan(METRIC_PLANS["ecommerce"], aggregates)
+
+
+def analyze_ecommerce_financials(df: pd.DataFrame):
+    return ecommerce_metrics(aggregate_financials(df, ECOMMERCE_AGGREGATIONS))
@@ -1,52 +1,288 @@
-
-"""
-This file is used to calculate the credit risk of all the business types
-"""
-
-# Agriculture Industry Credit Risk
-
-def agriculture_credit_risk(health_score):
-    if health_score >= 75:
-        return "Low"
-    elif health_score >= 50:
-        return "Medium"
-    return "High"
-
-
-# Manufacturing Industry Credit Risk
-def manufacturing_credit_risk(health_score):
-    if health_score >= 75:
-        return "Low"
-    elif health_score >= 50:
-        return "Medium"
-    return "High"
-
-
-# Retail Industry Credit Risk
-
-def retail_credit_risk(health_score):
-    if health_score >= 75:
-        return "Low"
-    elif health_score >= 50:
-        return "Medium"
-    return "High"
-
-
-# Logistics Industry Credit Risk
-
-def logistics_credit_risk(health_score):
-    if health_score >= 75:
-        return "Low"
-    elif health_score >= 50:
-        return "Medium"
-    return "High"
-
-
-# Ecommerce Industry Credit Risk
-
-def ecommerce_credit_risk(health_score):
-    if health_score >= 75:
-        return "Low"
-    elif health_score >= 50:
-        return "Medium"
-    return "High"
+import os
+import json
+import math
+import hashlib
+import numpy as np
+from app.services.metrics import METRIC_PLANS, check_metric_names
+from app.services.scoring import score_tiers
+
+
+"""
+This file is used to calculate the credit risk of all the business types
+"""
+
+# Agriculture Industry Credit Risk
+
+def agriculture_credit_risk(health_score, metrics: dict | None = None):
+    risk = model_credit_risk("agriculture", metrics)
+    if risk is not None:
+        return risk
+
+    if health_score >= 75:
+        return "Low"
+    elif health_score >= 50:
+        return "Medium"
+    return "High"
+
+
+# Manufacturing Industry Credit Risk
+def manufacturing_credit_risk(health_score, metrics: dict | None = None):
+    risk = model_credit_risk("manufacturing", metrics)
+    if risk is not None:
+        return risk
+
+    if health_score >= 75:
+        return "Low"
+    elif health_score >= 50:
+        return "Medium"
+    return "High"
+
+
+# Retail Industry Credit Risk
+
+def retail_credit_risk(health_score, metrics: dict | None = None):
+    risk = model_credit_risk("retail", metrics)
+    if risk is not None:
+        return risk
+
+    if health_score >= 75:
+        return "Low"
+    elif health_score >= 50:
+        return "Medium"
+    return "High"
+
+
+# Logistics Industry Credit Risk
+
+def logistics_credit_risk(health_score, metrics: dict | None = None):
+    risk = model_credit_risk("logistics", metrics)
+    if risk is not None:
+        return risk
+
+    if health_score >= 75:
+        return "Low"
+    elif health_score >= 50:
+        return "Medium"
+    return "High"
+
+
+# Ecommerce Industry Credit Risk
+
+def ecommerce_credit_risk(health_score, metrics: dict | None = None):
+    risk = model_credit_risk("ecommerce", metrics)
+    if risk is not None:
+        return risk
+
+    if health_score >= 75:
+        return "Low"
+    elif health_score >= 50:
+        return "Medium"
+    return "High"
+
+
+# Batch mode: the same cutoffs for a whole array of health scores, e.g. a portfolio
+
+CREDIT_CUTOFFS = [(75, "Low"), (50, "Medium")]
+HIGHEST_RISK = "High"
+
+# Risk of each tier of score_tiers(scores, CREDIT_CUTOFFS)
+CREDIT_LABELS = np.array([risk for _, risk in CREDIT_CUTOFFS] + [HIGHEST_RISK])
+
+
+def credit_risks(health_scores, metrics: dict | None = None, industry: str | None = None):
+    """
+    Vectorized *_credit_risk: one risk per health score, equal to the scalar one.
+    With the metrics arrays and the industry, the industry's default model decides
+    where it can, see below.
+    """
+    risks = CREDIT_LABELS[score_tiers(np.asarray(health_scores), CREDIT_CUTOFFS)]
+
+    model = CREDIT_MODELS.get(industry)
+    if model is None or metrics is None:
+        return risks
+
+    values = {feature: np.asarray(metrics[feature], dtype="float64") for feature in model["features"]}
+    with np.errstate(over="ignore", invalid="ignore"):
+        scores = np.broadcast_to(model_score(model, values), risks.shape)
+    tiers = sum((scores >= cutoff).astype("int64") for cutoff, _ in model["cutoffs"])
+    return np.where(np.isfinite(scores), CREDIT_LABELS[tiers], risks)
+
+
+def agriculture_credit_risks(health_scores, metrics: dict | None = None):
+    return credit_risks(health_scores, metrics, "agriculture")
+
+
+def manufacturing_credit_risks(health_scores, metrics: dict | None = None):
+    return credit_risks(health_scores, metrics, "manufacturing")
+
+
+def retail_credit_risks(health_scores, metrics: dict | None = None):
+    return credit_risks(health_scores, metrics, "retail")
+
+
+def logistics_credit_risks(health_scores, metrics: dict | None = None):
+    return credit_risks(health_scores, metrics, "logistics")
+
+
+def ecommerce_credit_risks(health_scores, metrics: dict | None = None):
+    return credit_risks(health_scores, metrics, "ecommerce")
+
+
+## Probability of default models
+
+"""
+An industry can have a logistic model of the probability of default (PD) of a business
+from its metrics, trained offline on stored analyses by train_credit_models.py and
+loaded once at startup. Where there is one, the PD cutoffs below give the credit risk.
+An industry without a model, or a business with a metric the model cannot use (missing,
+NaN or infinite), gets the health score cutoffs above, so the result is always the same
+for the same metrics.
+
+The logistic model is monotone in its linear score, so the PD cutoffs become cutoffs on
+the score once at load time, and inference is one multiply-add per metric, the same
+floating point steps for one business (floats) and for a batch (NumPy arrays).
+"""
+
+# The trained models, one entry per industry, and the PD at or above which a business
+# moves to the next risk
+CREDIT_MODELS_PATH = os.getenv("CREDIT_MODELS_PATH", os.path.join(os.path.dirname(__file__), "credit_models.json"))
+PD_CUTOFFS = [(0.05, "Low"), (0.15, "Medium")]
+
+
+def compile_credit_model(industry: str, entry: dict):
+    """
+    A trained model entry ({"features", "mean", "scale", "coefficients", "intercept",
+    "pd_cutoffs"}) as the linear score inference runs: score = bias + sum(weight * metric),
+    with the standardization folded into the weights and the PD cutoffs into score cutoffs
+    """
+    features = list(entry["features"])
+    check_metric_names(industry, features)
+    text = [feature for feature in features if feature not in METRIC_PLANS[industry]["numeric"]]
+    if text:
+        raise ValueError(f"{industry}: credit model features must be numeric metrics, not {text}")
+
+    coefficients = np.asarray(entry["coefficients"], dtype="float64")
+    mean = np.asarray(entry["mean"], dtype="float64")
+    scale = np.asarray(entry["scale"], dtype="float64")
+    if not len(features) == len(coefficients) == len(mean) == len(scale) or not (scale > 0).all():
+        raise ValueError(f"{industry}: credit model needs one coefficient, mean and positive scale per feature")
+
+    cutoffs = [(float(pd), risk) for pd, risk in entry.get("pd_cutoffs", PD_CUTOFFS)]
+    if [risk for _, risk in cutoffs] != [risk for _, risk in CREDIT_CUTOFFS]:
+        raise ValueError(f"{industry}: credit model cutoffs must give the risks {[risk for _, risk in CREDIT_CUTOFFS]}")
+    if not all(0 < pd < 1 for pd, _ in cutoffs) or [pd for pd, _ in cutoffs] != sorted(pd for pd, _ in cutoffs):
+        raise ValueError(f"{industry}: credit model cutoffs must be increasing probabilities")
+
+    weights = coefficients / scale
+    return {
+        "features": features,
+        "weights": weights.tolist(),
+        "bias": float(entry["intercept"] - weights @ mean),
+        "cutoffs": [(math.log(pd / (1 - pd)), risk) for pd, risk in cutoffs],
+        "trained_on": entry.get("trained_on"),
+    }
+
+
+def load_credit_models(path: str = CREDIT_MODELS_PATH):
+    """
+    (compiled models, version) of the models file: the version is a hash of the file,
+    stored with every analysis so a retrained model is told apart from the one before.
+    No models and version None when there is no file yet.
+    """
+    if not os.path.exists(path):
+        return {}, None
+    with open(path, "rb") as file:
+        content = file.read()
+    models = json.loads(content)
+    compiled = {industry: compile_credit_model(industry, entry) for industry, entry in models.items()}
+    return compiled, hashlib.sha256(content).hexdigest()[:16]
+
+
+CREDIT_MODELS, CREDIT_MODELS_VERSION = load_credit_models()
+
+
+def model_score(model: dict, metrics: dict):
+    # the linear score of one business (floats) or many (arrays)
+    score = model["bias"]
+    for weight, feature in zip(model["weights"], model["features"]):
+        score = score + weight * metrics[feature]
+    return score
+
+
+def default_probabilities(industry: str, metrics: dict):
+    """
+    PD of one business or many from the industry's model, None without a model
+    """
+    model = CREDIT_MODELS.get(industry)
+    if model is None:
+        return None
+    values = {feature: np.asarray(metrics[feature], dtype="float64") for feature in model["features"]}
+    with np.errstate(over="ignore", invalid="ignore"):
+        return 1 / (1 + np.exp(-model_score(model, values)))
+
+
+def model_credit_risk(industry: str, metrics: dict | None):
+    """
+    Credit risk of one business from the industry's model, None when the rules decide
+    """
+    model = CREDIT_MODELS.get(industry)
+    if model is None or metrics is None or any(metrics.get(feature) is None for feature in model["features"]):
+        return None
+
+    score = model_score(model, metrics)
+    if not math.isfinite(score):
+        return None
+    return str(CREDIT_LABELS[sum(score >= cutoff for cutoff, _ in model["cutoffs"])])
+
+
+## Training
+
+# L2 penalty on the standardized coefficients, and the Newton steps of the fit
+CREDIT_MODEL_L2 = 1.0
+CREDIT_MODEL_ITERATIONS = 50
+
+
+def fit_credit_model(industry: str, metrics: dict, defaults, features: list | None = None):
+    """
+    Fits the logistic model of an industry to the metrics arrays of stored analyses
+    and defaults (1 when the business defaulted, else 0), by Newton's method with a
+    small L2 penalty on standardized metrics. Rows with a non-finite metric are left
+    out. Returns the entry to save in the models file.
+    """
+    features = features or METRIC_PLANS[industry]["numeric"]
+    check_metric_names(industry, features)
+
+    x = np.column_stack([np.asarray(metrics[feature], dtype="float64") for feature in features])
+    y = np.asarray(defaults, dtype="float64")
+    usable = np.isfinite(x).all(axis=1) & np.isfinite(y)
+    x, y = x[usable], y[usable]
+    if len(np.unique(y)) < 2:
+        raise ValueError(f"{industry}: training needs both defaulted and repaid businesses")
+
+    mean = x.mean(axis=0)
+    scale = x.std(axis=0)
+    scale[scale == 0] = 1.0
+    design = np.column_stack([np.ones(len(x)), (x - mean) / scale])
+
+    penalty = np.full(design.shape[1], CREDIT_MODEL_L2)
+    penalty[0] = 0.0
+    beta = np.zeros(design.shape[1])
+    for _ in range(CREDIT_MODEL_ITERATIONS):
+        pd = 1 / (1 + np.exp(-(design @ beta)))
+        gradient = design.T @ (pd - y) + penalty * beta
+        hessian = (design * (pd * (1 - pd))[:, None]).T @ design + np.diag(penalty)
+        step = np.linalg.solve(hessian, gradient)
+        beta -= step
+        if np.abs(step).max() < 1e-10:
+            break
+
+    return {
+        "features": features,
+        "mean": mean.tolist(),
+        "scale": scale.tolist(),
+        "coefficients": beta[1:].tolist(),
+        "intercept": float(beta[0]),
+        "pd_cutoffs": [list(cutoff) for cutoff in PD_CUTOFFS],
+        "trained_on": int(len(y)),
+        "default_rate": round(float(y.mean()), 4),
+    }
@@ -0,0 +1,192 @@
+import os
+from functools import lru_cache
+import numpy as np
+from app.services.trends import MONTH_NAMES, MonthlyAggregator, monthly_metrics
+
+
+"""
+This file is used to forecast the monthly cash flow of a business: revenue, expenses and
+EMI coverage for the next 3-12 months, from the monthly series of its uploads.
+
+Revenue and expenses are projected with damped-trend Holt exponential smoothing. For fixed
+smoothing parameters the method is linear in the series, so every (alpha, beta) pair of
+the grid becomes a matrix once per series length, and fitting many businesses at once is a
+few matrix products: the one-step errors of every pair for every series, the best pair per
+series, and its final level and trend. No Python loop runs per data point or per business.
+"""
+
+
+# Months to forecast on the analyze responses, and the range callers may ask for
+FORECAST_HORIZON = int(os.getenv("FORECAST_HORIZON", 6))
+MIN_FORECAST_HORIZON = 3
+MAX_FORECAST_HORIZON = 12
+
+# Shortest monthly history we forecast from: two months to start level and trend, one to fit
+MIN_HISTORY_MONTHS = 3
+
+# Parameter grid of the fit: alpha smooths the level, beta the trend
+LEVEL_SMOOTHING = np.linspace(0.1, 0.9, 9)
+TREND_SMOOTHING = np.array([0.01, 0.05, 0.1, 0.2, 0.3])
+
+# Damping of the trend per month ahead, so a few strong months do not compound for a year
+TREND_DAMPING = 0.98
+
+
+@lru_cache(maxsize=64)
+def smoothing_operators(length: int):
+    """
+    Damped Holt smoothing as linear maps of a series of this length, for every pair of
+    the parameter grid. Returns (alphas, betas, one_step, level, trend):
+    one_step[p, t] @ series is the forecast of series[t] made after series[t - 1],
+    level[p] @ series and trend[p] @ series are the states after the last month.
+    Level and trend start from the first two months, so one_step is 0 before t = 2.
+    """
+    alphas = np.repeat(LEVEL_SMOOTHING, len(TREND_SMOOTHING))[:, None]
+    betas = np.tile(TREND_SMOOTHING, len(LEVEL_SMOOTHING))[:, None]
+    pairs = len(alphas)
+
+    level = np.zeros((pairs, length))
+    trend = np.zeros((pairs, length))
+    level[:, 1] = 1
+    trend[:, 1] = 1
+    trend[:, 0] = -1
+    one_step = np.zeros((pairs, length, length))
+
+    # one step per month of the series length, for all pairs at once; the fit itself has no loop
+    for t in range(2, length):
+        one_step[:, t] = level + TREND_DAMPING * trend
+        new_level = (1 - alphas) * one_step[:, t]
+        new_level[:, t] += alphas[:, 0]
+        trend = betas * (new_level - level) + (1 - betas) * TREND_DAMPING * trend
+        level = new_level
+
+    return alphas[:, 0], betas[:, 0], one_step, level, trend
+
+
+def smoothing_forecasts(series: np.ndarray, horizon: int):
+    """
+    Fits every row of series, shaped (rows, months), with the pair of the grid that
+    has the smallest one-step squared error. Returns (forecasts, alphas, betas) with
+    forecasts shaped (rows, horizon).
+    """
+    alphas, betas, one_step, level, trend = smoothing_operators(series.shape[1])
+
+    # (rows, pairs, months) one-step forecasts, scored from the third month on
+    fitted = np.tensordot(series, one_step[:, 2:], axes=([1], [2]))
+    errors = ((fitted - series[:, None, 2:]) ** 2).sum(axis=2)
+    best = errors.argmin(axis=1)
+
+    rows = np.arange(len(series))
+    final_level = (series @ level.T)[rows, best]
+    final_trend = (series @ trend.T)[rows, best]
+
+    damping = np.cumsum(TREND_DAMPING ** np.arange(1, horizon + 1))
+    forecasts = final_level[:, None] + final_trend[:, None] * damping
+    return forecasts, alphas[best], betas[best]
+
+
+def check_horizon(horizon: int):
+    if not MIN_FORECAST_HORIZON <= horizon <= MAX_FORECAST_HORIZON:
+        raise ValueError(f"Forecast horizon must be between {MIN_FORECAST_HORIZON} and {MAX_FORECAST_HORIZON} months")
+
+
+def monthly_history(metrics_function, monthly: MonthlyAggregator, aggregations: dict, modes: dict):
+    """
+    (periods, revenue, expenses, emi) per month of a business, or None when its
+    months cannot be placed. emi is the average EMI of the month.
+    """
+    series = monthly_metrics(metrics_function, monthly, aggregations, modes)
+    if series is None:
+        return None
+
+    periods, metrics, aggregates = series
+    months = len(periods)
+    return (
+        periods,
+        np.broadcast_to(np.asarray(metrics["total_revenue"], dtype="float64"), months),
+        np.broadcast_to(np.asarray(metrics["total_expenses"], dtype="float64"), months),
+        aggregates["mean"].get("emi_amount", np.full(months, np.nan)),
+    )
+
+
+def _money(values):
+    return [round(value, 2) for value in values.tolist()]
+
+
+def cash_flow_forecasts(histories: list, horizon: int = FORECAST_HORIZON):
+    """
+    One forecast per monthly_history, None where there is no history or less than
+    MIN_HISTORY_MONTHS months of it. Histories of the same length are fitted together,
+    revenue and expenses in the same matrices. Months missing inside a history are
+    not filled in: the series goes from one reported month to the next.
+
+    The EMI is the one of the last reported month, as loan installments are fixed.
+    EMI coverage is net cash flow over EMI, so below 1 the month does not pay its EMI.
+    """
+    check_horizon(horizon)
+
+    by_length = {}
+    for i, history in enumerate(histories):
+        if history is not None and len(history[0]) >= MIN_HISTORY_MONTHS:
+            by_length.setdefault(len(history[0]), []).append(i)
+
+    forecasts = [None] * len(histories)
+    for length, members in by_length.items():
+        revenue = np.stack([histories[i][1] for i in members])
+        expenses = np.stack([histories[i][2] for i in members])
+
+        projected, alphas, betas = smoothing_forecasts(np.concatenate([revenue, expenses]), horizon)
+        projected = np.maximum(projected, 0.0)
+        revenue_forecasts, expense_forecasts = np.split(projected, 2)
+        net_forecasts = revenue_forecasts - expense_forecasts
+
+        emis = np.array([histories[i][3][-1] for i in members], dtype="float64")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            coverage = np.where(emis[:, None] > 0, net_forecasts / emis[:, None], np.nan)
+
+        last_periods = np.array([histories[i][0][-1] for i in members])
+        periods = last_periods[:, None] + np.arange(1, horizon + 1)
+
+        for row, i in enumerate(members):
+            months = periods[row].tolist()
+            emi = round(float(emis[row]), 2) if emis[row] > 0 else None
+            covered = coverage[row][np.isfinite(coverage[row])]
+
+            forecasts[i] = {
+                "horizon": horizon,
+                "history_months": length,
+                "method": "damped_holt",
+                "smoothing": {
+                    "revenue": {"alpha": round(float(alphas[row]), 2), "beta": round(float(betas[row]), 2)},
+                    "expenses": {
+                        "alpha": round(float(alphas[len(members) + row]), 2),
+                        "beta": round(float(betas[len(members) + row]), 2),
+                    },
+                },
+                "months": [
+                    {
+                        "period": f"{key // 12}-{key % 12 + 1:02d}",
+                        "year": key // 12,
+                        "month": MONTH_NAMES[key % 12],
+                        "revenue": revenue_value,
+                        "expenses": expense_value,
+                        "net_cash_flow": net_value,
+                        "emi": emi,
+                        "emi_coverage": round(coverage_value, 2) if emi is not None else None,
+                    }
+                    for key, revenue_value, expense_value, net_value, coverage_value in zip(
+                        months,
+                        _money(revenue_forecasts[row]),
+                        _money(expense_forecasts[row]),
+                        _money(net_forecasts[row]),
+                        coverage[row].tolist(),
+                    )
+                ],
+                "total_revenue": round(float(revenue_forecasts[row].sum()), 2),
+                "total_expenses": round(float(expense_forecasts[row].sum()), 2),
+                "net_cash_flow": round(float(net_forecasts[row].sum()), 2),
+                "min_emi_coverage": round(float(covered.min()), 2) if len(covered) else None,
+                "months_below_emi": int((covered < 1).sum()) if emi is not None else None,
+            }
+
+    return forecasts
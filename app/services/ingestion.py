@@ -0,0 +1,651 @@
+import os
+import io
+import gzip
+import codecs
+import re
+import csv
+import hashlib
+import shutil
+import tempfile
+import weakref
+import zipfile
+import numpy as np
+import pandas as pd
+from pandas._libs.parsers import STR_NA_VALUES
+from openpyxl import load_workbook
+from app.services.analysis import RunningAggregator
+from app.services.trends import MonthlyAggregator
+from app.services.analysis import GroupedAggregator, split_groups
+from app.services.validation import RowValidator, check_totals
+from app.services.templates import TEMPLATE_MAP, REQUIRED_COLUMNS, OPTIONAL_COLUMNS, CATEGORY_COLUMNS
+
+
+"""
+This file is used to read the uploaded CSV / XLSX / Parquet / Arrow files of all the business types
+"""
+
+
+# Rows per chunk when an upload is analyzed in streaming mode
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 50000))
+
+# CSV parser backend per deployment: "pyarrow" (multithreaded) or "c" (pandas default)
+CSV_ENGINE = os.getenv("CSV_ENGINE", "pyarrow").lower()
+
+"""
+Upload limits. Uploads above UPLOAD_SPOOL_THRESHOLD_BYTES are spooled to disk by the
+multipart parser, and above UPLOAD_STREAM_THRESHOLD_BYTES they are analyzed in streaming
+mode unless the client asks otherwise. Byte and row caps can be set per industry with
+UPLOAD_MAX_BYTES_<INDUSTRY> / UPLOAD_MAX_ROWS_<INDUSTRY>, e.g. UPLOAD_MAX_ROWS_RETAIL.
+"""
+UPLOAD_SPOOL_THRESHOLD_BYTES = int(os.getenv("UPLOAD_SPOOL_THRESHOLD_BYTES", 1024 * 1024))
+UPLOAD_STREAM_THRESHOLD_BYTES = int(os.getenv("UPLOAD_STREAM_THRESHOLD_BYTES", 20 * 1024 * 1024))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 200 * 1024 * 1024))
+UPLOAD_MAX_ROWS = int(os.getenv("UPLOAD_MAX_ROWS", 5000000))
+UPLOAD_MAX_BATCH_BYTES = int(os.getenv("UPLOAD_MAX_BATCH_BYTES", 1024 * 1024 * 1024))
+
+UPLOAD_LIMITS = {
+    industry: {
+        "max_bytes": int(os.getenv(f"UPLOAD_MAX_BYTES_{industry.upper()}", UPLOAD_MAX_BYTES)),
+        "max_rows": int(os.getenv(f"UPLOAD_MAX_ROWS_{industry.upper()}", UPLOAD_MAX_ROWS)),
+    }
+    for industry in TEMPLATE_MAP
+}
+
+
+class UploadTooLarge(Exception):
+    """
+    Raised when an upload goes over a byte or row cap, the endpoints answer 413
+    """
+
+
+def file_size(file):
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+def read_csv(source, engine: str = CSV_ENGINE, **kwargs):
+    """
+    pd.read_csv with the configured engine. pyarrow cannot read in chunks, and
+    any file it fails on is re-read with the C engine, which also raises the
+    usual pandas error messages. Both engines return the same frame.
+    """
+    if engine == "pyarrow" and PYARROW_AVAILABLE and "chunksize" not in kwargs:
+        try:
+            return pd.read_csv(source, engine="pyarrow", **kwargs)
+        except Exception:
+            if hasattr(source, "seek"):
+                source.seek(0)
+
+    return pd.read_csv(source, engine="c", **kwargs)
+
+
+def blank_lines_before_header(file, compression: str | None = None):
+    """
+    Counts the blank lines above a CSV header. read_csv only skips them while it
+    skips every blank line, so the reads that keep blank rows skip these up front.
+    """
+    file.seek(0)
+    if compression == "gzip":
+        stream = gzip.GzipFile(fileobj=file, mode="rb")
+    elif compression == "zstd":
+        import zstandard
+        stream = zstandard.ZstdDecompressor().stream_reader(file, closefd=False)
+    else:
+        stream = file
+    head = stream.read(64 * 1024)
+    file.seek(0)
+
+    count = 0
+    for line in head.removeprefix(codecs.BOM_UTF8).split(b"\n")[:-1]:
+        if line.strip(b"\r"):
+            break
+        count += 1
+    return count
+
+
+# XLSX reader for whole-file reads: calamine (Rust) when installed, else openpyxl
+try:
+    import python_calamine
+    XLSX_ENGINE = "calamine"
+except ImportError:
+    XLSX_ENGINE = "openpyxl"
+
+
+def iter_xlsx_rows(file):
+    """
+    Yields the rows of the first sheet as tuples of cell values, using openpyxl
+    read_only mode so the workbook is never loaded as a full object model
+    """
+    file.seek(0)
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+"""
+A parse plan lists the only columns we read for an industry and their dtypes,
+so pandas skips every other column of a wide export and does no type inference.
+Money, counts and percentages are float64 (sums stay exact), text is category.
+"""
+
+def build_parse_plan(industry: str):
+    columns = REQUIRED_COLUMNS[industry] | OPTIONAL_COLUMNS.get(industry, set())
+
+    return {
+        "columns": columns,
+        "dtype": {
+            col: "category" if col in CATEGORY_COLUMNS else "float64"
+            for col in columns
+        },
+    }
+
+
+PARSE_PLANS = {industry: build_parse_plan(industry) for industry in TEMPLATE_MAP}
+
+
+UPLOAD_FORMATS = {
+    ".csv": "csv",
+    ".csv.gz": "csv",
+    ".csv.zst": "csv",
+    ".xlsx": "xlsx",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+}
+
+
+# Compressed CSVs are decompressed on the fly by the parser, chunk by chunk
+UPLOAD_COMPRESSION = {
+    ".csv.gz": "gzip",
+    ".csv.zst": "zstd",
+}
+
+
+def upload_format(filename: str):
+    for extension, file_format in UPLOAD_FORMATS.items():
+        if filename.lower().endswith(extension):
+            return file_format
+    raise ValueError("Unsupported file format")
+
+
+def upload_compression(filename: str):
+    for extension, compression in UPLOAD_COMPRESSION.items():
+        if filename.lower().endswith(extension):
+            return compression
+    return None
+
+
+"""
+Small CSVs, most uploads being 12-24 monthly rows, skip pandas: the csv module parses them
+straight into one NumPy array per column, and they are checked, hashed and aggregated from
+those arrays, with no DataFrame. Anything the fast path is unsure of (ragged rows, duplicate
+headers, cells that are not plain numbers) is left to pandas, so both paths give the same
+aggregates and content hash. UPLOAD_FAST_PATH_MAX_ROWS=0 turns the fast path off.
+"""
+UPLOAD_FAST_PATH_MAX_ROWS = int(os.getenv("UPLOAD_FAST_PATH_MAX_ROWS", 250))
+UPLOAD_FAST_PATH_MAX_BYTES = int(os.getenv("UPLOAD_FAST_PATH_MAX_BYTES", 128 * 1024))
+
+# Cells read_csv reads as empty
+NA_STRINGS = frozenset(STR_NA_VALUES)
+PLAIN_NUMBER = re.compile(r"[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?")
+
+
+def parse_small_csv(data: bytes, plan: dict):
+    """
+    Returns (header, arrays, positions) with one float64 or object array per plan
+    column and the place of every row under the header, blank lines included, or
+    None when the file has to go through read_csv
+    """
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return None
+
+    # blank lines are skipped, but still counted in the row positions
+    lines = [(n, row) for n, row in enumerate(csv.reader(io.StringIO(text))) if row]
+    if len(lines) < 2:
+        return None
+
+    (start, header), lines = lines[0], lines[1:]
+    if len(set(header)) != len(header) or any(len(row) != len(header) for _, row in lines):
+        return None
+
+    # so are rows with every plan column empty, see FinancialUpload._drop_blank_rows
+    used = [i for i, col in enumerate(header) if col in plan["columns"]]
+    if used:
+        lines = [(n, row) for n, row in lines if not all(row[i] in NA_STRINGS for i in used)]
+    positions = np.array([n - start - 1 for n, _ in lines], dtype="int64")
+    rows = [row for _, row in lines]
+
+    arrays = {}
+    for i, col in enumerate(header):
+        if col not in plan["columns"]:
+            continue
+
+        cells = [row[i] for row in rows]
+        if plan["dtype"][col] == "category":
+            arrays[col] = np.array([np.nan if cell in NA_STRINGS else cell for cell in cells], dtype=object)
+            continue
+
+        cells = ["nan" if cell in NA_STRINGS else cell for cell in cells]
+        if not all(cell == "nan" or PLAIN_NUMBER.fullmatch(cell) for cell in cells):
+            return None
+        arrays[col] = np.array(cells, dtype="float64")
+
+    return header, arrays, positions
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def spool_to_disk(file, suffix: str):
+    """
+    Copies an upload to a named temp file, so Parquet / Arrow can be memory-mapped
+    """
+    file.seek(0)
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    with os.fdopen(fd, "wb") as out:
+        shutil.copyfileobj(file, out)
+    return path
+
+
+def spool_batch_uploads(files, directory: str, extensions: tuple):
+    """
+    Writes every upload, and every member of an uploaded .zip, into directory.
+    Returns (path, original filename) pairs for the batch worker processes.
+    Stops with UploadTooLarge once the extracted files go over UPLOAD_MAX_BATCH_BYTES.
+    """
+    jobs = []
+    total = 0
+
+    for i, upload in enumerate(files):
+        name = upload.filename.lower()
+        upload.file.seek(0)
+
+        if name.endswith(".zip"):
+            with zipfile.ZipFile(upload.file) as archive:
+                for j, member in enumerate(archive.infolist()):
+                    if member.is_dir() or not member.filename.lower().endswith(extensions):
+                        continue
+
+                    # file_size is read from the archive directory, before anything is extracted
+                    total += member.file_size
+                    if total > UPLOAD_MAX_BATCH_BYTES:
+                        raise UploadTooLarge(f"Batch is larger than {UPLOAD_MAX_BATCH_BYTES} bytes once extracted")
+
+                    path = os.path.join(directory, f"{i}_{j}_{os.path.basename(member.filename)}")
+                    with archive.open(member) as source, open(path, "wb") as out:
+                        shutil.copyfileobj(source, out)
+                    jobs.append((path, member.filename))
+
+        elif name.endswith(extensions):
+            total += file_size(upload.file)
+            if total > UPLOAD_MAX_BATCH_BYTES:
+                raise UploadTooLarge(f"Batch is larger than {UPLOAD_MAX_BATCH_BYTES} bytes")
+
+            path = os.path.join(directory, f"{i}_{os.path.basename(name)}")
+            with open(path, "wb") as out:
+                shutil.copyfileobj(upload.file, out)
+            jobs.append((path, upload.filename))
+
+        else:
+            raise ValueError(f"Unsupported file type: {upload.filename}")
+
+    return jobs
+
+
+class ContentHasher:
+    """
+    SHA-256 of the parsed upload: only the plan columns, in name order, after dtype
+    conversion. The same data hashes the same whatever the file format, compression,
+    column order or extra columns, and whether it was read whole or in chunks.
+    """
+
+    def __init__(self, columns):
+        self.columns = sorted(columns)
+        self.digests = {col: hashlib.sha256() for col in self.columns}
+
+    def update(self, chunk):
+        # chunk is a DataFrame, or a dict of arrays from the small CSV fast path
+        for col in self.columns:
+            values = chunk[col]
+            if values.dtype == "category":
+                values = values.astype(object)
+
+            # one uint64 per row, so chunk boundaries do not change the digest
+            hashes = pd.util.hash_array(np.asarray(values))
+            self.digests[col].update(hashes.tobytes())
+
+    def hexdigest(self):
+        digest = hashlib.sha256()
+        for col in self.columns:
+            digest.update(col.encode())
+            digest.update(self.digests[col].digest())
+        return digest.hexdigest()
+
+
+class FinancialUpload:
+    """
+    Wraps an uploaded file so the endpoints can check its columns before the
+    body is parsed, and then aggregate it, either from one DataFrame or chunk
+    by chunk (stream=True). In streaming mode peak memory is bounded by
+    UPLOAD_CHUNK_SIZE rows instead of the file size, for every format.
+    Parquet / Arrow uploads are spooled to a temp file and memory-mapped.
+
+    stream=None picks streaming for compressed CSVs and for files larger than
+    UPLOAD_STREAM_THRESHOLD_BYTES. The industry byte cap is checked before anything
+    is parsed, the row cap as soon as the row count is known (Parquet / Arrow
+    metadata) or, when streaming, on the chunk that crosses it.
+
+    Every row is checked against the industry's column rules while it is
+    aggregated, see validation.py.
+    """
+
+    def __init__(self, file, filename: str, industry: str, stream: bool | None = None, chunksize: int = UPLOAD_CHUNK_SIZE):
+        self.file = file
+        self.filename = filename.lower()
+        self.format = upload_format(self.filename)
+        self.compression = upload_compression(self.filename)
+        self.industry = industry
+        self.plan = PARSE_PLANS[industry]
+        self.typed = True
+        self.limits = UPLOAD_LIMITS[industry]
+        self.chunksize = chunksize
+        self.df = None
+        self.path = None
+        self.content_hash = None
+        self.statistics = None
+        self.monthly = None
+        self.rows = 0
+        self.arrays = None
+        self.skiprows = 0
+
+        self.size = file_size(self.file)
+        if self.size > self.limits["max_bytes"]:
+            raise UploadTooLarge(f"Upload is {self.size} bytes, the limit is {self.limits['max_bytes']} bytes")
+
+        if stream is None:
+            stream = self.compression is not None or self.size > UPLOAD_STREAM_THRESHOLD_BYTES
+        self.stream = stream
+
+        if self.format == "csv":
+            try:
+                self.skiprows = blank_lines_before_header(self.file, self.compression)
+            except ImportError:
+                raise ValueError("Zstandard uploads need the zstandard package installed on the server")
+
+        small_csv = self._parse_small_csv() if self.format == "csv" else None
+        if small_csv is not None:
+            header, self.arrays, self.array_positions = small_csv
+            self._check_rows(len(self.array_positions))
+        elif self.format == "csv":
+            header = pd.read_csv(self.file, nrows=0, compression=self.compression).columns
+        elif self.format == "xlsx":
+            rows = iter_xlsx_rows(self.file)
+            header = next(rows, ())
+            rows.close()
+        else:
+            if not PYARROW_AVAILABLE:
+                raise ValueError("Parquet and Arrow uploads need pyarrow installed on the server")
+
+            self.path = spool_to_disk(self.file, os.path.splitext(self.filename)[1])
+            weakref.finalize(self, _remove_quietly, self.path)
+            header = self._arrow_schema().names
+            self._check_rows(self._arrow_num_rows())
+
+        self.columns = [col for col in header if col in self.plan["columns"]]
+
+    def _parse_small_csv(self):
+        if self.stream or self.compression is not None or self.size > UPLOAD_FAST_PATH_MAX_BYTES:
+            return None
+
+        data = self.file.read()
+        self.file.seek(0)
+        # header + rows, counted before parsing anything
+        if data.count(b"\n") > UPLOAD_FAST_PATH_MAX_ROWS + 1:
+            return None
+        return parse_small_csv(data, self.plan)
+
+    def _read_csv(self, **kwargs):
+        self.file.seek(0)
+        return read_csv(
+            self.file,
+            usecols=self.columns,
+            dtype=self._dtypes(),
+            compression=self.compression,
+            # blank lines are read as empty rows, so the index is each row's place in the file
+            skip_blank_lines=False,
+            skiprows=self.skiprows or None,
+            **kwargs
+        )
+
+    def _dtypes(self):
+        # object dtypes when re-reading a file the plan dtypes failed on, to find the bad cells
+        if not self.typed:
+            return {col: object for col in self.columns}
+        return {col: self.plan["dtype"][col] for col in self.columns}
+
+    def _read_xlsx(self):
+        self.file.seek(0)
+        return pd.read_excel(self.file, engine=XLSX_ENGINE, usecols=self.columns, dtype=self._dtypes())
+
+    def _xlsx_chunks(self):
+        rows = iter_xlsx_rows(self.file)
+        header = list(next(rows))
+        positions = [header.index(col) for col in self.columns]
+
+        batch, index = [], []
+        for n, row in enumerate(rows):
+            values = [row[i] if i < len(row) else None for i in positions]
+            # blank rows carry nothing for the aggregates
+            if all(value is None for value in values):
+                continue
+
+            batch.append(values)
+            index.append(n)
+            if len(batch) == self.chunksize:
+                yield pd.DataFrame(batch, columns=self.columns, index=index).astype(self._dtypes())
+                batch, index = [], []
+
+        if batch:
+            yield pd.DataFrame(batch, columns=self.columns, index=index).astype(self._dtypes())
+
+    def _arrow_schema(self):
+        if self.format == "parquet":
+            return pyarrow.parquet.read_schema(self.path, memory_map=True)
+        return pyarrow.ipc.open_file(pyarrow.memory_map(self.path)).schema
+
+    def _arrow_num_rows(self):
+        if self.format == "parquet":
+            return pyarrow.parquet.read_metadata(self.path, memory_map=True).num_rows
+        reader = pyarrow.ipc.open_file(pyarrow.memory_map(self.path))
+        return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+    def _check_rows(self, rows: int):
+        if rows > self.limits["max_rows"]:
+            raise UploadTooLarge(f"Upload has more than {self.limits['max_rows']} rows")
+
+    def _arrow_frame(self, table, start: int = 0):
+        frame = table.to_pandas().astype(self._dtypes())
+        frame.index = pd.RangeIndex(start, start + len(frame))
+        return frame
+
+    def _read_arrow(self):
+        # Memory-mapped with column projection: only the plan columns are materialized
+        if self.format == "parquet":
+            table = pyarrow.parquet.read_table(self.path, columns=self.columns, memory_map=True)
+        else:
+            table = pyarrow.ipc.open_file(pyarrow.memory_map(self.path)).read_all().select(self.columns)
+        return self._arrow_frame(table)
+
+    def _arrow_chunks(self):
+        if self.format == "parquet":
+            parquet_file = pyarrow.parquet.ParquetFile(self.path, memory_map=True)
+            start = 0
+            for batch in parquet_file.iter_batches(batch_size=self.chunksize, columns=self.columns):
+                yield self._arrow_frame(batch, start)
+                start += batch.num_rows
+            return
+
+        reader = pyarrow.ipc.open_file(pyarrow.memory_map(self.path))
+        start = 0
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i).select(self.columns)
+            for offset in range(0, batch.num_rows, self.chunksize):
+                yield self._arrow_frame(batch.slice(offset, self.chunksize), start + offset)
+            start += batch.num_rows
+
+    def _drop_blank_rows(self, frame):
+        """
+        Drops the rows with every plan column empty, like the blank lines they
+        usually are. The index keeps the place of every row under the header, so
+        the validation report still gives the file's row numbers.
+        """
+        if not len(frame.columns):
+            return frame
+        blank = frame.isna().all(axis=1).to_numpy()
+        return frame[~blank] if blank.any() else frame
+
+    def frame(self):
+        if self.df is None:
+            if self.arrays is not None:
+                # same frame read_csv gives, for the callers that need one
+                self.df = pd.DataFrame(self.arrays, columns=self.columns, index=self.array_positions).astype(self._dtypes())
+            elif self.format == "xlsx":
+                self.df = self._drop_blank_rows(self._read_xlsx())
+            elif self.format == "csv":
+                self.df = self._drop_blank_rows(self._read_csv())
+            else:
+                self.df = self._drop_blank_rows(self._read_arrow())
+            self._check_rows(len(self.df))
+        return self.df
+
+    def _chunks(self):
+        if self.format == "xlsx":
+            return self._xlsx_chunks()
+        elif self.format == "csv":
+            return self._read_csv(chunksize=self.chunksize)
+        return self._arrow_chunks()
+
+    def chunks(self):
+        if not self.stream:
+            yield self.frame()
+            return
+
+        rows = 0
+        for chunk in self._chunks():
+            chunk = self._drop_blank_rows(chunk)
+            if not len(chunk):
+                continue
+            rows += len(chunk)
+            # abort mid-file, the rest of the upload is never parsed
+            self._check_rows(rows)
+            yield chunk
+
+    def _raise_type_errors(self):
+        validator = RowValidator(self.industry, header_row=self.skiprows + 1)
+        self.typed, self.df = False, None
+        try:
+            for chunk in self.chunks():
+                validator.update(chunk)
+        finally:
+            self.typed, self.df = True, None
+        validator.raise_for_errors()
+
+    def checked_chunks(self):
+        """
+        chunks() through the row checks. Raises UploadValidationError with every
+        failed row once the whole file is read. When a value does not even parse
+        with the plan dtypes, the file is read again as text to report every bad cell.
+        """
+        validator = RowValidator(self.industry, header_row=self.skiprows + 1)
+        try:
+            for chunk in self.chunks():
+                validator.update(chunk)
+                yield chunk
+        except ValueError:
+            self._raise_type_errors()
+            raise
+        validator.raise_for_errors()
+
+    def aggregate(self, aggregations: dict, statistics: dict | None = None):
+        """
+        Returns (aggregates, year) where year is taken from the first row.
+        Sets content_hash, rows, statistics and the monthly totals in the same pass.
+        With the statistics of a saved analysis, the aggregates cover its rows and
+        this upload's rows.
+        """
+        hasher = ContentHasher(self.columns)
+        aggregator = RunningAggregator(aggregations, statistics)
+        self.monthly = MonthlyAggregator(aggregations, (statistics or {}).get("monthly"))
+        previous_rows = aggregator.rows
+
+        if self.arrays is not None:
+            # small CSV: the same checks, hash and aggregates straight from the arrays
+            validator = RowValidator(self.industry, header_row=self.skiprows + 1)
+            validator.update(self.arrays, self.array_positions)
+            validator.raise_for_errors()
+            chunks = [self.arrays]
+        else:
+            # one frame unless streaming, the loop runs the checks to the end
+            chunks = self.checked_chunks()
+
+        for chunk in chunks:
+            aggregator.update(chunk)
+            self.monthly.update(chunk)
+            hasher.update(chunk)
+
+        self.rows = aggregator.rows - previous_rows
+        if not self.rows:
+            raise ValueError("Uploaded file has no data rows")
+
+        aggregates = aggregator.result()
+        check_totals(aggregates)
+        self.content_hash = hasher.hexdigest()
+        self.statistics = {**aggregator.statistics(), "monthly": self.monthly.statistics()}
+        return aggregates, self.statistics["year"]
+
+    def aggregate_groups(self, aggregations: dict, keys: list, first: list = (), by_month: bool = False):
+        """
+        Returns (groups, aggregates) of a GroupedAggregator over the whole upload.
+        by_month also sums every group per (year, month) in the same pass, without
+        modes, and returns those groups and aggregates after the others.
+        """
+        aggregators = [GroupedAggregator(aggregations, keys, first)]
+        if by_month:
+            aggregators.append(GroupedAggregator({**aggregations, "mode": []}, [*keys, "year", "month"]))
+
+        for chunk in self.checked_chunks():
+            for aggregator in aggregators:
+                aggregator.update(chunk)
+            self.rows += len(chunk)
+
+        if aggregators[0].sizes is None:
+            raise ValueError("Uploaded file has no data rows")
+        if by_month and aggregators[1].sizes is None:
+            return (*aggregators[0].result(), None, None)
+        return tuple(item for aggregator in aggregators for item in aggregator.result())
+
+    def aggregate_periods(self, aggregations: dict, keys: list):
+        """
+        Returns [(period, aggregates)], one per distinct value of the key columns
+        """
+        return split_groups(*self.aggregate_groups(aggregations, keys))
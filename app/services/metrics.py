@@ -0,0 +1,423 @@
+import numpy as np
+
+
+"""
+This file is used to define the metrics of every business type in one place. The registry
+below is compiled once, at import, into a plan per industry: the columns to read, the
+aggregate each one needs, the formulas in the order they depend on each other and the
+metrics with their rounding and response group. Analysis, persistence, peer benchmarks,
+the AI prompts and the GET routes all run from these plans, so a new metric is one
+entry here and one column on the industry's model.
+"""
+
+
+"""
+The formulas take aggregates of plain floats for one business, or of NumPy arrays for
+many businesses at once (portfolio mode). ratio() and round_metric() keep the exact
+float behaviour of the scalar code and broadcast over arrays.
+"""
+
+def ratio(numerator, denominator, default=0):
+    """
+    numerator / denominator when the denominator is positive, else default
+    """
+    if np.ndim(numerator) == 0 and np.ndim(denominator) == 0:
+        return numerator / denominator if denominator > 0 else default
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(np.asarray(denominator) > 0, numerator / np.asarray(denominator), default)
+
+
+def round_metric(value, digits: int = 2):
+    """
+    round(value, digits) for floats and arrays. np.round can land on the other
+    side of a .5 tie than round(), so values next to a tie are redone with round().
+    """
+    if np.ndim(value) == 0:
+        return round(value, digits)
+
+    value = np.asarray(value, dtype="float64")
+    rounded = np.round(value, digits)
+
+    scaled = value * 10 ** digits
+    with np.errstate(invalid="ignore"):
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= np.abs(scaled) * 1e-15 + 1e-9
+    for i in np.flatnonzero(near_tie):
+        rounded[i] = round(float(value[i]), digits)
+
+    return rounded
+
+
+# Risk of the dominant storage type, 50 when unknown
+STORAGE_RISK = {"open": 80, "warehouse": 50, "cold_storage": 20}
+
+
+def storage_risk(storage_type):
+    if np.ndim(storage_type) == 0:
+        return STORAGE_RISK.get(storage_type.lower(), 50)
+    return np.array([STORAGE_RISK.get(str(value).lower(), 50) for value in storage_type])
+
+
+def as_text(value):
+    if np.ndim(value) == 0:
+        return str(value)
+    return np.asarray(value).astype(str)
+
+
+def overhead_cost(values: dict):
+    # overhead comes either as one column or split in three
+    if "overhead_cost" in values:
+        return values["overhead_cost"]
+
+    required_overhead_cols = {
+        "power_cost",
+        "rent_cost",
+        "maintenance_cost"
+    }
+
+    if required_overhead_cols.issubset(values):
+        return sum(values[col] for col in required_overhead_cols)
+    raise ValueError(f"Missing required columns for overhead cost calculation. Expected: {required_overhead_cols}")
+
+
+"""
+METRIC_REGISTRY[industry] holds:
+  aggregations  the columns to aggregate, as "sum", "mean" and "mode" lists
+  values        (name, formula) pairs run in order; a formula reads the aggregates by
+                column name and the values before it by their name
+  metrics       (name, digits, group) in response order. digits rounds the metric,
+                None keeps it as it is and TEXT marks a text metric. group is the
+                section of the GET response it is shown in, None for the top level
+  cost_columns  the summed columns a cost shock scales (stress tests and scenarios)
+"""
+
+TEXT = "text"
+
+
+METRIC_REGISTRY = {
+
+    ## Agricultral Industry
+
+    "agriculture": {
+        "aggregations": {
+            "sum": ["total_revenue", "total_expenses"],
+            "mean": ["inventory_loss_percentage", "emi_amount"],
+            "mode": ["storage_type", "season", "primary_crop_type"],
+        },
+        "values": [
+            ("profit", lambda v: v["total_revenue"] - v["total_expenses"]),
+            ("profit_margin", lambda v: ratio(v["profit"], v["total_revenue"]) * 100),
+            ("inventory_loss_value", lambda v: v["total_revenue"] * (v["inventory_loss_percentage"] / 100)),
+            ("effective_profit", lambda v: v["profit"] - v["inventory_loss_value"]),
+            ("cost_pressure_ratio", lambda v: ratio(v["total_expenses"], v["total_revenue"])),
+            ("debt_service_ratio", lambda v: ratio(v["emi_amount"], v["total_revenue"])),
+            # ---- Storage Risk (mode-based) ----
+            ("storage_risk_score", lambda v: storage_risk(v["storage_type"])),
+            ("season", lambda v: as_text(v["season"])),
+            ("primary_crop_type", lambda v: as_text(v["primary_crop_type"])),
+        ],
+        "metrics": [
+            ("total_revenue", 2, "financials"),
+            ("total_expenses", 2, "financials"),
+            ("profit", 2, "financials"),
+            ("profit_margin", 2, "financials"),
+            ("effective_profit", 2, "financials"),
+            ("inventory_loss_percentage", 2, "risks"),
+            ("inventory_loss_value", 2, "risks"),
+            ("cost_pressure_ratio", 2, "risks"),
+            ("debt_service_ratio", 2, "risks"),
+            ("season", TEXT, None),
+            ("primary_crop_type", TEXT, None),
+            ("storage_risk_score", None, "risks"),
+        ],
+        "cost_columns": ["total_expenses"],
+    },
+
+    ## Manufacturing Industry
+
+    "manufacturing": {
+        "aggregations": {
+            "sum": [
+                "total_revenue",
+                "raw_material_cost", "direct_labor_cost",
+                "overhead_cost", "power_cost", "rent_cost", "maintenance_cost",
+                "actual_production", "production_capacity",
+            ],
+            "mean": [
+                "raw_material_inventory_value",
+                "wip_inventory_value",
+                "finished_goods_inventory_value",
+                "emi_amount",
+            ],
+            "mode": [],
+        },
+        "values": [
+            ("total_overhead_cost", overhead_cost),
+            ("total_expenses", lambda v: v["raw_material_cost"] + v["direct_labor_cost"] + v["total_overhead_cost"]),
+            ("profit", lambda v: v["total_revenue"] - v["total_expenses"]),
+            ("profit_margin", lambda v: ratio(v["profit"], v["total_revenue"], 0.0) * 100 * 100),
+            ("capacity_utilization", lambda v: ratio(v["actual_production"], v["production_capacity"], 0.0) * 100),
+            ("inventory_blockage_ratio", lambda v: ratio(
+                v["raw_material_inventory_value"] + v["wip_inventory_value"] + v["finished_goods_inventory_value"],
+                v["total_revenue"],
+                0.0
+            )),
+            ("cost_efficiency_ratio", lambda v: ratio(v["total_expenses"], v["total_revenue"], 0.0)),
+            ("debt_service_ratio", lambda v: ratio(v["emi_amount"], v["total_revenue"], 0.0)),
+        ],
+        "metrics": [
+            ("total_revenue", 2, "financials"),
+            ("total_expenses", 2, "financials"),
+            ("profit", 2, "financials"),
+            ("profit_margin", 2, "financials"),
+            ("capacity_utilization", 2, "operations"),
+            ("inventory_blockage_ratio", 2, "operations"),
+            ("cost_efficiency_ratio", 2, "operations"),
+            ("debt_service_ratio", 2, "operations"),
+        ],
+        "cost_columns": [
+            "raw_material_cost", "direct_labor_cost",
+            "overhead_cost", "power_cost", "rent_cost", "maintenance_cost",
+        ],
+    },
+
+    ## Retail Industry
+
+    "retail": {
+        "aggregations": {
+            "sum": [
+                "total_revenue",
+                "cost_of_goods_sold", "store_operating_cost",
+                "logistics_cost", "loss_cost",
+            ],
+            "mean": [
+                "inventory_value",
+                "slow_moving_inventory_percentage",
+                "expired_inventory_percentage",
+                "discount_percentage",
+                "emi_amount",
+            ],
+            "mode": [],
+        },
+        "values": [
+            ("total_expenses", lambda v: (
+                v["cost_of_goods_sold"] +
+                v["store_operating_cost"] +
+                v["logistics_cost"] +
+                v["loss_cost"]
+            )),
+            ("profit", lambda v: v["total_revenue"] - v["total_expenses"]),
+            ("profit_margin", lambda v: ratio(v["profit"], v["total_revenue"]) * 100),
+            # ---- Inventory Metrics (Average) ----
+            ("inventory_blockage_ratio", lambda v: v["inventory_value"] / v["total_revenue"]),
+            ("inventory_risk_score", lambda v: (
+                v["slow_moving_inventory_percentage"] * 0.6 +
+                v["expired_inventory_percentage"] * 0.4
+            )),
+            # ---- Discount & Loss ----
+            ("discount_impact_ratio", lambda v: v["discount_percentage"] / 100),
+            ("loss_cost_ratio", lambda v: v["loss_cost"] / v["total_revenue"]),
+            # ---- Debt ----
+            ("debt_service_ratio", lambda v: v["emi_amount"] / v["total_revenue"]),
+        ],
+        "metrics": [
+            ("total_revenue", 2, "financials"),
+            ("total_expenses", 2, "financials"),
+            ("profit", 2, "financials"),
+            ("profit_margin", 2, "financials"),
+            ("inventory_blockage_ratio", 2, "retail_metrics"),
+            ("inventory_risk_score", 2, "retail_metrics"),
+            ("discount_impact_ratio", 2, "retail_metrics"),
+            ("loss_cost_ratio", 2, "retail_metrics"),
+            ("debt_service_ratio", 2, "retail_metrics"),
+        ],
+        "cost_columns": ["cost_of_goods_sold", "store_operating_cost", "logistics_cost", "loss_cost"],
+    },
+
+    ## Logistic Industry
+
+    "logistics": {
+        "aggregations": {
+            "sum": [
+                "total_revenue",
+                "fuel_cost", "driver_wages", "vehicle_cost",
+                "warehouse_cost", "other_operating_cost",
+                "distance_km", "total_shipments",
+            ],
+            "mean": [
+                "avg_goods_in_transit_value",
+                "on_time_delivery_percentage",
+                "emi_amount",
+            ],
+            "mode": [],
+        },
+        "values": [
+            ("total_expenses", lambda v: (
+                v["fuel_cost"] +
+                v["driver_wages"] +
+                v["vehicle_cost"] +
+                v["warehouse_cost"] +
+                v["other_operating_cost"]
+            )),
+            ("profit", lambda v: v["total_revenue"] - v["total_expenses"]),
+            ("profit_margin", lambda v: ratio(v["profit"], v["total_revenue"]) * 100),
+            # ---- Logistics Metrics ----
+            ("cost_per_km", lambda v: ratio(v["total_expenses"], v["distance_km"], 0.0)),
+            ("revenue_per_shipment", lambda v: ratio(v["total_revenue"], v["total_shipments"], 0.0)),
+            ("fuel_cost_ratio", lambda v: ratio(v["fuel_cost"], v["total_expenses"], 0.0)),
+            ("asset_blockage_ratio", lambda v: ratio(v["avg_goods_in_transit_value"], v["total_revenue"], 0.0)),
+            ("debt_service_ratio", lambda v: ratio(v["emi_amount"], v["total_revenue"], 0.0)),
+        ],
+        "metrics": [
+            ("total_revenue", 2, "financials"),
+            ("total_expenses", 2, "financials"),
+            ("profit", 2, "financials"),
+            ("profit_margin", 2, "financials"),
+            ("cost_per_km", 2, "logistics_metrics"),
+            ("revenue_per_shipment", 2, "logistics_metrics"),
+            ("fuel_cost_ratio", 2, "logistics_metrics"),
+            ("asset_blockage_ratio", 2, "logistics_metrics"),
+            ("on_time_delivery_percentage", 2, "logistics_metrics"),
+            ("debt_service_ratio", 2, "logistics_metrics"),
+        ],
+        "cost_columns": ["fuel_cost", "driver_wages", "vehicle_cost", "warehouse_cost", "other_operating_cost"],
+    },
+
+    ## Ecommerce Industry
+
+    "ecommerce": {
+        "aggregations": {
+            "sum": [
+                "total_revenue", "orders_count",
+                "cost_of_goods_sold", "fulfillment_cost", "shipping_cost",
+                "payment_gateway_cost", "marketing_cost", "returns_cost",
+            ],
+            "mean": [
+                "platform_fee_percentage",
+                "inventory_value",
+                "return_rate_percentage",
+                "emi_amount",
+            ],
+            "mode": [],
+        },
+        "values": [
+            ("total_expenses", lambda v: (
+                v["cost_of_goods_sold"] +
+                v["fulfillment_cost"] +
+                v["shipping_cost"] +
+                v["payment_gateway_cost"] +
+                v["marketing_cost"] +
+                v["returns_cost"]
+            )),
+            ("profit", lambda v: v["total_revenue"] - v["total_expenses"]),
+            ("profit_margin", lambda v: ratio(v["profit"], v["total_revenue"], 0.0) * 100),
+            # ---- E-commerce Metrics ----
+            ("contribution_margin", lambda v: (
+                v["total_revenue"] -
+                (v["shipping_cost"] + v["payment_gateway_cost"] + v["returns_cost"])
+            )),
+            ("platform_fee_ratio", lambda v: v["platform_fee_percentage"] / 100),
+            ("inventory_blockage_ratio", lambda v: ratio(v["inventory_value"], v["total_revenue"], 0.0)),
+            ("order_profitability", lambda v: ratio(v["profit"], v["orders_count"], 0.0)),
+            ("debt_service_ratio", lambda v: ratio(v["emi_amount"], v["total_revenue"])),
+        ],
+        "metrics": [
+            ("total_revenue", 2, "financials"),
+            ("total_expenses", 2, "financials"),
+            ("profit", 2, "financials"),
+            ("profit_margin", 2, "financials"),
+            ("contribution_margin", 2, "unit_economics"),
+            ("platform_fee_ratio", 2, "unit_economics"),
+            ("inventory_blockage_ratio", 2, "unit_economics"),
+            ("order_profitability", 2, "unit_economics"),
+            ("return_rate_percentage", 2, "unit_economics"),
+            ("debt_service_ratio", 2, "unit_economics"),
+        ],
+        "cost_columns": [
+            "cost_of_goods_sold", "fulfillment_cost", "shipping_cost",
+            "payment_gateway_cost", "marketing_cost", "returns_cost",
+        ],
+    },
+}
+
+
+## Plans
+
+def build_metric_plan(industry: str):
+    """
+    Compiles the registry entry of an industry. Fails at startup, not on a request,
+    when a metric has no formula or column behind it or a column is aggregated twice.
+    """
+    registry = METRIC_REGISTRY[industry]
+    aggregations = registry["aggregations"]
+
+    columns = [*aggregations["sum"], *aggregations["mean"], *aggregations["mode"]]
+    if len(set(columns)) != len(columns):
+        raise ValueError(f"{industry}: a column is aggregated more than once")
+
+    known = set(columns) | {name for name, _ in registry["values"]}
+    missing = [name for name, _, _ in registry["metrics"] if name not in known]
+    if missing:
+        raise ValueError(f"{industry}: no formula or column for metrics {missing}")
+
+    groups = {}
+    for name, _, group in registry["metrics"]:
+        if group is not None:
+            groups.setdefault(group, []).append(name)
+
+    return {
+        "aggregations": aggregations,
+        "columns": columns,
+        "values": registry["values"],
+        # (name, digits) with digits None when the value is returned as it is
+        "outputs": [(name, digits if digits != TEXT else None) for name, digits, _ in registry["metrics"]],
+        "names": [name for name, _, _ in registry["metrics"]],
+        "numeric": [name for name, digits, _ in registry["metrics"] if digits != TEXT],
+        "groups": groups,
+        "cost_columns": registry["cost_columns"],
+    }
+
+
+METRIC_PLANS = {industry: build_metric_plan(industry) for industry in METRIC_REGISTRY}
+
+
+def run_metric_plan(plan: dict, aggregates: dict):
+    """
+    The metrics of one business (floats) or many (arrays) from aggregates shaped like
+    aggregate_financials. The formulas write into one namespace over the aggregates.
+    """
+    values = {**aggregates["sum"], **aggregates["mean"], **aggregates["mode"]}
+    for name, formula in plan["values"]:
+        values[name] = formula(values)
+
+    return {
+        name: values[name] if digits is None else round_metric(values[name], digits)
+        for name, digits in plan["outputs"]
+    }
+
+
+def check_metric_names(industry: str, names):
+    """
+    Raises ValueError when one of names is not a metric of the industry
+    """
+    unknown = sorted(set(names) - set(METRIC_PLANS[industry]["names"]))
+    if unknown:
+        raise ValueError(f"{industry}: unknown metrics {unknown}")
+
+
+def industry_metrics(industry: str, metrics: dict):
+    """
+    The industry's metrics out of metrics, in plan order: the keyword arguments of its
+    analysis model and the variables of its AI prompt
+    """
+    return {name: metrics[name] for name in METRIC_PLANS[industry]["names"]}
+
+
+def metric_groups(industry: str, record):
+    """
+    The metrics of a saved analysis by response group, for the GET routes
+    """
+    return {
+        group: {name: getattr(record, name) for name in names}
+        for group, names in METRIC_PLANS[industry]["groups"].items()
+    }
@@ -0,0 +1,208 @@
+import os
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models.peer import PeerMetricSketch
+from app.services.metrics import METRIC_PLANS
+
+
+"""
+This file is used to benchmark an analysis against its peers: every saved analysis adds its
+metrics to one quantile sketch per (industry, year, metric), so the percentile rank of a
+metric is read from a few dozen centroids instead of a scan of the analysis tables.
+"""
+
+
+# Centroids kept per sketch is about half of this; more is more precise and larger
+SKETCH_COMPRESSION = int(os.getenv("SKETCH_COMPRESSION", 200))
+
+
+class QuantileSketch:
+    """
+    A merging t-digest. New values and the centroids so far are sorted together and
+    merged by the k1 scale function: neighbours whose cumulative quantiles fall in the
+    same unit of k(q) = compression / 2pi * asin(2q - 1) become one centroid. Units are
+    narrow near q = 0 and q = 1, so the tails keep small centroids and ranks there stay
+    precise. Each merge is a handful of NumPy calls whatever the number of values.
+
+    state() gives the sketch as plain JSON and QuantileSketch(state) carries on from it.
+    """
+
+    def __init__(self, state: dict | None = None, compression: int = SKETCH_COMPRESSION):
+        state = state or {}
+        self.compression = compression
+        self.means = np.asarray(state.get("means", []), dtype="float64")
+        self.weights = np.asarray(state.get("weights", []), dtype="float64")
+        self.min = state.get("min", float("inf"))
+        self.max = state.get("max", float("-inf"))
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, values):
+        values = np.asarray(values, dtype="float64")
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        means = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, np.ones(len(values))])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        quantiles = (np.cumsum(weights) - weights / 2) / weights.sum()
+        scale = self.compression / (2 * np.pi) * np.arcsin(2 * quantiles - 1)
+        units = np.floor(scale - scale[0]).astype("int64")
+
+        merged = np.bincount(units, weights=weights)
+        kept = merged > 0
+        self.means = (np.bincount(units, weights=weights * means)[kept] / merged[kept])
+        self.weights = merged[kept]
+
+    def _cdf(self):
+        # (value, weight below it) at the extremes and the centroid centers, to interpolate
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[self.min], self.means, [self.max]])
+        below = np.concatenate([[0.0], centers, [self.weights.sum()]])
+        return positions, below
+
+    def rank(self, value: float):
+        """
+        Midrank of value between 0 and 1: the share of the values below it plus half the
+        share equal to it, so a tie with every peer (or a single peer) is 0.5. None for an
+        empty sketch.
+        """
+        if not len(self.weights) or not np.isfinite(value):
+            return None
+        if value < self.min:
+            return 0.0
+        if value > self.max:
+            return 1.0
+
+        equal = self.means == value
+        if equal.any():
+            below = self.weights[self.means < value].sum() + self.weights[equal].sum() / 2
+            return float(below / self.weights.sum())
+
+        positions, below = self._cdf()
+        return float(np.interp(value, positions, below) / self.weights.sum())
+
+    def quantile(self, q: float):
+        if not len(self.weights):
+            return None
+
+        positions, below = self._cdf()
+        return float(np.interp(q * self.weights.sum(), below, positions))
+
+    def state(self):
+        return {
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist(),
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+# INSERT ... ON CONFLICT DO NOTHING of the databases the app runs on
+SKETCH_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+def numeric_metrics(industry: str, metrics: dict):
+    # text metrics (e.g. season) have no rank
+    return {metric: metrics[metric] for metric in METRIC_PLANS[industry]["numeric"] if metric in metrics}
+
+
+def update_peer_sketches(db: Session, industry: str, results: list):
+    """
+    Adds the metrics of newly saved analyses, given as [(year, metrics)], to the sketches
+    of their industry and year, in the caller's transaction. Missing rows are created
+    with ON CONFLICT DO NOTHING, so two first saves of an industry and year do not fail
+    on the unique constraint, then all the rows are locked in key order while they are
+    updated so concurrent saves do not lose each other's values. Every save of an
+    industry and year therefore waits for the other saves of it to commit.
+    """
+    values = {}
+    for year, metrics in results:
+        for metric, value in numeric_metrics(industry, metrics).items():
+            values.setdefault((year, metric), []).append(value)
+    if not values:
+        return
+
+    keys = sorted(values)
+    insert = SKETCH_INSERTS[db.get_bind().dialect.name]
+    db.execute(
+        insert(PeerMetricSketch)
+        .values([{"industry": industry, "year": year, "metric": metric, "count": 0, "sketch": {}} for year, metric in keys])
+        .on_conflict_do_nothing(index_elements=["industry", "year", "metric"])
+    )
+
+    rows = db.query(PeerMetricSketch).filter(
+        PeerMetricSketch.industry == industry,
+        PeerMetricSketch.year.in_({year for year, _ in keys})
+    ).order_by(PeerMetricSketch.year, PeerMetricSketch.metric).with_for_update().populate_existing().all()
+    rows = {(row.year, row.metric): row for row in rows}
+
+    for key in keys:
+        row = rows[key]
+        sketch = QuantileSketch(row.sketch)
+        sketch.update(values[key])
+        row.sketch = sketch.state()
+        row.count = int(sketch.count)
+
+
+def peer_benchmarks(db: Session, industry: str, year: int, metrics: dict):
+    """
+    Percentile rank (0-100) and peer median of every numeric metric against the saved
+    analyses of the same industry and year, from one indexed read of their sketches.
+    None when there are no peers yet.
+    """
+    rows = db.query(PeerMetricSketch).filter(
+        PeerMetricSketch.industry == industry,
+        PeerMetricSketch.year == year
+    ).all()
+    if not rows:
+        return None
+
+    sketches = {row.metric: QuantileSketch(row.sketch) for row in rows}
+    ranks = {}
+    for metric, value in numeric_metrics(industry, metrics).items():
+        sketch = sketches.get(metric)
+        rank = sketch.rank(value) if sketch is not None else None
+        if rank is not None:
+            ranks[metric] = {"percentile": round(rank * 100, 1), "peer_median": round(sketch.quantile(0.5), 2)}
+
+    return {
+        "year": year,
+        "peers": max(row.count for row in rows),
+        "metrics": ranks,
+    }
+
+
+def rebuild_peer_sketches(db: Session, industry: str, model, batch_size: int = 10_000):
+    """
+    Builds the sketches of an industry again from every analysis in its table, e.g. for
+    analyses saved before peer benchmarking. Reads the metric columns in batches.
+    Returns the number of analyses read.
+    """
+    names = METRIC_PLANS[industry]["numeric"]
+    columns = [model.__table__.columns[name] for name in names]
+
+    db.query(PeerMetricSketch).filter(PeerMetricSketch.industry == industry).delete()
+
+    rows = 0
+    result = db.execute(select(model.year, *columns).execution_options(yield_per=batch_size))
+    for batch in result.partitions():
+        update_peer_sketches(db, industry, [(row[0], dict(zip(names, row[1:]))) for row in batch])
+        rows += len(batch)
+
+    db.commit()
+    return rows
@@ -1,239 +1,579 @@
-
-from sqlalchemy.orm import Session
-from app.models.agriculture import AgricultureFinancialAnalysis
-from app.models.manufacture import ManufacturingFinancialAnalysis
-from app.models.retail import RetailFinancialAnalysis
-from app.models.logistics import LogisticsFinancialAnalysis
-from app.models.ecommerce import EcommerceFinancialAnalysis
-
-
-"""
-This file is used to Save the financial data of all the business types in the database
-"""
-
-
-## Agriculture Financial Analysis Persistence
-
-def save_agriculture_financial_analysis(
-    db: Session,
-    metrics: dict,
-    year: int,
-    health_score: int,
-    health_status: str,
-    credit_risk: str,
-    user_id: int,
-    ai_explanation: str | None = None
-):
-    record = AgricultureFinancialAnalysis(
-        season=metrics["season"],
-        primary_crop_type=metrics["primary_crop_type"],
-        year=year,
-        user_id=user_id,
-
-        total_revenue=metrics["total_revenue"],
-        total_expenses=metrics["total_expenses"],
-        profit=metrics["profit"],
-        effective_profit=metrics["effective_profit"],
-        profit_margin=metrics["profit_margin"],
-
-        inventory_loss_percentage=metrics["inventory_loss_percentage"],
-        inventory_loss_value=metrics["inventory_loss_value"],
-        storage_risk_score=metrics["storage_risk_score"],
-
-        cost_pressure_ratio=metrics["cost_pressure_ratio"],
-        debt_service_ratio=metrics["debt_service_ratio"],
-
-        health_score=health_score,
-        health_status=health_status,
-        credit_risk=credit_risk,
-
-        ai_explanation=ai_explanation,
-    )
-
-    db.add(record)
-    db.commit()
-    db.refresh(record)
-    return record
-
-
-
-## Manufacturing Financial Analysis Persistence
-
-def save_manufacturing_financial_analysis(
-    db: Session,
-    metrics: dict,
-    year: int,
-    health_score: int,
-    health_status: str,
-    credit_risk: str,
-    user_id: int,
-    ai_explanation: str | None = None
-
-):
-    record = ManufacturingFinancialAnalysis(
-        industry="Manufacturing",
-        
-        year=year,
-        user_id=user_id,
-
-        total_revenue=metrics["total_revenue"],
-        total_expenses=metrics["total_expenses"],
-        profit=metrics["profit"],
-        profit_margin=metrics["profit_margin"],
-
-        capacity_utilization=metrics["capacity_utilization"],
-        inventory_blockage_ratio=metrics["inventory_blockage_ratio"],
-        cost_efficiency_ratio=metrics["cost_efficiency_ratio"],
-        debt_service_ratio=metrics["debt_service_ratio"],
-
-        health_score=health_score,
-        health_status=health_status,
-        credit_risk=credit_risk,
-
-        ai_explanation=ai_explanation
-    )
-
-    db.add(record)
-    db.commit()
-    db.refresh(record)
-
-    return record
-
-
-## Retail Financial Analysis Persistence
-
-def save_retail_financial_analysis(
-    db: Session,
-    metrics: dict,
-    year: int,
-    health_score: int,
-    health_status: str,
-    credit_risk: str,
-    user_id: int,
-    ai_explanation: str | None = None,
-):
-
-    record = RetailFinancialAnalysis(
-        industry="Retail",
-
-        year=year,
-        user_id=user_id,
-
-        total_revenue=metrics["total_revenue"],
-        total_expenses=metrics["total_expenses"],
-        profit=metrics["profit"],
-        profit_margin=metrics["profit_margin"],
-
-        inventory_blockage_ratio=metrics["inventory_blockage_ratio"],
-        inventory_risk_score=metrics["inventory_risk_score"],
-        discount_impact_ratio=metrics["discount_impact_ratio"],
-        loss_cost_ratio=metrics["loss_cost_ratio"],
-        debt_service_ratio=metrics["debt_service_ratio"],
-
-        health_score=health_score,
-        health_status=health_status,
-        credit_risk=credit_risk,
-
-        ai_explanation=ai_explanation
-    )
-
-    db.add(record)
-    db.commit()
-    db.refresh(record)
-
-    return record
-
-# Logistics Financial Analysis Persistence
-
-def save_logistics_financial_analysis(
-    db: Session, 
-    metrics: dict,
-    year: int,
-    health_score: int,
-    health_status: str,
-    credit_risk: str,
-    user_id: int,
-    ai_explanation: str | None = None,
-):
-
-    record = LogisticsFinancialAnalysis(
-        industry="Logistics",
-
-        year=year,
-        user_id=user_id,
-
-        total_revenue=metrics["total_revenue"],
-        total_expenses=metrics["total_expenses"],
-        profit=metrics["profit"],
-        profit_margin=metrics["profit_margin"],
-
-        cost_per_km=metrics["cost_per_km"],
-        revenue_per_shipment=metrics["revenue_per_shipment"],
-        fuel_cost_ratio=metrics["fuel_cost_ratio"],
-        asset_blockage_ratio=metrics["asset_blockage_ratio"],
-        on_time_delivery_percentage=metrics["on_time_delivery_percentage"],
-        debt_service_ratio=metrics["debt_service_ratio"],
-
-        health_score=health_score,
-        health_status=health_status,
-        credit_risk=credit_risk,
-
-        ai_explanation=ai_explanation
-
-    )
-
-    db.add(record)
-    db.commit()
-    db.refresh(record)
-
-    return record
-
-# Ecommerce Financial Analysis Persistence
-
-
-
-def save_ecommerce_financial_analysis(
-    db: Session,
-    metrics: dict,
-    year: int,
-    health_score: int,
-    health_status: str,
-    credit_risk: str,
-    user_id: int,
-    ai_explanation: str | None = None,
-):
-
-    record = EcommerceFinancialAnalysis(
-
-
-        industry="Ecommerce",
-
-        year=year,
-        user_id=user_id,
-
-        total_revenue=metrics["total_revenue"],
-        total_expenses=metrics["total_expenses"],
-        profit=metrics["profit"],
-        profit_margin=metrics["profit_margin"],
-
-        contribution_margin=metrics["contribution_margin"],
-        platform_fee_ratio=metrics["platform_fee_ratio"],
-        inventory_blockage_ratio=metrics["inventory_blockage_ratio"],
-        order_profitability=metrics["order_profitability"],
-        return_rate_percentage=metrics["return_rate_percentage"],
-        debt_service_ratio=metrics["debt_service_ratio"],
-
-        health_score=health_score,
-        health_status=health_status,
-        credit_risk=credit_risk,
-
-        ai_explanation=ai_explanation
-    )
-
-    db.add(record)
-    db.commit()
-    db.refresh(record)
-
-    return record
-
-
+
+from sqlalchemy import Float, case, cast, literal, or_, update
+from sqlalchemy.orm import Session
+from app.models.agriculture import AgricultureFinancialAnalysis
+from app.models.manufacture import ManufacturingFinancialAnalysis
+from app.models.retail import RetailFinancialAnalysis
+from app.models.logistics import LogisticsFinancialAnalysis
+from app.models.ecommerce import EcommerceFinancialAnalysis
+from app.services.metrics import industry_metrics
+from app.services.peers import update_peer_sketches
+from app.services.scoring import STATUS_CUTOFFS, LOWEST_STATUS, SCORING_RULES, breaks_rule
+from app.services.scoring import rules_version as current_rules_version
+from app.services.credit import CREDIT_CUTOFFS, CREDIT_LABELS, CREDIT_MODELS, CREDIT_MODELS_VERSION, HIGHEST_RISK
+
+
+"""
+This file is used to Save the financial data of all the business types in the database
+"""
+
+
+## Agriculture Financial Analysis Persistence
+
+def save_agriculture_financial_analysis(
+    db: Session,
+    metrics: dict,
+    year: int,
+    health_score: int,
+    health_status: str,
+    credit_risk: str,
+    user_id: int,
+    ai_explanation: str | None = None,
+    trends: dict | None = None,
+    language: str | None = None,
+    content_hash: str | None = None,
+    month: str | None = None,
+    business_id: str | None = None,
+    statistics: dict | None = None,
+    rules_version: int | None = None,
+    commit: bool = True
+):
+    record = AgricultureFinancialAnalysis(
+        year=year,
+        user_id=user_id,
+
+        **industry_metrics("agriculture", metrics),
+
+        health_score=health_score,
+        health_status=health_status,
+        credit_risk=credit_risk,
+        rules_version=rules_version if rules_version is not None else current_rules_version(),
+        credit_model_version=CREDIT_MODELS_VERSION,
+
+        trends=trends,
+
+        ai_explanation=ai_explanation,
+
+        language=language,
+
+        content_hash=content_hash,
+
+        month=month,
+
+        business_id=business_id,
+
+        statistics=statistics,
+    )
+
+    db.add(record)
+    if commit:
+        # bulk saves (commit=False) update the peer sketches once per batch instead
+        update_peer_sketches(db, "agriculture", [(year, metrics)])
+        db.commit()
+        db.refresh(record)
+    return record
+
+
+
+## Manufacturing Financial Analysis Persistence
+
+def save_manufacturing_financial_analysis(
+    db: Session,
+    metrics: dict,
+    year: int,
+    health_score: int,
+    health_status: str,
+    credit_risk: str,
+    user_id: int,
+    ai_explanation: str | None = None,
+    trends: dict | None = None,
+    language: str | None = None,
+    content_hash: str | None = None,
+    month: str | None = None,
+    business_id: str | None = None,
+    statistics: dict | None = None,
+    rules_version: int | None = None,
+    commit: bool = True
+
+):
+    record = ManufacturingFinancialAnalysis(
+        industry="Manufacturing",
+        
+        year=year,
+        user_id=user_id,
+
+        **industry_metrics("manufacturing", metrics),
+
+        health_score=health_score,
+        health_status=health_status,
+        credit_risk=credit_risk,
+        rules_version=rules_version if rules_version is not None else current_rules_version(),
+        credit_model_version=CREDIT_MODELS_VERSION,
+
+        trends=trends,
+
+        ai_explanation=ai_explanation,
+
+        language=language,
+
+        content_hash=content_hash,
+
+        month=month,
+
+        business_id=business_id,
+
+        statistics=statistics,
+    )
+
+    db.add(record)
+    if commit:
+        # bulk saves (commit=False) update the peer sketches once per batch instead
+        update_peer_sketches(db, "manufacturing", [(year, metrics)])
+        db.commit()
+        db.refresh(record)
+
+    return record
+
+
+## Retail Financial Analysis Persistence
+
+def save_retail_financial_analysis(
+    db: Session,
+    metrics: dict,
+    year: int,
+    health_score: int,
+    health_status: str,
+    credit_risk: str,
+    user_id: int,
+    ai_explanation: str | None = None,
+    trends: dict | None = None,
+    language: str | None = None,
+    content_hash: str | None = None,
+    month: str | None = None,
+    business_id: str | None = None,
+    statistics: dict | None = None,
+    rules_version: int | None = None,
+    commit: bool = True
+):
+
+    record = RetailFinancialAnalysis(
+        industry="Retail",
+
+        year=year,
+        user_id=user_id,
+
+        **industry_metrics("retail", metrics),
+
+        health_score=health_score,
+        health_status=health_status,
+        credit_risk=credit_risk,
+        rules_version=rules_version if rules_version is not None else current_rules_version(),
+        credit_model_version=CREDIT_MODELS_VERSION,
+
+        trends=trends,
+
+        ai_explanation=ai_explanation,
+
+        language=language,
+
+        content_hash=content_hash,
+
+        month=month,
+
+        business_id=business_id,
+
+        statistics=statistics,
+    )
+
+    db.add(record)
+    if commit:
+        # bulk saves (commit=False) update the peer sketches once per batch instead
+        update_peer_sketches(db, "retail", [(year, metrics)])
+        db.commit()
+        db.refresh(record)
+
+    return record
+
+# Logistics Financial Analysis Persistence
+
+def save_logistics_financial_analysis(
+    db: Session, 
+    metrics: dict,
+    year: int,
+    health_score: int,
+    health_status: str,
+    credit_risk: str,
+    user_id: int,
+    ai_explanation: str | None = None,
+    trends: dict | None = None,
+    language: str | None = None,
+    content_hash: str | None = None,
+    month: str | None = None,
+    business_id: str | None = None,
+    statistics: dict | None = None,
+    rules_version: int | None = None,
+    commit: bool = True
+):
+
+    record = LogisticsFinancialAnalysis(
+        industry="Logistics",
+
+        year=year,
+        user_id=user_id,
+
+        **industry_metrics("logistics", metrics),
+
+        health_score=health_score,
+        health_status=health_status,
+        credit_risk=credit_risk,
+        rules_version=rules_version if rules_version is not None else current_rules_version(),
+        credit_model_version=CREDIT_MODELS_VERSION,
+
+        trends=trends,
+
+        ai_explanation=ai_explanation,
+
+        language=language,
+
+        content_hash=content_hash,
+
+        month=month,
+
+        business_id=business_id,
+
+        statistics=statistics,
+    )
+
+    db.add(record)
+    if commit:
+        # bulk saves (commit=False) update the peer sketches once per batch instead
+        update_peer_sketches(db, "logistics", [(year, metrics)])
+        db.commit()
+        db.refresh(record)
+
+    return record
+
+# Ecommerce Financial Analysis Persistence
+
+
+
+def save_ecommerce_financial_analysis(
+    db: Session,
+    metrics: dict,
+    year: int,
+    health_score: int,
+    health_status: str,
+    credit_risk: str,
+    user_id: int,
+    ai_explanation: str | None = None,
+    trends: dict | None = None,
+    language: str | None = None,
+    content_hash: str | None = None,
+    month: str | None = None,
+    business_id: str | None = None,
+    statistics: dict | None = None,
+    rules_version: int | None = None,
+    commit: bool = True
+):
+
+    record = EcommerceFinancialAnalysis(
+
+
+        industry="Ecommerce",
+
+        year=year,
+        user_id=user_id,
+
+        **industry_metrics("ecommerce", metrics),
+
+        health_score=health_score,
+        health_status=health_status,
+        credit_risk=credit_risk,
+        rules_version=rules_version if rules_version is not None else current_rules_version(),
+        credit_model_version=CREDIT_MODELS_VERSION,
+
+        trends=trends,
+
+        ai_explanation=ai_explanation,
+
+        language=language,
+
+        content_hash=content_hash,
+
+        month=month,
+
+        business_id=business_id,
+
+        statistics=statistics,
+    )
+
+    db.add(record)
+    if commit:
+        # bulk saves (commit=False) update the peer sketches once per batch instead
+        update_peer_sketches(db, "ecommerce", [(year, metrics)])
+        db.commit()
+        db.refresh(record)
+
+    return record
+
+
+SAVE_FUNCTIONS = {
+    "agriculture": save_agriculture_financial_analysis,
+    "manufacturing": save_manufacturing_financial_analysis,
+    "retail": save_retail_financial_analysis,
+    "logistics": save_logistics_financial_analysis,
+    "ecommerce": save_ecommerce_financial_analysis,
+}
+
+
+## Bulk Persistence
+
+def save_financial_analyses(
+    db: Session,
+    industry: str,
+    results: list,
+    user_id: int
+):
+    """
+    Saves many analyses of one industry in a single transaction.
+    Each result holds metrics, year, health_score, health_status and credit_risk.
+    Returns the new record ids in the same order.
+    """
+    save = SAVE_FUNCTIONS[industry]
+
+    records = [
+        save(
+            db=db,
+            metrics=result["metrics"],
+            year=result["year"],
+            health_score=result["health_score"],
+            health_status=result["health_status"],
+            credit_risk=result["credit_risk"],
+            user_id=user_id,
+            trends=result.get("trends"),
+            ai_explanation=result.get("ai_explanation"),
+            language=result.get("language"),
+            content_hash=result.get("content_hash"),
+            month=result.get("month"),
+            business_id=result.get("business_id"),
+            statistics=result.get("statistics"),
+            rules_version=result.get("rules_version"),
+            commit=False
+        )
+        for result in results
+    ]
+
+    try:
+        update_peer_sketches(db, industry, [(result["year"], result["metrics"]) for result in results])
+        db.flush()
+        record_ids = [record.id for record in records]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return record_ids
+
+
+## Deduplication
+
+ANALYSIS_MODELS = {
+    "agriculture": AgricultureFinancialAnalysis,
+    "manufacturing": ManufacturingFinancialAnalysis,
+    "retail": RetailFinancialAnalysis,
+    "logistics": LogisticsFinancialAnalysis,
+    "ecommerce": EcommerceFinancialAnalysis,
+}
+
+
+def find_duplicate_analysis(
+    db: Session,
+    industry: str,
+    user_id: int,
+    content_hash: str,
+    language: str | None = None,
+    rules_version: int | None = None
+):
+    """
+    Returns the latest analysis of the same data by the same user in the same
+    language, scored by rules_version (the current rules by default) and the
+    current credit models, or None. An analysis whose AI explanation failed does
+    not count, so a re-upload gets another try at the explanation; one scored by
+    other rules or models does not either, as its scores and explanation no
+    longer match the data.
+    """
+    model = ANALYSIS_MODELS[industry]
+    if rules_version is None:
+        rules_version = current_rules_version()
+
+    record = db.query(model).filter(
+        model.user_id == user_id,
+        model.content_hash == content_hash,
+        model.language == language,
+        model.rules_version == rules_version,
+        model.credit_model_version.is_not_distinct_from(CREDIT_MODELS_VERSION)
+    ).order_by(model.id.desc()).first()
+
+    if record is None or record.ai_explanation is None:
+        return None
+    return record
+
+
+def find_duplicate_analyses(
+    db: Session,
+    industry: str,
+    user_id: int,
+    content_hashes: list
+):
+    """
+    Batch version of find_duplicate_analysis, in one query. Batches have no AI
+    explanation, so any language matches. Returns {content_hash: latest record}.
+    """
+    model = ANALYSIS_MODELS[industry]
+
+    records = db.query(model).filter(
+        model.user_id == user_id,
+        model.content_hash.in_(set(content_hashes))
+    ).order_by(model.id).all()
+
+    return {record.content_hash: record for record in records}
+
+
+## Incremental Updates
+
+def find_user_analysis(db: Session, industry: str, user_id: int, record_id: int):
+    """
+    The user's analysis with this id, or None
+    """
+    model = ANALYSIS_MODELS[industry]
+    return db.query(model).filter(model.id == record_id, model.user_id == user_id).first()
+
+
+def update_financial_analysis(db: Session, record, result: dict):
+    """
+    Overwrites a saved analysis with a result that covers its rows plus new ones.
+    The explanation and content hash describe the old rows only, so they are cleared.
+    The peer sketches keep the first metrics, since a sketch cannot take a value back.
+    """
+    for column in record.__table__.columns:
+        if column.name in result["metrics"]:
+            setattr(record, column.name, result["metrics"][column.name])
+
+    record.health_score = result["health_score"]
+    record.health_status = result["health_status"]
+    record.credit_risk = result["credit_risk"]
+    record.rules_version = result.get("rules_version", current_rules_version())
+    record.credit_model_version = CREDIT_MODELS_VERSION
+    record.trends = result["trends"]
+    record.statistics = result["statistics"]
+    record.ai_explanation = None
+    record.content_hash = None
+
+    db.commit()
+    db.refresh(record)
+    return record
+
+
+## Forecasting
+
+def find_forecast_analyses(db: Session, industry: str, user_id: int, record_ids: list | None = None, limit: int = 1000):
+    """
+    The user's latest analyses that have statistics to forecast from, or the ones
+    with these ids, newest first
+    """
+    model = ANALYSIS_MODELS[industry]
+
+    query = db.query(model).filter(model.user_id == user_id, model.statistics.isnot(None))
+    if record_ids:
+        query = query.filter(model.id.in_(set(record_ids)))
+    return query.order_by(model.id.desc()).limit(limit).all()
+
+
+## Rescoring
+
+def metric_column(model, metric: str):
+    # a metric column as a number: storage_risk_score is stored as text, which
+    # PostgreSQL will not compare with or multiply by a number
+    return cast(getattr(model, metric), Float)
+
+
+def score_expression(model, rules: list, dialect: str):
+    """
+    health_score of the rules as a SQL expression over the metric columns of model.
+    A NULL metric breaks no rule, like NaN in Python. PostgreSQL sorts NaN above
+    every number, so there NaN is kept out of the comparisons explicitly.
+    """
+    score = literal(100)
+    for metric, comparison, threshold, penalty in rules:
+        column = metric_column(model, metric)
+        broken = breaks_rule(column, comparison, threshold)
+        if dialect == "postgresql":
+            broken = broken & (column != literal(float("nan"), Float))
+        score = score - case((broken, penalty), else_=0)
+    return score
+
+
+def tier_expression(score, cutoffs: list, lowest: str):
+    # health_status / credit_risk of a score expression, the cutoffs checked in order
+    return case(*[(score >= cutoff, label) for cutoff, label in cutoffs], else_=lowest)
+
+
+def credit_expression(model, industry: str, score, dialect: str):
+    """
+    credit_risk as a SQL expression: the industry's default model on the metric
+    columns where it has one and they are all set, else the cutoffs on score
+    """
+    rules = tier_expression(score, CREDIT_CUTOFFS, HIGHEST_RISK)
+    credit_model = CREDIT_MODELS.get(industry)
+    if credit_model is None:
+        return rules
+
+    linear = literal(credit_model["bias"])
+    for weight, feature in zip(credit_model["weights"], credit_model["features"]):
+        linear = linear + weight * metric_column(model, feature)
+
+    unusable = linear.is_(None)
+    if dialect == "postgresql":
+        unusable = unusable | (linear == literal(float("nan"), Float))
+
+    return case(
+        (unusable, rules),
+        *[(linear < cutoff, risk) for (cutoff, _), risk in zip(credit_model["cutoffs"], CREDIT_LABELS.tolist())],
+        else_=HIGHEST_RISK,
+    )
+
+
+def rescore_financial_analyses(db: Session, everything: bool = False):
+    """
+    Applies the current scoring rules and credit models to the saved analyses of every
+    industry, with one UPDATE per table that the database runs: health_score,
+    health_status, credit_risk, rules_version and credit_model_version of the analyses
+    scored by another rules version or other credit models, or of all of them with
+    everything=True. Nothing is loaded into Python.
+    Returns {industry: analyses updated}.
+    """
+    rules = SCORING_RULES.current()
+    version = rules["version"]
+    dialect = db.get_bind().dialect.name
+
+    updated = {}
+    for industry, model in ANALYSIS_MODELS.items():
+        score = score_expression(model, rules["industries"][industry], dialect)
+        statement = update(model).values(
+            health_score=score,
+            health_status=tier_expression(score, STATUS_CUTOFFS, LOWEST_STATUS),
+            credit_risk=credit_expression(model, industry, score, dialect),
+            rules_version=version,
+            credit_model_version=CREDIT_MODELS_VERSION,
+        )
+        if not everything:
+            statement = statement.where(or_(
+                model.rules_version.is_(None),
+                model.rules_version != version,
+                model.credit_model_version.is_distinct_from(CREDIT_MODELS_VERSION),
+            ))
+
+        updated[industry] = db.execute(statement.execution_options(synchronize_session=False)).rowcount
+
+    db.commit()
+    return updated
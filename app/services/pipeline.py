@@ -0,0 +1,519 @@
+import os
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from app.services.analysis import (
+    RunningAggregator,
+    AGRICULTURE_AGGREGATIONS, agricultural_metrics,
+    MANUFACTURING_AGGREGATIONS, manufacturing_metrics,
+    RETAIL_AGGREGATIONS, retail_metrics,
+    LOGISTICS_AGGREGATIONS, logistics_metrics,
+    ECOMMERCE_AGGREGATIONS, ecommerce_metrics,
+)
+from app.services.metrics import METRIC_PLANS
+from app.services.scoring import (
+    agricultural_health_score, agricultural_health_scores,
+    manufacturing_health_score, manufacturing_health_scores,
+    retail_health_score, retail_health_scores,
+    logistics_health_score, logistics_health_scores,
+    ecommerce_health_score, ecommerce_health_scores,
+    score_rules, rules_version,
+)
+from app.services.credit import (
+    agriculture_credit_risk, agriculture_credit_risks,
+    manufacturing_credit_risk, manufacturing_credit_risks,
+    retail_credit_risk, retail_credit_risks,
+    logistics_credit_risk, logistics_credit_risks,
+    ecommerce_credit_risk, ecommerce_credit_risks,
+)
+from app.services.ingestion import FinancialUpload
+from app.services.validation import UploadValidationError
+from app.services.trends import MonthlyAggregator, month_number, monthly_trends
+from app.services.forecast import FORECAST_HORIZON, monthly_history, cash_flow_forecasts
+from app.services.stress import stress_test
+from app.services.scenarios import ALL_COSTS, scenario_changes, run_scenarios
+from app.services.templates import REQUIRED_COLUMNS, OVERHEAD_DIRECT, OVERHEAD_SPLIT, PORTFOLIO_KEY
+
+
+"""
+This file is used to run the analysis pipeline (metrics -> health score -> credit risk)
+for any business type, without the database or the LLM, so it can run in worker processes
+"""
+
+
+INDUSTRY_PIPELINES = {
+    "agriculture": {
+        "name": "Agriculture",
+        "aggregations": AGRICULTURE_AGGREGATIONS,
+        "metrics": agricultural_metrics,
+        "health_score": agricultural_health_score,
+        "health_scores": agricultural_health_scores,
+        "credit_risk": agriculture_credit_risk,
+        "credit_risks": agriculture_credit_risks,
+        "cost_columns": METRIC_PLANS["agriculture"]["cost_columns"],
+    },
+    "manufacturing": {
+        "name": "Manufacturing",
+        "aggregations": MANUFACTURING_AGGREGATIONS,
+        "metrics": manufacturing_metrics,
+        "health_score": manufacturing_health_score,
+        "health_scores": manufacturing_health_scores,
+        "credit_risk": manufacturing_credit_risk,
+        "credit_risks": manufacturing_credit_risks,
+        "cost_columns": METRIC_PLANS["manufacturing"]["cost_columns"],
+    },
+    "retail": {
+        "name": "Retail",
+        "aggregations": RETAIL_AGGREGATIONS,
+        "metrics": retail_metrics,
+        "health_score": retail_health_score,
+        "health_scores": retail_health_scores,
+        "credit_risk": retail_credit_risk,
+        "credit_risks": retail_credit_risks,
+        "cost_columns": METRIC_PLANS["retail"]["cost_columns"],
+    },
+    "logistics": {
+        "name": "Logistics",
+        "aggregations": LOGISTICS_AGGREGATIONS,
+        "metrics": logistics_metrics,
+        "health_score": logistics_health_score,
+        "health_scores": logistics_health_scores,
+        "credit_risk": logistics_credit_risk,
+        "credit_risks": logistics_credit_risks,
+        "cost_columns": METRIC_PLANS["logistics"]["cost_columns"],
+    },
+    "ecommerce": {
+        "name": "Ecommerce",
+        "aggregations": ECOMMERCE_AGGREGATIONS,
+        "metrics": ecommerce_metrics,
+        "health_score": ecommerce_health_score,
+        "health_scores": ecommerce_health_scores,
+        "credit_risk": ecommerce_credit_risk,
+        "credit_risks": ecommerce_credit_risks,
+        "cost_columns": METRIC_PLANS["ecommerce"]["cost_columns"],
+    },
+}
+
+# The single-file route for agriculture is /analyze/agricultural
+INDUSTRY_ALIASES = {"agricultural": "agriculture"}
+
+
+def resolve_industry(industry: str):
+    industry = INDUSTRY_ALIASES.get(industry.lower(), industry.lower())
+    if industry not in INDUSTRY_PIPELINES:
+        raise ValueError(f"Unknown industry: {industry}")
+    return industry
+
+
+def check_columns(industry: str, columns):
+    missing = REQUIRED_COLUMNS[industry] - set(columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    if industry == "manufacturing" and not (
+        OVERHEAD_DIRECT.issubset(columns) or OVERHEAD_SPLIT.issubset(columns)
+    ):
+        raise ValueError(
+            "Missing overhead cost columns. "
+            "Provide either 'overhead_cost' "
+            "or all of 'power_cost', 'rent_cost', 'maintenance_cost'."
+        )
+
+
+def score_metrics(industry: str, metrics: dict):
+    pipeline = INDUSTRY_PIPELINES[industry]
+    health_score, health_status = pipeline["health_score"](metrics)
+    credit_risk = pipeline["credit_risk"](health_score, metrics)
+    return health_score, health_status, credit_risk
+
+
+def score_metrics_batch(industry: str, metrics: dict):
+    """
+    score_metrics of many businesses in one pass: metrics holds one array per
+    metric, and the (scores, statuses, risks) arrays match score_metrics of each
+    """
+    pipeline = INDUSTRY_PIPELINES[industry]
+    scores, statuses = pipeline["health_scores"](metrics)
+    return scores, statuses, pipeline["credit_risks"](scores, metrics)
+
+
+def upload_trends(upload: FinancialUpload, industry: str, aggregates: dict):
+    """
+    Monthly series and trend indicators of an aggregated upload, see trends.py
+    """
+    pipeline = INDUSTRY_PIPELINES[industry]
+    return monthly_trends(pipeline["metrics"], upload.monthly, pipeline["aggregations"], aggregates["mode"])
+
+
+def upload_forecast(upload: FinancialUpload, industry: str, aggregates: dict, horizon: int = FORECAST_HORIZON):
+    """
+    Cash-flow forecast of an aggregated upload, see forecast.py
+    """
+    pipeline = INDUSTRY_PIPELINES[industry]
+    history = monthly_history(pipeline["metrics"], upload.monthly, pipeline["aggregations"], aggregates["mode"])
+    return cash_flow_forecasts([history], horizon)[0]
+
+
+def statistics_modes(aggregations: dict, statistics: dict):
+    """
+    The modes kept in the stored statistics of an analysis: from the value histograms
+    of a single-business upload, or as they are for a business of a portfolio
+    """
+    if "histogram" in statistics:
+        return RunningAggregator(aggregations, statistics).result()["mode"]
+    return statistics.get("mode", {})
+
+
+def statistics_aggregates(aggregations: dict, statistics: dict):
+    """
+    Whole-file aggregates from the stored statistics of an analysis; a business of a
+    portfolio keeps monthly sums only, which add up to its totals
+    """
+    if "sum" in statistics:
+        return RunningAggregator(aggregations, statistics).result()
+
+    sums, counts = {}, {}
+    for period in statistics.get("monthly", {}).get("months", {}).values():
+        for col, value in period["sum"].items():
+            sums[col] = sums.get(col, 0.0) + value
+            counts[col] = counts.get(col, 0) + period["count"][col]
+
+    aggregates = RunningAggregator(aggregations, {"sum": sums, "count": counts}).result()
+    aggregates["mode"] = statistics_modes(aggregations, statistics)
+    return aggregates
+
+
+def stored_forecasts(industry: str, statistics: list, horizon: int = FORECAST_HORIZON):
+    """
+    Cash-flow forecasts of stored analyses from the monthly sums in their statistics,
+    fitted together. None for an analysis without monthly statistics.
+    """
+    pipeline = INDUSTRY_PIPELINES[industry]
+    aggregations = pipeline["aggregations"]
+
+    histories = [
+        monthly_history(
+            pipeline["metrics"],
+            MonthlyAggregator(aggregations, stats["monthly"]),
+            aggregations,
+            statistics_modes(aggregations, stats),
+        )
+        if stats and stats.get("monthly") else None
+        for stats in statistics
+    ]
+    return cash_flow_forecasts(histories, horizon)
+
+
+def stress_analysis(industry: str, statistics: dict, **options):
+    """
+    Monte Carlo stress test of a stored analysis, see stress.py. The volatilities
+    default to the monthly revenue and expenses in its statistics.
+    """
+    pipeline = INDUSTRY_PIPELINES[industry]
+    aggregations = pipeline["aggregations"]
+    aggregates = statistics_aggregates(aggregations, statistics)
+    if "total_revenue" not in aggregates["sum"] or not aggregates["sum"]["total_revenue"] > 0:
+        raise ValueError("total_revenue must add up to more than 0")
+
+    history = None
+    if statistics.get("monthly"):
+        history = monthly_history(
+            pipeline["metrics"],
+            MonthlyAggregator(aggregations, statistics["monthly"]),
+            aggregations,
+            aggregates["mode"],
+        )
+
+    return stress_test(
+        pipeline["metrics"],
+        score_rules(industry),
+        aggregates,
+        pipeline["cost_columns"],
+        revenue_history=history[1] if history else None,
+        cost_history=history[2] if history else None,
+        industry=industry,
+        **options,
+    )
+
+
+def scenario_analysis(industry: str, statistics: dict, grid: dict, scenarios: list):
+    """
+    What-if scenarios on a stored analysis, see scenarios.py. Parameters are its
+    aggregated numeric columns and all_costs; the baseline is the analysis itself.
+    Returns (baseline, results).
+    """
+    pipeline = INDUSTRY_PIPELINES[industry]
+    aggregates = statistics_aggregates(pipeline["aggregations"], statistics)
+    if "total_revenue" not in aggregates["sum"] or not aggregates["sum"]["total_revenue"] > 0:
+        raise ValueError("total_revenue must add up to more than 0")
+
+    parameters = list(dict.fromkeys([*aggregates["sum"], *aggregates["mean"], ALL_COSTS]))
+    names, changes = scenario_changes(grid, scenarios, parameters)
+
+    # the baseline is one more scenario, with no change
+    results = run_scenarios(
+        pipeline["name"],
+        pipeline["metrics"],
+        score_rules(industry),
+        aggregates,
+        pipeline["cost_columns"],
+        names,
+        np.vstack([np.zeros(len(names)), changes]),
+        industry=industry,
+    )
+    return results[0], results[1:]
+
+
+def analyze_upload(upload: FinancialUpload, industry: str, statistics: dict | None = None):
+    """
+    statistics are the stored sufficient statistics of an earlier analysis: the
+    upload then only holds new rows, and the result covers the earlier rows too
+    """
+    check_columns(industry, upload.columns)
+    aggregations = INDUSTRY_PIPELINES[industry]["aggregations"]
+
+    if statistics is not None:
+        # e.g. overhead as one column before and split in three now
+        numeric = {col for col in [*aggregations["sum"], *aggregations["mean"]] if col in upload.columns}
+        if numeric != set(statistics["sum"]):
+            raise ValueError("New rows must have the same columns as the saved analysis")
+
+    aggregates, year = upload.aggregate(aggregations, statistics)
+    metrics = INDUSTRY_PIPELINES[industry]["metrics"](aggregates)
+    version = rules_version()
+    health_score, health_status, credit_risk = score_metrics(industry, metrics)
+
+    return {
+        "year": year,
+        "metrics": metrics,
+        "trends": upload_trends(upload, industry, aggregates),
+        "forecast": upload_forecast(upload, industry, aggregates),
+        "health_score": health_score,
+        "health_status": health_status,
+        "credit_risk": credit_risk,
+        "rules_version": version,
+        "content_hash": upload.content_hash,
+        "rows": upload.rows,
+        "statistics": upload.statistics,
+    }
+
+
+# Key columns of each period, for multi-period analysis
+PERIOD_KEYS = {
+    "year": ["year"],
+    "month": ["year", "month"],
+    "season": ["year", "season"],
+}
+
+
+def period_keys(industry: str, period: str):
+    if period not in PERIOD_KEYS:
+        raise ValueError(f"Unknown period: {period}. Use one of: {', '.join(PERIOD_KEYS)}")
+
+    keys = PERIOD_KEYS[period]
+    if not REQUIRED_COLUMNS[industry].issuperset(keys):
+        raise ValueError(f"{INDUSTRY_PIPELINES[industry]['name']} uploads have no {period} column")
+    return keys
+
+
+def analyze_upload_periods(upload: FinancialUpload, industry: str, period: str = "year"):
+    """
+    One analysis per period of the upload. A period whose metrics cannot be
+    computed (e.g. no revenue) gets an error instead of failing the others.
+    """
+    check_columns(industry, upload.columns)
+    keys = period_keys(industry, period)
+    pipeline = INDUSTRY_PIPELINES[industry]
+
+    results = []
+    for values, aggregates in upload.aggregate_periods(pipeline["aggregations"], keys):
+        result = {"year": int(values["year"])}
+        for key in keys[1:]:
+            result[key] = str(values[key])
+
+        try:
+            metrics = pipeline["metrics"](aggregates)
+        except (ValueError, ZeroDivisionError) as e:
+            results.append({**result, "error": str(e) or type(e).__name__})
+            continue
+
+        version = rules_version()
+        health_score, health_status, credit_risk = score_metrics(industry, metrics)
+        results.append({
+            **result,
+            "metrics": metrics,
+            "health_score": health_score,
+            "health_status": health_status,
+            "credit_risk": credit_risk,
+            "rules_version": version,
+        })
+
+    return results
+
+
+def select_groups(aggregates: dict, mask):
+    """
+    The aggregates of the groups where mask is True
+    """
+    return {
+        kind: values[mask] if isinstance(values, np.ndarray) else select_groups(values, mask)
+        for kind, values in aggregates.items()
+    }
+
+
+def portfolio_statistics(groups: pd.DataFrame, aggregates: dict, month_groups: pd.DataFrame | None, month_aggregates: dict | None):
+    """
+    Statistics to store with each business of a portfolio: its modes, and its monthly
+    sums and counts in the format of MonthlyAggregator.statistics(), for forecasting
+    """
+    modes = {col: values.tolist() for col, values in aggregates["mode"].items()}
+    statistics = [
+        {
+            "mode": {col: values[i] for col, values in modes.items()},
+            "monthly": {"unknown_months": False, "months": {}},
+        }
+        for i in range(len(groups))
+    ]
+    if month_groups is None:
+        return statistics
+
+    businesses = pd.Index(groups[PORTFOLIO_KEY]).get_indexer(month_groups[PORTFOLIO_KEY])
+    codes, labels = pd.factorize(month_groups["month"].astype(str))
+    months = np.array([month_number(label) for label in labels], dtype="int64")[codes]
+    years = month_groups["year"].to_numpy(dtype="float64").astype("int64")
+
+    # the mean columns come back as sums again, like MonthlyAggregator keeps them
+    counts = month_aggregates["count"]
+    sums = {
+        col: month_aggregates["sum"][col] if col in month_aggregates["sum"]
+        else np.where(counts[col] > 0, month_aggregates["mean"][col] * counts[col], 0.0)
+        for col in counts
+    }
+    sums = {col: values.tolist() for col, values in sums.items()}
+    counts = {col: values.astype("int64").tolist() for col, values in counts.items()}
+
+    for i, (business, year, month) in enumerate(zip(businesses.tolist(), years.tolist(), months.tolist())):
+        monthly = statistics[business]["monthly"]
+        if not month:
+            monthly["unknown_months"] = True
+            continue
+
+        # "Jan" and "January" of one year are the same month
+        period = monthly["months"].setdefault(f"{year}-{month:02d}", {"sum": {}, "count": {}})
+        for col in sums:
+            period["sum"][col] = period["sum"].get(col, 0.0) + sums[col][i]
+            period["count"][col] = period["count"].get(col, 0) + counts[col][i]
+
+    return statistics
+
+
+def analyze_portfolio(upload: FinancialUpload, industry: str, horizon: int = FORECAST_HORIZON):
+    """
+    Portfolio mode: one analysis per business_id of the upload, from a single grouped
+    aggregation, the metric formulas run over arrays and vectorized scoring.
+    A business without revenue gets an error instead of failing the others.
+    Results keep the order in which the businesses first appear in the file.
+
+    The same pass sums every business per month, for the cash-flow forecasts
+    (fitted all together) and for the statistics stored with each business.
+    """
+    check_columns(industry, upload.columns)
+    if PORTFOLIO_KEY not in upload.columns:
+        raise ValueError(f"Portfolio uploads need a {PORTFOLIO_KEY} column")
+
+    pipeline = INDUSTRY_PIPELINES[industry]
+    groups, aggregates, month_groups, month_aggregates = upload.aggregate_groups(
+        pipeline["aggregations"], [PORTFOLIO_KEY], first=["year"], by_month=True
+    )
+    statistics = portfolio_statistics(groups, aggregates, month_groups, month_aggregates)
+    forecasts = stored_forecasts(industry, statistics, horizon)
+
+    business_ids = groups[PORTFOLIO_KEY].astype(str).to_numpy()
+    years = aggregates["first"]["year"]
+    rows = aggregates["rows"]
+    valid = aggregates["sum"]["total_revenue"] > 0
+
+    # Division by zero only happens in the rows that get an error below
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics = pipeline["metrics"](select_groups(aggregates, valid))
+    version = rules_version()
+    scores, statuses, risks = score_metrics_batch(industry, metrics)
+
+    scored = iter(zip(
+        pd.DataFrame(metrics).to_dict("records"),
+        scores.tolist(),
+        statuses.tolist(),
+        risks.tolist(),
+    ))
+
+    results = []
+    for i, business_id in enumerate(business_ids):
+        result = {"business_id": business_id, "year": int(years[i]), "rows": int(rows[i])}
+
+        if not valid[i]:
+            results.append({**result, "error": "total_revenue must add up to more than 0"})
+            continue
+
+        metrics_row, health_score, health_status, credit_risk = next(scored)
+        results.append({
+            **result,
+            "metrics": metrics_row,
+            "forecast": forecasts[i],
+            "health_score": health_score,
+            "health_status": health_status,
+            "credit_risk": credit_risk,
+            "rules_version": version,
+            "statistics": statistics[i],
+        })
+
+    return results
+
+
+def analyze_file(industry: str, path: str, filename: str, stream: bool | None = None):
+    """
+    Worker entry point: analyzes one spooled file. Errors are returned, not raised,
+    so one bad file does not fail the whole batch.
+    """
+    try:
+        with open(path, "rb") as file:
+            result = analyze_upload(FinancialUpload(file, filename, industry, stream=stream), industry)
+    except UploadValidationError as e:
+        # the same report a single upload answers 422 with
+        return {"filename": filename, "error": "Uploaded file failed validation", "errors": e.report}
+    except Exception as e:
+        return {"filename": filename, "error": str(e)}
+
+    return {"filename": filename, **result}
+
+
+# Worker processes for batch analysis, created on first use. Every web server worker has
+# its own pool, so by default the CPUs are split between the WEB_CONCURRENCY of them
+# (gunicorn's worker count) instead of each taking them all
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", max(1, (os.cpu_count() or 1) // max(1, WEB_CONCURRENCY))))
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        # spawn: workers must not inherit the web server's threads and DB connections
+        _executor = ProcessPoolExecutor(
+            max_workers=BATCH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def analyze_files(industry: str, files: list, stream: bool | None = None):
+    """
+    Analyzes many (path, filename) pairs across the process pool, keeping input order
+    """
+    executor = get_executor()
+    futures = [
+        executor.submit(analyze_file, industry, path, filename, stream)
+        for path, filename in files
+    ]
+    return [future.result() for future in futures]
@@ -1,36 +1,48 @@
-
-
-"""
-This file is used to recommend financial products to the user based on their credit risk and health score
-"""
-
-def recommend_financial_products(industry, credit_risk, health_score, stress_indicators=None):
-
-    products = []
-
-    if credit_risk == "Low":
-        products.append("Bank Working Capital Loan")
-        products.append("Term Loan at Lower Interest")
-        
-        if industry == "Manufacturing":
-            products.append("Machinery / Equipment Loan")
-        if industry == "Logistics":
-            products.append("Fleet Expansion Loan")
-        if industry == "Ecommerce":
-            products.append("Growth Capital / Line of Credit")
-
-    elif credit_risk == "Medium":
-        products.append("NBFC Working Capital Loan")
-        products.append("Invoice Discounting")
-
-        if industry in ["Retail", "Ecommerce"]:
-            products.append("Inventory Financing")
-        if industry == "Agriculture":
-            products.append("Kisan Credit Card (KCC)")
-
-    else:  # High Risk
-        products.append("Secured NBFC Loan")
-        products.append("Short-term Working Capital Support")
-        products.append("Government-backed Credit Schemes")
-
-    return products
+
+
+"""
+This file is used to recommend financial products to the user based on their credit risk and health score
+"""
+
+def recommend_financial_products(industry, credit_risk, health_score, stress_indicators=None):
+
+    products = []
+
+    if credit_risk == "Low":
+        products.append("Bank Working Capital Loan")
+        products.append("Term Loan at Lower Interest")
+        
+        if industry == "Manufacturing":
+            products.append("Machinery / Equipment Loan")
+        if industry == "Logistics":
+            products.append("Fleet Expansion Loan")
+        if industry == "Ecommerce":
+            products.append("Growth Capital / Line of Credit")
+
+    elif credit_risk == "Medium":
+        products.append("NBFC Working Capital Loan")
+        products.append("Invoice Discounting")
+
+        if industry in ["Retail", "Ecommerce"]:
+            products.append("Inventory Financing")
+        if industry == "Agriculture":
+            products.append("Kisan Credit Card (KCC)")
+
+    else:  # High Risk
+        products.append("Secured NBFC Loan")
+        products.append("Short-term Working Capital Support")
+        products.append("Government-backed Credit Schemes")
+
+    return products
+
+
+def recommend_financial_products_batch(industry, credit_risks):
+    """
+    recommend_financial_products for an array of credit risks, e.g. one per scenario.
+    The products depend on the industry and the risk only, so each distinct risk is
+    looked up once and the lists are shared.
+    """
+    products = {}
+    for credit_risk in dict.fromkeys(credit_risks):
+        products[credit_risk] = recommend_financial_products(industry, credit_risk, None)
+    return [products[credit_risk] for credit_risk in credit_risks]
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from app.services.analysis import broadcast_aggregates
+from app.services.scoring import health_scores
+from app.services.credit import credit_risks
+from app.services.products import recommend_financial_products_batch
+
+
+"""
+This file is used to answer what-if questions on an analysis, e.g. "fuel costs +15% and
+revenue -10%": a grid of percentage changes to its aggregated columns, with the metrics,
+health score, credit risk and financial products of every scenario computed as one batch
+of arrays, the way portfolio mode scores many businesses.
+"""
+
+
+# Most scenarios one request may ask for, grid and list together
+MAX_SCENARIOS = 10_000
+
+# Parameter that changes every cost column of the industry at once
+ALL_COSTS = "all_costs"
+
+
+def scenario_changes(grid: dict, scenarios: list, parameters: list):
+    """
+    (names, changes): the parameter names, and a (scenarios, parameters) array of
+    percentage changes holding every combination of the grid, then the listed
+    scenarios. A parameter a scenario leaves out does not change (0%).
+    """
+    names = list(dict.fromkeys([*grid, *(name for scenario in scenarios for name in scenario)]))
+    unknown = [name for name in names if name not in parameters]
+    if unknown:
+        raise ValueError(f"Unknown scenario parameters: {unknown}. Use any of: {', '.join(parameters)}")
+
+    if grid and any(not values for values in grid.values()):
+        raise ValueError("Every grid parameter needs at least one value")
+
+    size = (int(np.prod([len(values) for values in grid.values()])) if grid else 0) + len(scenarios)
+    if size == 0:
+        raise ValueError("Give a grid or a list of scenarios")
+    if size > MAX_SCENARIOS:
+        raise ValueError(f"At most {MAX_SCENARIOS} scenarios per request, got {size}")
+
+    blocks = []
+    if grid:
+        combinations = np.meshgrid(*[np.asarray(values, dtype="float64") for values in grid.values()], indexing="ij")
+        block = np.zeros((combinations[0].size, len(names)))
+        for values, name in zip(combinations, grid):
+            block[:, names.index(name)] = values.ravel()
+        blocks.append(block)
+    if scenarios:
+        blocks.append(np.array([[scenario.get(name, 0.0) for name in names] for scenario in scenarios], dtype="float64"))
+
+    changes = np.concatenate(blocks)
+    if (changes <= -100).any():
+        raise ValueError("A change must be above -100%")
+    return names, changes
+
+
+def run_scenarios(
+    industry_name: str,
+    metrics_function,
+    score_rules: list,
+    aggregates: dict,
+    cost_columns: list,
+    names: list,
+    changes: np.ndarray,
+    industry: str | None = None,
+):
+    """
+    Metrics, health score, credit risk and products of every scenario, as a list
+    of results in the order of changes. With the industry, its default model gives
+    the credit risk where it can, as for the saved analysis. Changes to one column multiply, so
+    all_costs +10% with fuel_cost +5% moves fuel by 15.5%.
+    """
+    size = len(changes)
+    factors = {}
+    for i, name in enumerate(names):
+        for col in cost_columns if name == ALL_COSTS else [name]:
+            factors[col] = factors.get(col, 1.0) * (1 + changes[:, i] / 100)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics = metrics_function(broadcast_aggregates(aggregates, size, factors))
+    scores, statuses = health_scores(metrics, score_rules)
+    risks = credit_risks(scores, metrics, industry).tolist()
+    products = recommend_financial_products_batch(industry_name, risks)
+
+    return [
+        {
+            "changes": dict(zip(names, change)),
+            "metrics": metrics_row,
+            "health_score": health_score,
+            "health_status": health_status,
+            "credit_risk": credit_risk,
+            "products": scenario_products,
+        }
+        for change, metrics_row, health_score, health_status, credit_risk, scenario_products in zip(
+            changes.tolist(),
+            pd.DataFrame(metrics, index=range(size)).to_dict("records"),
+            scores.tolist(),
+            statuses.tolist(),
+            risks,
+            products,
+        )
+    ]
@@ -1,151 +1,263 @@
-
-"""
-This file is used to calculate the health score of all the business types
-"""
-
-
-def agricultural_health_score(metrics):
-
-    score = 100
-    
-    if metrics['profit_margin'] < 10:
-        score -=25
-    if metrics['debt_service_ratio'] > 0.3:
-        score -=20
-    if metrics['inventory_loss_value'] > 5:
-        score -=15
-    if metrics['storage_risk_score'] > 60:
-        score -=10
-
-    if score >=75:
-        status = "Healthy"
-    elif score >=50:
-        status = "Watch"
-    else:
-        status = "Stressed"
-    
-    return score,status
-
-
-## Manufacturing Industry Scoring
-
-def manufacturing_health_score(metrics):
-    score = 100
-
-    if metrics["profit_margin"] < 12:
-        score -= 25
-
-    if metrics["capacity_utilization"] < 60:
-        score -= 20
-
-    if metrics["inventory_blockage_ratio"] > 0.4:
-        score -= 15
-
-    if metrics["debt_service_ratio"] > 0.3:
-        score -= 15
-
-    if score >= 75:
-        status = "Healthy"
-    elif score >= 50:
-        status = "Watch"
-    else:
-        status = "Stressed"
-
-    return score, status
-
-
-# Retail Industry Scoring
-
-def retail_health_score(metrics):
-    score = 100
-
-    if metrics["profit_margin"] < 8:
-        score -= 25
-
-    if metrics["inventory_blockage_ratio"] > 0.5:
-        score -= 20
-
-    if metrics["inventory_risk_score"] > 30:
-        score -= 15
-
-    if metrics["discount_impact_ratio"] > 0.2:
-        score -= 10
-
-    if metrics["debt_service_ratio"] > 0.3:
-        score -= 15
-
-    if score >= 75:
-        status = "Healthy"
-    elif score >= 50:
-        status = "Watch"
-    else:
-        status = "Stressed"
-
-    return score, status
-
-
-# Logistics Industry Scoring
-def logistics_health_score(metrics):
-    score = 100
-
-    if metrics["profit_margin"] < 10:
-        score -= 25
-
-    if metrics["on_time_delivery_percentage"] < 90:
-        score -= 20
-
-    if metrics["fuel_cost_ratio"] > 0.4:
-        score -= 15
-
-    if metrics["asset_blockage_ratio"] > 0.4:
-        score -= 15
-
-    if metrics["debt_service_ratio"] > 0.3:
-        score -= 15
-
-    if score >= 75:
-        status = "Healthy"
-    elif score >= 50:
-        status = "Watch"
-    else:
-        status = "Stressed"
-
-    return score, status
-
-# Ecommerce Industry Scoring
-
-def ecommerce_health_score(metrics):
-    score = 100
-
-    # Profitability check
-    if metrics["profit_margin"] < 8:
-        score -= 25
-
-    # Inventory blockage risk
-    if metrics["inventory_blockage_ratio"] > 0.5:
-        score -= 20
-
-    # High return rate hurts cash flow
-    if metrics["return_rate_percentage"] > 20:
-        score -= 15
-
-    # Platform fee pressure
-    if metrics["platform_fee_ratio"] > 0.18:
-        score -= 10
-
-    # Debt pressure
-    if metrics["debt_service_ratio"] > 0.3:
-        score -= 15
-
-    # Health status mapping
-    if score >= 75:
-        status = "Healthy"
-    elif score >= 50:
-        status = "Watch"
-    else:
-        status = "Stressed"
-
-    return score, status
-
-    
-    
\ No newline at end of file
+import os
+import json
+import time
+import logging
+import operator
+import threading
+import numpy as np
+from app.services.metrics import METRIC_REGISTRY, check_metric_names
+
+
+"""
+This file is used to calculate the health score of all the business types
+"""
+
+
+"""
+Every business starts at 100 and loses the penalty of each rule its metrics break.
+A rule is (metric, comparison, threshold, penalty). The same tables score one
+business (plain floats) or a whole portfolio at once (NumPy arrays of metrics).
+
+The rules of every industry live in a versioned JSON file, compiled into these
+tables when it is loaded and loaded again when it changes, without a restart.
+Saved analyses record the rules version that scored them, and persistence
+rescores the ones of an older version in the database, see rescore.py.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Score at or above which a business gets the status, checked in order
+STATUS_CUTOFFS = [(75, "Healthy"), (50, "Watch")]
+LOWEST_STATUS = "Stressed"
+
+# The rules file, and how often it is checked for changes
+SCORING_RULES_PATH = os.getenv("SCORING_RULES_PATH", os.path.join(os.path.dirname(__file__), "scoring_rules.json"))
+SCORING_RULES_CHECK_SECONDS = float(os.getenv("SCORING_RULES_CHECK_SECONDS", 5))
+
+# Comparisons a rule may use. They work on floats, arrays and SQL columns alike.
+COMPARISONS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+def breaks_rule(value, comparison: str, threshold):
+    return COMPARISONS[comparison](value, threshold)
+
+
+def health_status(score):
+    for cutoff, status in STATUS_CUTOFFS:
+        if score >= cutoff:
+            return status
+    return LOWEST_STATUS
+
+
+def health_score(metrics: dict, rules: list):
+    score = 100
+
+    for metric, comparison, threshold, penalty in rules:
+        if breaks_rule(metrics[metric], comparison, threshold):
+            score -= penalty
+
+    return score, health_status(score)
+
+
+def score_tiers(scores, cutoffs: list):
+    """
+    0 for the best tier of the cutoffs, 1 for the next one and so on
+    """
+    return sum((scores < cutoff).astype("int64") for cutoff, _ in cutoffs)
+
+
+# Status of each tier of score_tiers(scores, STATUS_CUTOFFS)
+STATUS_LABELS = np.array([status for _, status in STATUS_CUTOFFS] + [LOWEST_STATUS])
+
+
+def health_scores(metrics: dict, rules: list):
+    """
+    Vectorized health_score: metrics holds one array per metric, one entry per
+    business. Returns (scores, statuses) as arrays in the same order, equal to
+    health_score of every business.
+    """
+    size = len(next(iter(metrics.values())))
+    scores = np.full(size, 100, dtype="int64")
+
+    for metric, comparison, threshold, penalty in rules:
+        np.subtract(scores, penalty, out=scores, where=breaks_rule(np.asarray(metrics[metric]), comparison, threshold))
+
+    return scores, STATUS_LABELS[score_tiers(scores, STATUS_CUTOFFS)]
+
+
+## Rules
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def compile_rules(config: dict):
+    """
+    Checks a rules config (the JSON of the rules file) and compiles it into
+    {"version", "industries": {industry: [(metric, comparison, threshold, penalty)]}}.
+    Raises ValueError when anything is off, so a bad edit never replaces working rules.
+    """
+    version = config.get("version")
+    if not isinstance(version, int) or isinstance(version, bool) or version < 1:
+        raise ValueError("Scoring rules need a version that is a positive integer")
+
+    industries = config.get("industries") or {}
+    missing = set(METRIC_REGISTRY) - set(industries)
+    if missing:
+        raise ValueError(f"Scoring rules are missing for {sorted(missing)}")
+
+    compiled = {}
+    for industry, rules in industries.items():
+        if industry not in METRIC_REGISTRY:
+            raise ValueError(f"Unknown industry in scoring rules: {industry}")
+
+        compiled[industry] = []
+        for rule in rules:
+            if not isinstance(rule, dict):
+                raise ValueError(f"{industry}: every rule must be an object")
+            if rule.get("comparison") not in COMPARISONS:
+                raise ValueError(f"{industry}: comparison must be one of {list(COMPARISONS)}")
+            if not _is_number(rule.get("threshold")):
+                raise ValueError(f"{industry}: threshold of {rule.get('metric')} must be a number")
+            if not isinstance(rule.get("penalty"), int) or isinstance(rule.get("penalty"), bool) or rule["penalty"] < 0:
+                raise ValueError(f"{industry}: penalty of {rule.get('metric')} must be a whole number of 0 or more")
+
+            compiled[industry].append((rule.get("metric"), rule["comparison"], rule["threshold"], rule["penalty"]))
+
+        check_metric_names(industry, [metric for metric, *_ in compiled[industry]])
+
+    return {"version": version, "industries": compiled}
+
+
+def check_rules_version(loaded: dict, rules: dict):
+    """
+    Raises ValueError when compiled rules cannot replace the loaded ones: the version
+    never goes down and must go up when any rule changes, else analyses scored before
+    and after the edit would share a version and rescoring would skip them
+    """
+    if rules["version"] < loaded["version"]:
+        raise ValueError(f"Scoring rules version {rules['version']} is older than the loaded version {loaded['version']}")
+    if rules["version"] == loaded["version"] and rules["industries"] != loaded["industries"]:
+        raise ValueError(f"Scoring rules changed without a new version (still {rules['version']})")
+
+
+class ScoringRules:
+    """
+    The compiled rules of a rules file. current() looks at the file's modification
+    time at most every check_seconds and compiles it again when it changed. A file
+    that fails to load, or changes the rules without a higher version, keeps the
+    rules loaded before it; error holds the reason, logged once, and the file is
+    not tried again until it changes. The first load has nothing to fall back to,
+    so it raises.
+    """
+
+    def __init__(self, path: str, check_seconds: float = SCORING_RULES_CHECK_SECONDS):
+        self.path = path
+        self.check_seconds = check_seconds
+        self.error = None
+        self._lock = threading.Lock()
+        self._mtime = os.stat(path).st_mtime_ns
+        # modification time of the file that last failed to load (None: missing), -1 for none
+        self._failed_mtime = -1
+        self._checked = time.monotonic()
+        self._rules = self._load()
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as file:
+            return compile_rules(json.load(file))
+
+    def reload(self):
+        """
+        Compiles the file again now, returns the version in use afterwards
+        """
+        with self._lock:
+            self._checked = time.monotonic()
+            mtime = None
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                rules = self._load()
+                check_rules_version(self._rules, rules)
+            except Exception as e:
+                self.error = str(e)
+                if mtime != self._failed_mtime:
+                    logger.warning("Scoring rules not reloaded from %s: %s", self.path, self.error)
+                self._failed_mtime = mtime
+            else:
+                self._mtime, self._rules, self.error, self._failed_mtime = mtime, rules, None, -1
+            return self._rules["version"]
+
+    def current(self):
+        if time.monotonic() - self._checked >= self.check_seconds:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime != self._mtime and mtime != self._failed_mtime:
+                self.reload()
+            else:
+                self._checked = time.monotonic()
+        return self._rules
+
+
+SCORING_RULES = ScoringRules(SCORING_RULES_PATH)
+
+
+def score_rules(industry: str):
+    """
+    The rules of an industry in the current version
+    """
+    return SCORING_RULES.current()["industries"][industry]
+
+
+def rules_version():
+    return SCORING_RULES.current()["version"]
+
+
+## Agriculture Industry Scoring
+
+def agricultural_health_score(metrics):
+    return health_score(metrics, score_rules("agriculture"))
+
+
+def agricultural_health_scores(metrics):
+    return health_scores(metrics, score_rules("agriculture"))
+
+
+## Manufacturing Industry Scoring
+
+def manufacturing_health_score(metrics):
+    return health_score(metrics, score_rules("manufacturing"))
+
+
+def manufacturing_health_scores(metrics):
+    return health_scores(metrics, score_rules("manufacturing"))
+
+
+# Retail Industry Scoring
+
+def retail_health_score(metrics):
+    return health_score(metrics, score_rules("retail"))
+
+
+def retail_health_scores(metrics):
+    return health_scores(metrics, score_rules("retail"))
+
+
+# Logistics Industry Scoring
+
+def logistics_health_score(metrics):
+    return health_score(metrics, score_rules("logistics"))
+
+
+def logistics_health_scores(metrics):
+    return health_scores(metrics, score_rules("logistics"))
+
+
+# Ecommerce Industry Scoring
+
+def ecommerce_health_score(metrics):
+    return health_score(metrics, score_rules("ecommerce"))
+
+
+def ecommerce_health_scores(metrics):
+    return health_scores(metrics, score_rules("ecommerce"))
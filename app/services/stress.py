@@ -0,0 +1,173 @@
+import os
+import numpy as np
+from app.services.analysis import broadcast_aggregates
+from app.services.scoring import STATUS_CUTOFFS, LOWEST_STATUS, health_scores, score_tiers
+from app.services.credit import CREDIT_LABELS, credit_risks
+
+
+"""
+This file is used to stress test the debt service capacity of a business: thousands of
+monthly revenue and cost shock paths, all simulated as one (simulations, months) array,
+and the metrics, health score and credit risk of every path from the same array code as
+portfolio mode. The result is how likely the business is to fall a tier.
+"""
+
+
+# Paths per stress test, and the most a caller may ask for
+STRESS_SIMULATIONS = int(os.getenv("STRESS_SIMULATIONS", 10_000))
+MAX_STRESS_SIMULATIONS = 100_000
+
+# Months per path: the shocks of a year add up to the annual totals the metrics use
+STRESS_MONTHS = 12
+
+# Monthly volatility used when a business has fewer months of history than
+# MIN_VOLATILITY_MONTHS, and the range its own volatility is kept within
+DEFAULT_REVENUE_VOLATILITY = 0.15
+DEFAULT_COST_VOLATILITY = 0.10
+MIN_VOLATILITY_MONTHS = 4
+VOLATILITY_RANGE = (0.02, 0.5)
+
+# How much of a monthly shock carries into the next month, and how costs follow revenue
+SHOCK_PERSISTENCE = 0.6
+SHOCK_CORRELATION = 0.5
+
+# Metrics whose spread is reported, when the industry has them
+STRESS_METRICS = ["debt_service_ratio", "profit_margin"]
+
+
+def monthly_volatility(values, default: float):
+    """
+    Standard deviation of the month-over-month log changes of a series, or default
+    when there are too few positive months to tell
+    """
+    if values is None:
+        return default
+
+    values = np.asarray(values, dtype="float64")
+    values = values[values > 0]
+    if len(values) < MIN_VOLATILITY_MONTHS:
+        return default
+    return float(np.clip(np.diff(np.log(values)).std(ddof=1), *VOLATILITY_RANGE))
+
+
+def shock_factors(innovations: np.ndarray, volatility: float):
+    """
+    Annual multiplier of every path from its (simulations, months) standard normal
+    innovations: the mean over the months of exp(x), where x is an AR(1) path of
+    monthly log shocks, mean-corrected so the expected multiplier is 1. The recursion
+    is a lower-triangular matrix, so all the paths are one matrix product.
+    """
+    months = innovations.shape[1]
+    lags = np.subtract.outer(np.arange(months), np.arange(months))
+    carry = np.where(lags >= 0, SHOCK_PERSISTENCE ** np.maximum(lags, 0), 0.0)
+
+    paths = volatility * innovations @ carry.T
+    variance = volatility ** 2 * (carry ** 2).sum(axis=1)
+    return np.exp(paths - variance / 2).mean(axis=1)
+
+
+def risk_tiers(risks):
+    """
+    0 for the lowest credit risk, 1 for the next one and so on
+    """
+    return (np.asarray(risks)[:, None] == CREDIT_LABELS).argmax(axis=1)
+
+
+def _shares(values, labels: list):
+    return {label: round(float((values == label).mean()), 4) for label in labels}
+
+
+def _spread(values):
+    # paths whose metric is NaN or inf (e.g. a ratio over no revenue) are left out
+    values = np.asarray(values, dtype="float64")
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return {"mean": None, "p5": None, "p50": None, "p95": None}
+
+    p5, p50, p95 = np.percentile(values, [5, 50, 95]).tolist()
+    return {"mean": round(float(values.mean()), 2), "p5": round(p5, 2), "p50": round(p50, 2), "p95": round(p95, 2)}
+
+
+def stress_test(
+    metrics_function,
+    score_rules: list,
+    aggregates: dict,
+    cost_columns: list,
+    revenue_history=None,
+    cost_history=None,
+    simulations: int = STRESS_SIMULATIONS,
+    months: int = STRESS_MONTHS,
+    revenue_volatility: float | None = None,
+    cost_volatility: float | None = None,
+    revenue_shock: float = 0.0,
+    cost_shock: float = 0.0,
+    seed: int | None = None,
+    industry: str | None = None,
+):
+    """
+    aggregates are the whole-file aggregates of one business. Every path scales its
+    total_revenue by a revenue multiplier and its cost_columns by a cost multiplier,
+    with the mean shifted by revenue_shock and cost_shock (percentages); the EMI and
+    the other columns stay as they are. Volatilities default to the business's own
+    monthly history (revenue_history, cost_history), else to the DEFAULT_* ones.
+    With the industry, its default model gives the credit risks where it can.
+    """
+    if not 1 <= simulations <= MAX_STRESS_SIMULATIONS:
+        raise ValueError(f"Simulations must be between 1 and {MAX_STRESS_SIMULATIONS}")
+
+    if revenue_volatility is None:
+        revenue_volatility = monthly_volatility(revenue_history, DEFAULT_REVENUE_VOLATILITY)
+    if cost_volatility is None:
+        cost_volatility = monthly_volatility(cost_history, DEFAULT_COST_VOLATILITY)
+
+    rng = np.random.default_rng(seed)
+    revenue_shocks, cost_noise = rng.standard_normal((2, simulations, months))
+    cost_shocks = SHOCK_CORRELATION * revenue_shocks + np.sqrt(1 - SHOCK_CORRELATION ** 2) * cost_noise
+
+    revenue_factors = shock_factors(revenue_shocks, revenue_volatility) * (1 + revenue_shock / 100)
+    cost_factors = shock_factors(cost_shocks, cost_volatility) * (1 + cost_shock / 100)
+
+    paths = broadcast_aggregates(
+        aggregates, simulations, {"total_revenue": revenue_factors, **{col: cost_factors for col in cost_columns}}
+    )
+
+    baseline_metrics = metrics_function(aggregates)
+    baseline_scores, baseline_statuses = health_scores({name: [value] for name, value in baseline_metrics.items()}, score_rules)
+    baseline_risks = credit_risks(baseline_scores, {name: [value] for name, value in baseline_metrics.items()}, industry)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics = metrics_function(paths)
+    scores, statuses = health_scores(metrics, score_rules)
+    risks = credit_risks(scores, metrics, industry)
+
+    status_down = score_tiers(scores, STATUS_CUTOFFS) > score_tiers(baseline_scores, STATUS_CUTOFFS)
+    risk_down = risk_tiers(risks) > risk_tiers(baseline_risks)
+
+    return {
+        "simulations": simulations,
+        "months": months,
+        "assumptions": {
+            "revenue_volatility": round(revenue_volatility, 4),
+            "cost_volatility": round(cost_volatility, 4),
+            "correlation": SHOCK_CORRELATION,
+            "persistence": SHOCK_PERSISTENCE,
+            "revenue_shock": revenue_shock,
+            "cost_shock": cost_shock,
+        },
+        "baseline": {
+            "health_score": int(baseline_scores[0]),
+            "health_status": str(baseline_statuses[0]),
+            "credit_risk": str(baseline_risks[0]),
+            **{name: baseline_metrics[name] for name in STRESS_METRICS if name in baseline_metrics},
+        },
+        "probability_status_downgrade": round(float(status_down.mean()), 4),
+        "probability_credit_downgrade": round(float(risk_down.mean()), 4),
+        "probability_any_downgrade": round(float((status_down | risk_down).mean()), 4),
+        "probability_loss": round(float((np.asarray(metrics["profit"]) < 0).mean()), 4),
+        "health_score": _spread(scores),
+        **{name: _spread(np.asarray(metrics[name], dtype="float64")) for name in STRESS_METRICS if name in metrics},
+        "revenue_change_percentage": _spread((revenue_factors - 1) * 100),
+        "cost_change_percentage": _spread((cost_factors - 1) * 100),
+        "health_status": _shares(statuses, [status for _, status in STATUS_CUTOFFS] + [LOWEST_STATUS]),
+        "credit_risk": _shares(risks, CREDIT_LABELS.tolist()),
+    }
@@ -1,188 +1,298 @@
-import csv
-from io import StringIO
-from fastapi.responses import StreamingResponse
-
-AGRICULTURE_COLUMNS = [
-    "year",
-    "month",
-    "season",
-    "primary_crop_type",
-    "total_revenue",
-    "quantity_sold",
-    "avg_selling_price",
-    "total_expenses",
-    "input_cost_percentage",
-    "harvested_inventory_quantity",
-    "inventory_loss_percentage",
-    "storage_type",
-    "loan_outstanding_amount",
-    "emi_amount",
-    "loan_type",
-]
-
-MANUFACTURING_COLUMNS = [
-    "year",
-    "month",
-
-    # Production details
-    "product_name",
-    "units_produced",
-    "units_sold",
-    "production_capacity_utilization_percentage",
-
-    # Revenue & pricing
-    "total_revenue",
-    "avg_selling_price",
-
-    # Cost breakdown
-    "raw_material_cost",
-    "labor_cost",
-    "overhead_cost",
-    "total_expenses",
-
-    # Inventory
-    "opening_inventory_units",
-    "closing_inventory_units",
-    "inventory_holding_cost",
-
-    # Quality & efficiency
-    "defect_rate_percentage",
-    "downtime_hours",
-
-    # Finance
-    "loan_outstanding_amount",
-    "emi_amount",
-    "loan_type",
-]
-
-RETAIL_COLUMNS = [
-    "year",
-    "month",
-
-    # Store & product info
-    "store_type",                # e.g., Grocery, Apparel, Electronics
-    "product_category",
-
-    # Sales volume
-    "units_sold",
-    "avg_selling_price",
-
-    # Revenue
-    "total_revenue",
-
-    # Cost structure
-    "cost_of_goods_sold",        # COGS
-    "operational_expenses",      # rent, staff, utilities, marketing
-    "total_expenses",
-
-    # Inventory
-    "opening_inventory_units",
-    "closing_inventory_units",
-    "inventory_shrinkage_percentage",
-
-    # Customer metrics
-    "footfall_count",
-    "conversion_rate_percentage",
-
-    # Pricing & margin
-    "discount_percentage",
-    "gross_margin_percentage",
-
-    # Finance
-    "loan_outstanding_amount",
-    "emi_amount",
-    "loan_type",
-]
-
-LOGISTICS_COLUMNS = [
-    "year",
-    "month",
-
-    # Fleet & operations
-    "vehicle_type",                 # Truck, Van, Bike, Container
-    "number_of_vehicles",
-    "total_trips",
-
-    # Distance & usage
-    "total_distance_km",
-    "fuel_consumed_liters",
-
-    # Revenue
-    "total_revenue",
-
-    # Cost structure
-    "fuel_cost",
-    "driver_salary_cost",
-    "maintenance_cost",
-    "toll_and_permit_cost",
-    "warehouse_cost",
-    "other_operational_expenses",
-    "total_expenses",
-
-    # Delivery performance
-    "shipments_delivered",
-    "on_time_delivery_percentage",
-    "damaged_goods_percentage",
-
-    # Asset health
-    "vehicle_downtime_percentage",
-
-    # Finance
-    "loan_outstanding_amount",
-    "emi_amount",
-    "loan_type",
-]
-
-ECOMMERCE_COLUMNS = [
-    "year",
-    "month",
-
-    # Store performance
-    "platform",                     # Shopify, Amazon, Flipkart, Custom
-    "total_orders",
-    "total_units_sold",
-
-    # Revenue
-    "gross_sales",                  # Before returns & discounts
-    "discount_amount",
-    "net_revenue",                  # After discounts, before expenses
-
-    # Marketing
-    "marketing_spend",
-    "customer_acquisition_cost",
-    "conversion_rate_percentage",
-
-    # Fulfillment & operations
-    "shipping_cost",
-    "packaging_cost",
-    "payment_gateway_fees",
-    "platform_commission",
-    "warehouse_cost",
-    "other_operational_expenses",
-    "total_expenses",
-
-    # Customer quality
-    "return_rate_percentage",
-    "refund_amount",
-    "average_order_value",
-
-    # Inventory
-    "inventory_holding_cost",
-    "stock_out_days",
-
-    # Finance
-    "loan_outstanding_amount",
-    "emi_amount",
-    "loan_type",
-]
-
-
-
-
-TEMPLATE_MAP = {
-    "agriculture": AGRICULTURE_COLUMNS,
-    "manufacturing": MANUFACTURING_COLUMNS,
-    "retail": RETAIL_COLUMNS,
-    "logistics": LOGISTICS_COLUMNS,
-    "ecommerce": ECOMMERCE_COLUMNS,
-}
+import csv
+from io import StringIO
+from fastapi.responses import StreamingResponse
+
+AGRICULTURE_COLUMNS = [
+    "year",
+    "month",
+    "season",
+    "primary_crop_type",
+    "total_revenue",
+    "quantity_sold",
+    "avg_selling_price",
+    "total_expenses",
+    "input_cost_percentage",
+    "harvested_inventory_quantity",
+    "inventory_loss_percentage",
+    "storage_type",
+    "loan_outstanding_amount",
+    "emi_amount",
+    "loan_type",
+]
+
+MANUFACTURING_COLUMNS = [
+    "year",
+    "month",
+
+    # Production details
+    "product_name",
+    "units_produced",
+    "units_sold",
+    "production_capacity_utilization_percentage",
+
+    # Revenue & pricing
+    "total_revenue",
+    "avg_selling_price",
+
+    # Cost breakdown
+    "raw_material_cost",
+    "labor_cost",
+    "overhead_cost",
+    "total_expenses",
+
+    # Inventory
+    "opening_inventory_units",
+    "closing_inventory_units",
+    "inventory_holding_cost",
+
+    # Quality & efficiency
+    "defect_rate_percentage",
+    "downtime_hours",
+
+    # Finance
+    "loan_outstanding_amount",
+    "emi_amount",
+    "loan_type",
+]
+
+RETAIL_COLUMNS = [
+    "year",
+    "month",
+
+    # Store & product info
+    "store_type",                # e.g., Grocery, Apparel, Electronics
+    "product_category",
+
+    # Sales volume
+    "units_sold",
+    "avg_selling_price",
+
+    # Revenue
+    "total_revenue",
+
+    # Cost structure
+    "cost_of_goods_sold",        # COGS
+    "operational_expenses",      # rent, staff, utilities, marketing
+    "total_expenses",
+
+    # Inventory
+    "opening_inventory_units",
+    "closing_inventory_units",
+    "inventory_shrinkage_percentage",
+
+    # Customer metrics
+    "footfall_count",
+    "conversion_rate_percentage",
+
+    # Pricing & margin
+    "discount_percentage",
+    "gross_margin_percentage",
+
+    # Finance
+    "loan_outstanding_amount",
+    "emi_amount",
+    "loan_type",
+]
+
+LOGISTICS_COLUMNS = [
+    "year",
+    "month",
+
+    # Fleet & operations
+    "vehicle_type",                 # Truck, Van, Bike, Container
+    "number_of_vehicles",
+    "total_trips",
+
+    # Distance & usage
+    "total_distance_km",
+    "fuel_consumed_liters",
+
+    # Revenue
+    "total_revenue",
+
+    # Cost structure
+    "fuel_cost",
+    "driver_salary_cost",
+    "maintenance_cost",
+    "toll_and_permit_cost",
+    "warehouse_cost",
+    "other_operational_expenses",
+    "total_expenses",
+
+    # Delivery performance
+    "shipments_delivered",
+    "on_time_delivery_percentage",
+    "damaged_goods_percentage",
+
+    # Asset health
+    "vehicle_downtime_percentage",
+
+    # Finance
+    "loan_outstanding_amount",
+    "emi_amount",
+    "loan_type",
+]
+
+ECOMMERCE_COLUMNS = [
+    "year",
+    "month",
+
+    # Store performance
+    "platform",                     # Shopify, Amazon, Flipkart, Custom
+    "total_orders",
+    "total_units_sold",
+
+    # Revenue
+    "gross_sales",                  # Before returns & discounts
+    "discount_amount",
+    "net_revenue",                  # After discounts, before expenses
+
+    # Marketing
+    "marketing_spend",
+    "customer_acquisition_cost",
+    "conversion_rate_percentage",
+
+    # Fulfillment & operations
+    "shipping_cost",
+    "packaging_cost",
+    "payment_gateway_fees",
+    "platform_commission",
+    "warehouse_cost",
+    "other_operational_expenses",
+    "total_expenses",
+
+    # Customer quality
+    "return_rate_percentage",
+    "refund_amount",
+    "average_order_value",
+
+    # Inventory
+    "inventory_holding_cost",
+    "stock_out_days",
+
+    # Finance
+    "loan_outstanding_amount",
+    "emi_amount",
+    "loan_type",
+]
+
+
+
+
+TEMPLATE_MAP = {
+    "agriculture": AGRICULTURE_COLUMNS,
+    "manufacturing": MANUFACTURING_COLUMNS,
+    "retail": RETAIL_COLUMNS,
+    "logistics": LOGISTICS_COLUMNS,
+    "ecommerce": ECOMMERCE_COLUMNS,
+}
+
+
+# Columns the analysis endpoints need in an upload, per industry.
+# The template columns above are what we hand out for download.
+
+REQUIRED_COLUMNS = {
+    "agriculture": {
+        "month", "season", "primary_crop_type","year",
+        "total_revenue", "quantity_sold", "avg_selling_price",
+        "total_expenses", "input_cost_percentage",
+        "harvested_inventory_quantity", "inventory_loss_percentage",
+        "storage_type",
+        "loan_outstanding_amount", "emi_amount", "loan_type"
+    },
+    "manufacturing": {
+        "month", "product_type","year",
+        "production_capacity", "actual_production",
+        "total_revenue", "units_sold", "avg_selling_price", "sales_channel",
+        "raw_material_cost", "direct_labor_cost",
+        "raw_material_inventory_value",
+        "wip_inventory_value",
+        "finished_goods_inventory_value",
+        "loan_outstanding_amount", "emi_amount", "loan_type"
+    },
+    "retail": {
+        "month", "store_type", "product_category","year",
+        "total_revenue", "quantity_sold", "avg_selling_price",
+        "discount_percentage", "sales_channel",
+        "cost_of_goods_sold", "store_operating_cost",
+        "logistics_cost", "loss_cost",
+        "inventory_value",
+        "slow_moving_inventory_percentage",
+        "expired_inventory_percentage",
+        "stock_age_days_avg",
+        "loan_outstanding_amount", "emi_amount", "loan_type"
+    },
+    "logistics": {
+        "month", "service_type", "delivery_type","year",
+        "total_revenue", "distance_km", "weight_volume", "rate_per_unit", "fuel_surcharge",
+        "fuel_cost", "driver_wages", "vehicle_cost", "warehouse_cost", "other_operating_cost",
+        "total_shipments", "on_time_delivery_percentage",
+        "avg_goods_in_transit_value", "avg_storage_days",
+        "loan_outstanding_amount", "emi_amount", "loan_type"
+    },
+    "ecommerce": {
+        "month", "seller_type", "product_category", "sales_region","year",
+        "total_revenue", "orders_count", "avg_order_value",
+        "discount_percentage", "platform_fee_percentage",
+        "cost_of_goods_sold", "fulfillment_cost", "shipping_cost",
+        "payment_gateway_cost", "marketing_cost", "returns_cost",
+        "inventory_value", "stock_age_days_avg", "return_rate_percentage",
+        "loan_outstanding_amount", "emi_amount", "loan_type"
+    },
+}
+
+# Manufacturing overhead comes either as one column or split in three
+OVERHEAD_DIRECT = {"overhead_cost"}
+OVERHEAD_SPLIT = {"power_cost", "rent_cost", "maintenance_cost"}
+
+# Identifies each business of a portfolio upload (one file with many SMEs)
+PORTFOLIO_KEY = "business_id"
+
+OPTIONAL_COLUMNS = {
+    "agriculture": {PORTFOLIO_KEY},
+    "manufacturing": {PORTFOLIO_KEY} | OVERHEAD_DIRECT | OVERHEAD_SPLIT,
+    "retail": {PORTFOLIO_KEY},
+    "logistics": {PORTFOLIO_KEY},
+    "ecommerce": {PORTFOLIO_KEY},
+}
+
+# Text columns, parsed as pandas category. Every other column is numeric.
+CATEGORY_COLUMNS = {
+    "month", "season", "primary_crop_type", "storage_type", "loan_type",
+    "product_type", "sales_channel", "store_type", "product_category",
+    "service_type", "delivery_type", "seller_type", "sales_region",
+    PORTFOLIO_KEY,
+}
+
+"""
+Validation rules per column of an upload. "type" is number, integer or text,
+"min" / "max" bound numbers and "nullable" allows empty cells. Money, counts
+and percentages are never negative, and percentages are at most 100.
+"""
+RULE_OVERRIDES = {
+    "year": {"type": "integer", "min": 1900, "max": 2100},
+    # optional column, but every row of a portfolio must name its business
+    PORTFOLIO_KEY: {"nullable": False},
+}
+
+
+def column_rule(col: str, required: bool = True):
+    if col in CATEGORY_COLUMNS:
+        rule = {"type": "text"}
+    else:
+        rule = {"type": "number", "min": 0}
+        if col.endswith("_percentage"):
+            rule["max"] = 100
+
+    rule["nullable"] = not required
+    rule.update(RULE_OVERRIDES.get(col, {}))
+    return rule
+
+
+COLUMN_RULES = {
+    industry: {
+        **{col: column_rule(col) for col in columns},
+        **{col: column_rule(col, required=False) for col in OPTIONAL_COLUMNS.get(industry, set())},
+    }
+    for industry, columns in REQUIRED_COLUMNS.items()
+}
@@ -0,0 +1,246 @@
+import numpy as np
+import pandas as pd
+
+
+"""
+This file is used to build the monthly series of an upload (revenue, expenses, margin and
+debt service per month) and the trend indicators on top of them: rolling growth, volatility
+and seasonality. The month column is read in the same pass as the whole-file aggregates.
+"""
+
+
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# "Jan", "January", "jan", "1" and "01" all mean month 1
+MONTH_NUMBERS = {
+    **{name.lower(): i + 1 for i, name in enumerate(MONTH_NAMES)},
+    **{full.lower(): i + 1 for i, full in enumerate([
+        "January", "February", "March", "April", "May", "June",
+        "July", "August", "September", "October", "November", "December",
+    ])},
+    "sept": 9,
+    **{str(i): i for i in range(1, 13)},
+    **{f"{i:02d}": i for i in range(1, 13)},
+}
+
+# Months per rolling window of the trend indicators
+TREND_WINDOW = 3
+
+# The monthly series shown per month, out of each industry's metrics
+SERIES_METRICS = ["total_revenue", "total_expenses", "profit_margin", "debt_service_ratio"]
+
+
+def month_number(label):
+    """
+    1-12 for a month label, 0 when it is not a month we know
+    """
+    if isinstance(label, float) and label.is_integer():
+        label = int(label)
+    return MONTH_NUMBERS.get(str(label).strip().lower(), 0)
+
+
+def _codes(values):
+    # (codes, labels) of a text column, -1 for empty cells, without a copy for categories
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories.tolist()
+    codes, labels = pd.factorize(np.asarray(values, dtype=object))
+    return codes, labels.tolist()
+
+
+class MonthlyAggregator:
+    """
+    Sums and non-null counts of the numeric columns per (year, month), chunk by chunk,
+    with one bincount per column. A month is the integer year * 12 + month - 1, so months
+    sort in calendar order. Like RunningAggregator, statistics() gives the state as plain
+    JSON and MonthlyAggregator(aggregations, statistics) carries on from it.
+
+    Uploads with a month label we cannot place in the calendar get no series.
+    """
+
+    def __init__(self, aggregations: dict, statistics: dict | None = None):
+        statistics = statistics or {}
+        self.columns = list(dict.fromkeys([*aggregations["sum"], *aggregations["mean"]]))
+        self.sums = {}
+        self.counts = {}
+        self.unknown_months = statistics.get("unknown_months", False)
+
+        for period, totals in statistics.get("months", {}).items():
+            year, month = period.split("-")
+            key = int(year) * 12 + int(month) - 1
+            self.sums[key] = dict(totals["sum"])
+            self.counts[key] = dict(totals["count"])
+
+    def update(self, chunk):
+        if "year" not in chunk or "month" not in chunk or self.unknown_months:
+            return
+
+        codes, labels = _codes(chunk["month"])
+        numbers = np.array([month_number(label) for label in labels] + [0], dtype="int64")
+        if not numbers[:-1].all():
+            self.unknown_months = True
+            return
+
+        # code -1 (empty month) picks the trailing 0
+        months = numbers[codes]
+        years = np.asarray(chunk["year"], dtype="float64")
+        placed = (months > 0) & np.isfinite(years)
+        if not placed.any():
+            return
+
+        # months of one upload span a few years, so they index a short dense range, no sort
+        every_row = placed.all()
+        if not every_row:
+            years, months = years[placed], months[placed]
+        keys = years.astype("int64") * 12 + months - 1
+        first = keys.min()
+        offsets = keys - first
+        rows = np.bincount(offsets)
+        periods = np.flatnonzero(rows)
+
+        for col in self.columns:
+            if col not in chunk:
+                continue
+            values = np.asarray(chunk[col], dtype="float64")
+            if not every_row:
+                values = values[placed]
+
+            # like column_totals: the NaN-free pass first, the masked one only when needed
+            sums = np.bincount(offsets, weights=values)[periods]
+            counts = rows[periods]
+            if np.isnan(sums).any():
+                present = ~np.isnan(values)
+                sums = np.bincount(offsets, weights=np.where(present, values, 0.0))[periods]
+                counts = np.bincount(offsets, weights=present)[periods]
+
+            for key, total, count in zip((periods + first).tolist(), sums.tolist(), counts.tolist()):
+                period_sums = self.sums.setdefault(key, {})
+                period_counts = self.counts.setdefault(key, {})
+                period_sums[col] = period_sums.get(col, 0.0) + total
+                period_counts[col] = period_counts.get(col, 0) + int(count)
+
+    def result(self, aggregations: dict):
+        """
+        (periods, aggregates): the sorted month keys, and aggregates shaped like
+        aggregate_financials with one array per column, one entry per month
+        """
+        periods = sorted(self.sums)
+        sums = {
+            col: np.array([self.sums[key].get(col, 0.0) for key in periods])
+            for col in self.columns if any(col in self.sums[key] for key in periods)
+        }
+        counts = {
+            col: np.array([self.counts[key].get(col, 0) for key in periods], dtype="float64")
+            for col in sums
+        }
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = {col: np.where(counts[col] > 0, sums[col] / counts[col], np.nan) for col in sums}
+
+        return periods, {
+            "sum": {col: sums[col] for col in aggregations["sum"] if col in sums},
+            "mean": {col: means[col] for col in aggregations["mean"] if col in means},
+        }
+
+    def statistics(self):
+        return {
+            "unknown_months": self.unknown_months,
+            "months": {
+                f"{key // 12}-{key % 12 + 1:02d}": {"sum": self.sums[key], "count": self.counts[key]}
+                for key in sorted(self.sums)
+            },
+        }
+
+
+def _json_numbers(values):
+    # NaN and inf (e.g. growth after a month without revenue) become null
+    return [round(value, 2) if np.isfinite(value) else None for value in np.asarray(values, dtype="float64").tolist()]
+
+
+def _growth_percentage(values):
+    growth = np.full(len(values), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth[1:] = np.where(values[:-1] > 0, (values[1:] / values[:-1] - 1) * 100, np.nan)
+    return growth
+
+
+def _rolling(values, window: int, reduce):
+    # reduce over each trailing window, NaN until the first full window
+    rolled = np.full(len(values), np.nan)
+    if len(values) >= window:
+        rolled[window - 1:] = reduce(np.lib.stride_tricks.sliding_window_view(values, window), axis=1)
+    return rolled
+
+
+def monthly_metrics(metrics_function, monthly: MonthlyAggregator, aggregations: dict, modes: dict):
+    """
+    (periods, metrics, aggregates) per month, or None when the upload has no month
+    we can place. metrics_function is the industry's *_metrics, run over arrays
+    of monthly aggregates; the text modes are the whole-file ones, since none
+    of the monthly series depends on them.
+    """
+    if monthly.unknown_months or not monthly.sums:
+        return None
+
+    periods, aggregates = monthly.result(aggregations)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics = metrics_function({**aggregates, "mode": modes})
+    return periods, metrics, aggregates
+
+
+def monthly_trends(metrics_function, monthly: MonthlyAggregator, aggregations: dict, modes: dict):
+    """
+    Monthly series and trend indicators, or None when the upload has no month
+    we can place, see monthly_metrics
+    """
+    series = monthly_metrics(metrics_function, monthly, aggregations, modes)
+    if series is None:
+        return None
+
+    periods, metrics, _ = series
+
+    series = {name: np.broadcast_to(np.asarray(metrics[name], dtype="float64"), len(periods)) for name in SERIES_METRICS}
+    revenue = series["total_revenue"]
+
+    growth = _growth_percentage(revenue)
+    rolling_revenue = _rolling(revenue, TREND_WINDOW, np.mean)
+    rolling_growth = _growth_percentage(rolling_revenue)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rolling_volatility = _rolling(revenue, TREND_WINDOW, np.std) / rolling_revenue * 100
+
+    # Seasonal index: mean revenue of each calendar month over the mean month, 1 = a usual month
+    calendar_months = np.array([key % 12 for key in periods])
+    month_means = np.bincount(calendar_months, weights=revenue, minlength=12) / np.maximum(np.bincount(calendar_months, minlength=12), 1)
+    seen = np.bincount(calendar_months, minlength=12) > 0
+    average = month_means[seen].mean()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        seasonal_index = np.where(seen, month_means / average, np.nan) if average > 0 else np.full(12, np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volatility = revenue.std() / revenue.mean() * 100 if revenue.mean() > 0 else np.nan
+    seasonal = seen.sum() >= 2 and np.isfinite(seasonal_index[seen]).all()
+
+    columns = {
+        **{name: _json_numbers(values) for name, values in series.items()},
+        "revenue_growth_percentage": _json_numbers(growth),
+        "rolling_revenue_growth_percentage": _json_numbers(rolling_growth),
+        "rolling_revenue_volatility_percentage": _json_numbers(rolling_volatility),
+        "seasonality_index": _json_numbers(seasonal_index[calendar_months]),
+    }
+
+    return {
+        "window": TREND_WINDOW,
+        "months": [
+            {
+                "period": f"{key // 12}-{key % 12 + 1:02d}",
+                "year": key // 12,
+                "month": MONTH_NAMES[key % 12],
+                **{name: values[i] for name, values in columns.items()},
+            }
+            for i, key in enumerate(periods)
+        ],
+        "average_revenue_growth_percentage": _json_numbers([np.nanmean(growth) if np.isfinite(growth).any() else np.nan])[0],
+        "revenue_volatility_percentage": _json_numbers([volatility])[0],
+        "seasonality_strength": _json_numbers([np.nanmax(seasonal_index) - np.nanmin(seasonal_index)])[0] if seasonal else None,
+        "peak_month": MONTH_NAMES[int(np.nanargmax(seasonal_index))] if seasonal else None,
+        "low_month": MONTH_NAMES[int(np.nanargmin(seasonal_index))] if seasonal else None,
+    }
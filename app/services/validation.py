@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+from app.services.templates import COLUMN_RULES
+
+
+"""
+This file is used to validate the rows of the uploaded files against the column rules
+in templates.py. Every check runs on a whole column (or chunk) at once, and the failures
+are collected into a compact report instead of stopping at the first bad row.
+"""
+
+
+# Row numbers kept per failed check, the report still counts every row
+MAX_ROWS_PER_ERROR = 10
+
+
+class UploadValidationError(Exception):
+    """
+    Raised when an upload has bad values, the endpoints answer 422 with the report
+    """
+
+    def __init__(self, report: list):
+        self.report = report
+        super().__init__(
+            "Uploaded file failed validation: " + "; ".join(
+                f"{error['column']} {error['message']}" + (f" ({error['count']} rows)" if error["count"] else "")
+                for error in report
+            )
+        )
+
+
+class RowValidator:
+    """
+    Checks chunks of an upload. Row numbers in the report are file rows, counted
+    from each row's place under the header (a frame's index), so the blank rows
+    skipped while reading still count. Text cells in number columns are reported as
+    type errors, so frames read without the parse plan dtypes can be checked too.
+    """
+
+    def __init__(self, industry: str, header_row: int = 1):
+        self.rules = COLUMN_RULES[industry]
+        self.errors = {}
+        self.header_row = header_row
+        self.positions = None
+
+    def _add(self, col: str, check: str, message: str, mask):
+        positions = np.flatnonzero(mask)
+        if not len(positions):
+            return
+
+        error = self.errors.setdefault((col, check), {
+            "column": col,
+            "check": check,
+            "message": message,
+            "count": 0,
+            "rows": [],
+        })
+        error["count"] += len(positions)
+
+        room = MAX_ROWS_PER_ERROR - len(error["rows"])
+        if room > 0:
+            error["rows"].extend(int(self.positions[p]) + self.header_row + 1 for p in positions[:room])
+
+    def update(self, chunk, positions=None):
+        """
+        chunk is a DataFrame, or a dict of NumPy arrays from the small CSV fast path
+        with the place of every row under the header in positions
+        """
+        self.positions = np.asarray(chunk.index if isinstance(chunk, pd.DataFrame) else positions)
+
+        for col in chunk:
+            rule = self.rules.get(col)
+            if rule is None:
+                continue
+
+            values = chunk[col]
+            missing = np.asarray(pd.isna(values))
+
+            if rule["type"] != "text":
+                if values.dtype == object:
+                    values = pd.to_numeric(values, errors="coerce")
+                    not_numbers = np.asarray(pd.isna(values)) & ~missing
+                    self._add(col, "type", "is not a number", not_numbers)
+
+                numbers = np.asarray(values, dtype="float64")
+                with np.errstate(invalid="ignore"):
+                    if "min" in rule:
+                        self._add(col, "min", f"is below {rule['min']}", numbers < rule["min"])
+                    if "max" in rule:
+                        self._add(col, "max", f"is above {rule['max']}", numbers > rule["max"])
+                    if rule["type"] == "integer":
+                        self._add(col, "integer", "is not a whole number", np.isfinite(numbers) & (numbers % 1 != 0))
+
+            if not rule["nullable"]:
+                self._add(col, "null", "is empty", missing)
+
+    def report(self):
+        return list(self.errors.values())
+
+    def raise_for_errors(self):
+        if self.errors:
+            raise UploadValidationError(self.report())
+
+
+def check_totals(aggregates: dict):
+    """
+    File-level checks on the aggregates: the ratios divide by total revenue
+    """
+    if aggregates["sum"].get("total_revenue", 0) <= 0:
+        raise UploadValidationError([{
+            "column": "total_revenue",
+            "check": "total",
+            "message": "must add up to more than 0",
+            "count": 0,
+            "rows": [],
+        }])
@@ -0,0 +1,165 @@
+import os
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from app.database.db import SessionLocal
+from app.models.user import User
+from app.services.ingestion import UPLOAD_FORMATS
+from app.services.pipeline import INDUSTRY_PIPELINES, BATCH_WORKERS, resolve_industry, analyze_file
+from app.services.persistence import save_financial_analyses, find_duplicate_analyses
+from app.services.products import recommend_financial_products
+
+
+"""
+This file is used to load historical files into the analysis tables without the HTTP endpoints.
+
+    python backfill.py <directory> --industry retail --user-id 1 [--llm --language en]
+
+Every CSV / XLSX / Parquet / Arrow file under the directory is analyzed in a process pool
+and the results are saved in bulk, one transaction per --batch-size files. Files whose data
+is already stored for the user are skipped, so a stopped backfill can simply be run again.
+"""
+
+
+def find_files(directory: str):
+    extensions = tuple(UPLOAD_FORMATS)
+    for root, _, names in os.walk(directory):
+        for name in sorted(names):
+            if name.lower().endswith(extensions):
+                yield os.path.join(root, name)
+
+
+def add_explanations(industry: str, results: list, language: str, concurrency: int):
+    """
+    Optional LLM step, run in threads since the calls wait on the network.
+    A failed call leaves the explanation empty, like the endpoints do.
+    """
+    from app.services import ai
+
+    generate = {
+        "agriculture": ai.generate_agriculture_financial_explanation,
+        "manufacturing": ai.generate_manufacturing_financial_explanation,
+        "retail": ai.generate_retail_financial_explanation,
+        "logistics": ai.generate_logistics_financial_explanation,
+        "ecommerce": ai.generate_ecommerce_financial_explanation,
+    }[industry]
+
+    def explain(result):
+        products = recommend_financial_products(
+            industry=INDUSTRY_PIPELINES[industry]["name"],
+            credit_risk=result["credit_risk"],
+            health_score=result["health_score"]
+        )
+        try:
+            result["ai_explanation"] = generate(
+                result["metrics"],
+                result["health_score"],
+                result["health_status"],
+                result["credit_risk"],
+                "\n".join(f"- {p}" for p in products),
+                language
+            )
+            result["language"] = language
+        except Exception:
+            result["ai_explanation"] = None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as threads:
+        list(threads.map(explain, results))
+
+
+def save_batch(db, industry: str, results: list, user_id: int, args):
+    """
+    Saves one batch of results, skipping data already stored for the user. Returns the number saved.
+    """
+    existing = find_duplicate_analyses(db, industry, user_id, [r["content_hash"] for r in results])
+
+    fresh = {}
+    for result in results:
+        if result["content_hash"] not in existing:
+            fresh.setdefault(result["content_hash"], result)
+    fresh = list(fresh.values())
+
+    if not fresh:
+        return 0
+
+    if args.llm:
+        add_explanations(industry, fresh, args.language, args.llm_concurrency)
+
+    save_financial_analyses(db, industry, fresh, user_id)
+    return len(fresh)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a directory of historical files and save the results")
+    parser.add_argument("directory")
+    parser.add_argument("--industry", required=True, help="agriculture, manufacturing, retail, logistics or ecommerce")
+    parser.add_argument("--user-id", type=int, required=True, help="owner of the saved analyses")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=500, help="files saved per transaction")
+    parser.add_argument("--stream", action="store_true", help="read every file in chunks")
+    parser.add_argument("--llm", action="store_true", help="also generate the AI explanation")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    industry = resolve_industry(args.industry)
+    files = list(find_files(args.directory))
+    print(f"Found {len(files)} files in {args.directory}")
+
+    db = SessionLocal()
+    if db.get(User, args.user_id) is None:
+        raise SystemExit(f"No user with id {args.user_id}")
+
+    analyzed = saved = rows = 0
+    failures = []
+    batch = []
+    started = time.perf_counter()
+
+    # spawn: the workers import only the pipeline, not the parent's DB connections
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        results = executor.map(
+            analyze_file,
+            [industry] * len(files),
+            files,
+            files,
+            [args.stream or None] * len(files),
+            chunksize=8
+        )
+
+        for result in results:
+            if "error" in result:
+                failures.append(result)
+                continue
+
+            analyzed += 1
+            rows += result["rows"]
+            batch.append(result)
+
+            if len(batch) >= args.batch_size:
+                saved += save_batch(db, industry, batch, args.user_id, args)
+                batch = []
+                print(f"{analyzed + len(failures)}/{len(files)} files")
+
+        if batch:
+            saved += save_batch(db, industry, batch, args.user_id, args)
+
+    db.close()
+    elapsed = time.perf_counter() - started
+
+    for failure in failures:
+        print(f"FAILED {failure['filename']}: {failure['error']}")
+        # the validation report of a file with bad rows
+        for error in failure.get("errors", []):
+            listed = f" ({error['count']} rows, first {', '.join(map(str, error['rows']))})" if error["rows"] else ""
+            print(f"    {error['column']} {error['message']}{listed}")
+
+    print(
+        f"{analyzed} analyzed, {saved} saved, {analyzed - saved} already stored, {len(failures)} failed "
+        f"in {elapsed:.1f}s: {len(files) / elapsed if elapsed else 0:.1f} files/s, "
+        f"{rows / elapsed if elapsed else 0:,.0f} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
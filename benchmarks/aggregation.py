@@ -0,0 +1,79 @@
+import argparse
+import time
+import numpy as np
+from app.services.analysis import aggregate_financials
+from app.services.ingestion import PARSE_PLANS
+from app.services.pipeline import INDUSTRY_PIPELINES
+from benchmarks.synthetic import synthetic_frame
+
+
+"""
+This file is used to compare the aggregation kernel (one read of every numeric column) with
+one pandas call per aggregate, and with gathering the columns into one contiguous 2D array
+
+Usage: python -m benchmarks.aggregation --rows 100000 1000000 10000000
+"""
+
+
+def aggregate_per_column(df, aggregations):
+    # What analyze_*_financials did before: one scan of the frame per aggregate
+    return {
+        "sum": {col: float(df[col].sum()) for col in aggregations["sum"] if col in df.columns},
+        "mean": {col: float(df[col].mean()) for col in aggregations["mean"] if col in df.columns},
+        "mode": {col: df[col].mode()[0] for col in aggregations["mode"] if col in df.columns},
+    }
+
+
+def aggregate_2d(df, aggregations):
+    # One NumPy reduction over a contiguous 2D float array, paying for the gather copy
+    columns = [col for col in dict.fromkeys([*aggregations["sum"], *aggregations["mean"]]) if col in df.columns]
+    values = np.ascontiguousarray(df[columns].to_numpy(dtype="float64").T)
+    present = ~np.isnan(values)
+    return np.where(present, values, 0.0).sum(axis=1), present.sum(axis=1)
+
+
+def best_of(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--industries", nargs="+", default=list(INDUSTRY_PIPELINES))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'industry':<14}{'rows':>12}{'scans before':>14}{'scans now':>11}"
+        f"{'per aggregate (s)':>19}{'2D array (s)':>14}{'kernel (s)':>12}"
+    )
+
+    for industry in args.industries:
+        aggregations = INDUSTRY_PIPELINES[industry]["aggregations"]
+        # Frame scans: Series.sum / mean each mask, copy and reduce their column, and mode()
+        # sorts; the kernel reads every numeric column once and counts each text column once
+        scans_before = 3 * (len(aggregations["sum"]) + len(aggregations["mean"])) + len(aggregations["mode"])
+        scans_now = len(set(aggregations["sum"]) | set(aggregations["mean"])) + len(aggregations["mode"])
+
+        for rows in args.rows:
+            df = synthetic_frame(industry, rows)
+            dtypes = PARSE_PLANS[industry]["dtype"]
+            df = df.astype({col: dtypes[col] for col in df.columns if col in dtypes})
+
+            before = best_of(lambda: aggregate_per_column(df, aggregations), args.repeat)
+            gathered = best_of(lambda: aggregate_2d(df, aggregations), args.repeat)
+            now = best_of(lambda: aggregate_financials(df, aggregations), args.repeat)
+
+            print(
+                f"{industry:<14}{rows:>12,}{scans_before:>14}{scans_now:>11}"
+                f"{before:>19.4f}{gathered:>14.4f}{now:>12.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import time
+import numpy as np
+from app.services import credit
+from app.services.pipeline import score_metrics, score_metrics_batch
+from benchmarks.scoring import portfolio_metrics
+
+
+"""
+This file is used to time the probability of default models: the fit, one credit risk per
+request and a whole portfolio in one batch, on synthetic outcomes drawn from a known
+logistic model, and to check the scalar and batch risks agree
+
+Usage: python -m benchmarks.credit --businesses 500000
+"""
+
+
+def synthetic_defaults(metrics: dict, seed: int = 0):
+    # debt service and thin margins drive the default rate
+    rng = np.random.default_rng(seed)
+    debt = np.asarray(metrics["debt_service_ratio"], dtype="float64")
+    margin = np.asarray(metrics["profit_margin"], dtype="float64")
+    score = -3 + 40 * (debt - debt.mean()) - 0.03 * (margin - margin.mean())
+    return (rng.random(len(debt)) < 1 / (1 + np.exp(-score))).astype("float64")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--businesses", type=int, default=500_000)
+    parser.add_argument("--industries", nargs="+", default=["retail", "logistics", "ecommerce"])
+    parser.add_argument("--requests", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'industry':<14}{'fit s':>8}{'request us':>12}{'batch s':>10}{'vs rules':>10}  same")
+
+    for industry in args.industries:
+        metrics = portfolio_metrics(industry, args.businesses)
+        defaults = synthetic_defaults(metrics)
+
+        start = time.perf_counter()
+        entry = credit.fit_credit_model(industry, metrics, defaults)
+        fit_time = time.perf_counter() - start
+        credit.CREDIT_MODELS[industry] = credit.compile_credit_model(industry, entry)
+
+        rows = [
+            dict(zip(metrics, values))
+            for values in zip(*(np.asarray(v)[:args.requests].tolist() for v in metrics.values()))
+        ]
+        start = time.perf_counter()
+        scalar = [score_metrics(industry, row) for row in rows]
+        request_time = (time.perf_counter() - start) / len(rows) * 1e6
+
+        start = time.perf_counter()
+        scores, statuses, risks = score_metrics_batch(industry, metrics)
+        batch_time = time.perf_counter() - start
+
+        same = scalar == list(zip(scores.tolist(), statuses.tolist(), risks.tolist()))[:len(rows)]
+        rules = credit.credit_risks(scores)
+        print(f"{industry:<14}{fit_time:>8.3f}{request_time:>12.1f}{batch_time:>10.4f}{(risks != rules).mean():>10.1%}  {same}")
+
+
+if __name__ == "__main__":
+    main()
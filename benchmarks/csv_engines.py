@@ -0,0 +1,48 @@
+import argparse
+import os
+import tempfile
+import time
+from app.services.ingestion import PARSE_PLANS, PYARROW_AVAILABLE, read_csv
+from app.services.templates import TEMPLATE_MAP
+from benchmarks.synthetic import write_synthetic_csv
+
+
+"""
+This file is used to compare the CSV parser engines on synthetic uploads
+
+Usage: python -m benchmarks.csv_engines --rows 10000 1000000 10000000
+"""
+
+
+def time_engine(path, industry, engine):
+    plan = PARSE_PLANS[industry]
+    columns = sorted(plan["columns"] & set(read_csv(path, engine="c", nrows=0).columns))
+
+    start = time.perf_counter()
+    df = read_csv(path, engine=engine, usecols=columns, dtype={col: plan["dtype"][col] for col in columns})
+    return time.perf_counter() - start, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--industries", nargs="+", default=list(TEMPLATE_MAP))
+    args = parser.parse_args()
+
+    engines = ["c"] + (["pyarrow"] if PYARROW_AVAILABLE else [])
+    print(f"{'industry':<14}{'rows':>12}" + "".join(f"{e + ' (s)':>14}" for e in engines))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for industry in args.industries:
+            for rows in args.rows:
+                path = os.path.join(tmp, f"{industry}_{rows}.csv")
+                write_synthetic_csv(path, industry, rows)
+
+                timings = [time_engine(path, industry, engine)[0] for engine in engines]
+                print(f"{industry:<14}{rows:>12}" + "".join(f"{t:>14.3f}" for t in timings))
+
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import time
+import numpy as np
+from app.services.forecast import cash_flow_forecasts
+
+
+"""
+This file is used to time the cash-flow forecasts of a portfolio: revenue and expense
+series of many businesses, fitted together with the damped Holt smoothing of forecast.py
+
+Usage: python -m benchmarks.forecast --businesses 1000 10000 --months 24
+"""
+
+
+def synthetic_histories(businesses: int, months: int, seed: int = 0):
+    # monthly revenue with a trend, a season and noise; expenses a noisy share of it
+    rng = np.random.default_rng(seed)
+    t = np.arange(months)
+    base = rng.uniform(50_000, 500_000, (businesses, 1))
+    growth = rng.uniform(-0.02, 0.04, (businesses, 1))
+    season = 1 + rng.uniform(0, 0.3, (businesses, 1)) * np.sin(2 * np.pi * t / 12)
+    revenue = base * (1 + growth) ** t * season * rng.normal(1, 0.05, (businesses, months))
+    expenses = revenue * rng.uniform(0.5, 0.95, (businesses, 1)) * rng.normal(1, 0.05, (businesses, months))
+    emi = base[:, 0] * rng.uniform(0.02, 0.1, businesses)
+
+    periods = list(range(2023 * 12, 2023 * 12 + months))
+    return [
+        (periods, revenue[i], expenses[i], np.full(months, emi[i]))
+        for i in range(businesses)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--businesses", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--horizon", type=int, default=12)
+    args = parser.parse_args()
+
+    # the smoothing operators are built once per series length, as in the server
+    cash_flow_forecasts(synthetic_histories(1, args.months), args.horizon)
+
+    print(f"{'businesses':>12}{'months':>8}{'horizon':>9}{'seconds':>10}{'per business (ms)':>19}")
+
+    for businesses in args.businesses:
+        histories = synthetic_histories(businesses, args.months)
+
+        start = time.perf_counter()
+        cash_flow_forecasts(histories, args.horizon)
+        seconds = time.perf_counter() - start
+
+        print(f"{businesses:>12,}{args.months:>8}{args.horizon:>9}{seconds:>10.3f}{seconds / businesses * 1000:>19.3f}")
+
+
+if __name__ == "__main__":
+    main()
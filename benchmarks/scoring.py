@@ -0,0 +1,57 @@
+import argparse
+import time
+import numpy as np
+from app.services.pipeline import INDUSTRY_PIPELINES, score_metrics, score_metrics_batch
+from benchmarks.synthetic import synthetic_frame
+
+
+"""
+This file is used to time rescoring a portfolio: health score, status and credit risk of
+every business, one metrics dict at a time (score_metrics) against one pass over arrays
+(score_metrics_batch), and to check both give the same results
+
+Usage: python -m benchmarks.scoring --businesses 500000
+"""
+
+
+def portfolio_metrics(industry: str, businesses: int):
+    # every synthetic row stands for one business, aggregated on its own
+    pipeline = INDUSTRY_PIPELINES[industry]
+    frame = synthetic_frame(industry, businesses)
+    aggregations = pipeline["aggregations"]
+    aggregates = {
+        "sum": {col: frame[col].to_numpy("float64") for col in aggregations["sum"] if col in frame},
+        "mean": {col: frame[col].to_numpy("float64") for col in aggregations["mean"] if col in frame},
+        "mode": {col: frame[col].to_numpy(object) for col in aggregations["mode"] if col in frame},
+    }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return pipeline["metrics"](aggregates)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--businesses", type=int, nargs="+", default=[500_000])
+    parser.add_argument("--industries", nargs="+", default=list(INDUSTRY_PIPELINES))
+    args = parser.parse_args()
+
+    print(f"{'industry':<14}{'businesses':>12}{'scalar s':>10}{'batch s':>10}{'speedup':>9}  same")
+
+    for industry in args.industries:
+        for businesses in args.businesses:
+            metrics = portfolio_metrics(industry, businesses)
+            rows = [dict(zip(metrics, values)) for values in zip(*(np.asarray(v).tolist() for v in metrics.values()))]
+
+            start = time.perf_counter()
+            scalar = [score_metrics(industry, row) for row in rows]
+            scalar_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            scores, statuses, risks = score_metrics_batch(industry, metrics)
+            batch_time = time.perf_counter() - start
+
+            same = scalar == list(zip(scores.tolist(), statuses.tolist(), risks.tolist()))
+            print(f"{industry:<14}{businesses:>12,}{scalar_time:>10.3f}{batch_time:>10.4f}{scalar_time / batch_time:>8.0f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import io
+import time
+from app.services import ingestion
+from app.services.ingestion import FinancialUpload
+from app.services.pipeline import INDUSTRY_PIPELINES, analyze_upload
+from benchmarks.synthetic import synthetic_frame
+
+
+"""
+This file is used to compare the CPU time of one analysis request on the small CSV fast path
+(csv module + NumPy arrays) and on the pandas path, for typical monthly uploads
+
+Usage: python -m benchmarks.small_uploads --rows 12 24 100 500
+"""
+
+
+def cpu_per_request(data: bytes, industry: str, fast_path_rows: int, requests: int):
+    # the same switch as UPLOAD_FAST_PATH_MAX_ROWS=0
+    ingestion.UPLOAD_FAST_PATH_MAX_ROWS = fast_path_rows
+
+    start = time.process_time()
+    for _ in range(requests):
+        analyze_upload(FinancialUpload(io.BytesIO(data), "upload.csv", industry), industry)
+    return (time.process_time() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[12, 24, 100, 500])
+    parser.add_argument("--industries", nargs="+", default=list(INDUSTRY_PIPELINES))
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'industry':<14}{'rows':>8}{'pandas (ms)':>14}{'fast path (ms)':>17}{'speedup':>10}")
+
+    for industry in args.industries:
+        for rows in args.rows:
+            data = synthetic_frame(industry, rows).to_csv(index=False).encode()
+
+            # warm up both paths once, imports and caches are not per request
+            cpu_per_request(data, industry, 0, 1)
+            cpu_per_request(data, industry, rows, 1)
+
+            pandas_path = cpu_per_request(data, industry, 0, args.requests)
+            fast_path = cpu_per_request(data, industry, rows, args.requests)
+
+            print(
+                f"{industry:<14}{rows:>8}{pandas_path * 1000:>14.2f}{fast_path * 1000:>17.2f}"
+                f"{pandas_path / fast_path:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import time
+from app.services.analysis import aggregate_financials
+from app.services.pipeline import INDUSTRY_PIPELINES
+from app.services.scoring import score_rules
+from app.services.stress import stress_test
+from benchmarks.synthetic import synthetic_frame
+
+
+"""
+This file is used to time one Monte Carlo stress test (all the paths, their metrics,
+health scores and credit risks) per industry
+
+Usage: python -m benchmarks.stress --simulations 10000 100000
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--simulations", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--industries", nargs="+", default=list(INDUSTRY_PIPELINES))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'industry':<14}{'simulations':>13}{'seconds':>10}")
+
+    for industry in args.industries:
+        pipeline = INDUSTRY_PIPELINES[industry]
+        aggregates = aggregate_financials(synthetic_frame(industry, 1_000), pipeline["aggregations"])
+
+        for simulations in args.simulations:
+            times = []
+            for seed in range(args.repeat):
+                start = time.perf_counter()
+                stress_test(
+                    pipeline["metrics"], score_rules(industry), aggregates, pipeline["cost_columns"],
+                    simulations=simulations, seed=seed,
+                )
+                times.append(time.perf_counter() - start)
+
+            print(f"{industry:<14}{simulations:>13,}{min(times):>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
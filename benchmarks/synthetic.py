@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from app.services.templates import REQUIRED_COLUMNS, CATEGORY_COLUMNS
+
+
+"""
+This file is used to generate synthetic uploads for the benchmarks
+"""
+
+
+CATEGORY_VALUES = {
+    "month": ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"],
+    "season": ["Kharif", "Rabi", "Zaid"],
+    "storage_type": ["open", "warehouse", "cold_storage"],
+    "loan_type": ["Term Loan", "Working Capital", "KCC"],
+}
+
+
+def synthetic_frame(industry: str, rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    columns = sorted(REQUIRED_COLUMNS[industry])
+    if industry == "manufacturing":
+        columns.append("overhead_cost")
+
+    data = {}
+    for col in columns:
+        if col in CATEGORY_COLUMNS:
+            values = CATEGORY_VALUES.get(col, [f"{col}_{i}" for i in range(5)])
+            data[col] = rng.choice(values, rows)
+        elif col == "year":
+            data[col] = rng.choice([2023, 2024], rows)
+        elif "percentage" in col:
+            data[col] = np.round(rng.uniform(0, 100, rows), 2)
+        elif col == "total_revenue":
+            data[col] = np.round(rng.uniform(50_000, 500_000, rows), 2)
+        else:
+            data[col] = np.round(rng.uniform(100, 50_000, rows), 2)
+
+    return pd.DataFrame(data)
+
+
+def write_synthetic_csv(path, industry: str, rows: int, chunk_rows: int = 1_000_000):
+    written = 0
+    while written < rows:
+        n = min(chunk_rows, rows - written)
+        synthetic_frame(industry, n, seed=written).to_csv(
+            path, mode="a" if written else "w", header=not written, index=False
+        )
+        written += n
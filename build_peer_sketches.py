@@ -0,0 +1,21 @@
+from app.database.db import SessionLocal
+from app.services.persistence import ANALYSIS_MODELS
+from app.services.peers import rebuild_peer_sketches
+
+
+"""
+This file is used to build the peer benchmarking sketches from the analyses already saved,
+e.g. once after create_tables.py adds the peer_metric_sketches table. New analyses update
+the sketches as they are saved.
+
+    python build_peer_sketches.py
+"""
+
+
+db = SessionLocal()
+try:
+    for industry, model in ANALYSIS_MODELS.items():
+        rows = rebuild_peer_sketches(db, industry, model)
+        print(f"{industry}: {rows} analyses")
+finally:
+    db.close()
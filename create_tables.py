@@ -1,12 +1,28 @@
-from app.database.db import engine,Base
-from app.models.agriculture import AgricultureFinancialAnalysis
-from app.models.manufacture import ManufacturingFinancialAnalysis
-from app.models.retail import RetailFinancialAnalysis
-from app.models.logistics import LogisticsFinancialAnalysis
-from app.models.ecommerce import EcommerceFinancialAnalysis
-from app.models.user import User
-
-Base.metadata.create_all(bind=engine)
-
-print("Tables created successfully")
-
+from sqlalchemy import inspect, text
+from app.database.db import engine,Base
+from app.models.agriculture import AgricultureFinancialAnalysis
+from app.models.manufacture import ManufacturingFinancialAnalysis
+from app.models.retail import RetailFinancialAnalysis
+from app.models.logistics import LogisticsFinancialAnalysis
+from app.models.ecommerce import EcommerceFinancialAnalysis
+from app.models.user import User
+from app.models.peer import PeerMetricSketch
+
+Base.metadata.create_all(bind=engine)
+
+# create_all skips existing tables, so add the columns and indexes added to the models since
+inspector = inspect(engine)
+with engine.begin() as connection:
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                print(f"Added column {table.name}.{column.name}")
+
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+print("Tables created successfully")
+
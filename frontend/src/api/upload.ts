@@ -9,13 +9,33 @@ const industryEndpointMap: Record<string, string> = {
   Ecommerce: "ecommerce",
 };
 
+// Same as the API's UPLOAD_STREAM_THRESHOLD_BYTES: compressed uploads are always streamed,
+// so smaller CSVs are sent as they are and keep the API's fast path for small files
+const COMPRESS_MIN_BYTES = Number(import.meta.env.VITE_UPLOAD_COMPRESS_MIN_BYTES) || 20 * 1024 * 1024;
+
+// Large plain CSVs are gzipped in the browser before upload, the API decompresses them on the fly
+const compressCSV = async (file: File): Promise<File> => {
+  if (
+    !file.name.toLowerCase().endsWith(".csv") ||
+    file.size <= COMPRESS_MIN_BYTES ||
+    typeof CompressionStream === "undefined"
+  ) {
+    return file;
+  }
+
+  const stream = file.stream().pipeThrough(new CompressionStream("gzip"));
+  const blob = await new Response(stream).blob();
+
+  return new File([blob], `${file.name}.gz`, { type: "application/gzip" });
+};
+
 export const uploadFinancialCSV = async (
   industry: string,
   file: File,
   language: string
 ) => {
   const formData = new FormData();
-  formData.append("file", file);
+  formData.append("file", await compressCSV(file));
   formData.append("language", language);
 
   const endpoint = industryEndpointMap[industry];
@@ -214,7 +214,7 @@ const downloadTemplate = async () => {
         >
           <input
             type="file"
-            accept=".csv,.xlsx"
+            accept=".csv,.csv.gz,.csv.zst,.xlsx,.parquet,.arrow,.feather"
             onChange={(e) => setFile(e.target.files?.[0] || null)}
             style={{ width: "100%" }}
           />
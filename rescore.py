@@ -0,0 +1,29 @@
+import argparse
+from app.database.db import SessionLocal
+from app.services.scoring import rules_version
+from app.services.persistence import rescore_financial_analyses
+
+
+"""
+This file is used to apply a new version of the scoring rules (app/services/scoring_rules.json)
+or new credit models (app/services/credit_models.json) to the analyses already saved, with one
+UPDATE per analysis table run by the database.
+
+    python rescore.py [--all]
+
+Only analyses scored by another rules version or other credit models are updated, so it can
+simply be run again; --all rescores every analysis.
+"""
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--all", action="store_true", help="rescore every analysis, not only the stale ones")
+args = parser.parse_args()
+
+db = SessionLocal()
+try:
+    print(f"Scoring rules version {rules_version()}")
+    for industry, rows in rescore_financial_analyses(db, everything=args.all).items():
+        print(f"{industry}: {rows} analyses rescored")
+finally:
+    db.close()
@@ -0,0 +1,75 @@
+import io
+import os
+import tempfile
+import pytest
+
+
+"""
+Shared fixtures: the app runs on a SQLite database of its own, as a fresh user per test,
+with the LLM explanation replaced by a fixed text so no test calls an external API
+"""
+
+
+# Settings are read when the app is imported, so they are set first
+TEST_DIR = tempfile.mkdtemp(prefix="sme-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+os.environ["CREDIT_MODELS_PATH"] = os.path.join(TEST_DIR, "credit_models.json")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM_JWT", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES_JWT", "30")
+# The LLM client is built at import; it is never called
+os.environ.setdefault("LLM_PROVIDER", "openai")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("MODEL_NAME", "test-model")
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.auth.deps import get_current_user
+from app.database.db import Base, SessionLocal, engine
+from app.models.user import User
+from benchmarks.synthetic import synthetic_frame
+
+Base.metadata.create_all(engine)
+
+EXPLANATION = "Test explanation"
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db):
+    record = User(email=f"user{os.urandom(6).hex()}@example.com", hashed_password="x")
+    db.add(record)
+    db.commit()
+    return record
+
+
+@pytest.fixture
+def client(user, monkeypatch):
+    import app.main as main
+
+    for name in dir(main):
+        if name.startswith("generate_") and name.endswith("_financial_explanation"):
+            monkeypatch.setattr(main, name, lambda *args, **kwargs: EXPLANATION)
+
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+def csv_bytes(industry: str, rows: int = 12, seed: int = 0, frame=None):
+    frame = synthetic_frame(industry, rows, seed=seed) if frame is None else frame
+    return frame.to_csv(index=False).encode()
+
+
+def upload(client, endpoint: str, data: bytes, filename: str = "upload.csv", **form):
+    return client.post(f"/analyze/{endpoint}", files={"file": (filename, io.BytesIO(data))}, data=form)
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.analysis import RunningAggregator, aggregate_financials, column_totals
+from app.services.pipeline import INDUSTRY_PIPELINES
+from benchmarks.synthetic import synthetic_frame
+
+
+def with_gaps(frame, seed: int = 0):
+    # some empty cells in every column, as uploads have
+    rng = np.random.default_rng(seed)
+    frame = frame.copy()
+    for col in frame.columns:
+        if col != "year":
+            frame.loc[rng.random(len(frame)) < 0.1, col] = None
+    return frame
+
+
+def pandas_aggregates(frame, aggregations: dict):
+    # the reference: one pandas call per aggregate
+    return {
+        "sum": {col: frame[col].sum() for col in aggregations["sum"] if col in frame},
+        "mean": {col: frame[col].mean() for col in aggregations["mean"] if col in frame},
+        "mode": {col: frame[col].mode()[0] for col in aggregations["mode"] if col in frame},
+    }
+
+
+def assert_same_aggregates(result, expected):
+    for kind in ("sum", "mean"):
+        assert result[kind] == pytest.approx(expected[kind], rel=1e-12)
+    assert result["mode"] == expected["mode"]
+
+
+def test_column_totals_match_pandas_with_and_without_gaps():
+    frame = pd.DataFrame({"full": [1.5, 2.5, 3.0], "gaps": [1.0, np.nan, 2.0], "empty": [np.nan] * 3})
+
+    sums, counts = column_totals(frame, ["full", "gaps", "empty"])
+
+    assert sums == {"full": 7.0, "gaps": 3.0, "empty": 0.0}
+    assert counts == {"full": 3, "gaps": 2, "empty": 0}
+
+
+@pytest.mark.parametrize("industry", sorted(INDUSTRY_PIPELINES))
+def test_one_pass_aggregates_match_pandas(industry):
+    aggregations = INDUSTRY_PIPELINES[industry]["aggregations"]
+    frame = with_gaps(synthetic_frame(industry, 500, seed=90))
+    categories = frame.astype({col: "category" for col in aggregations["mode"] if col in frame})
+    expected = pandas_aggregates(frame, aggregations)
+
+    assert_same_aggregates(aggregate_financials(frame, aggregations), expected)
+    assert_same_aggregates(aggregate_financials(categories, aggregations), expected)
+
+    running = RunningAggregator(aggregations)
+    for start in range(0, len(frame), 77):
+        running.update(categories.iloc[start:start + 77])
+    assert_same_aggregates(running.result(), expected)
+
+
+def test_mode_ties_go_to_the_smallest_value_like_pandas():
+    aggregations = {"sum": [], "mean": [], "mode": ["month"]}
+    frame = pd.DataFrame({"month": ["Mar", "Jan", "Mar", "Jan", "Feb"]})
+
+    running = RunningAggregator(aggregations)
+    running.update(frame.iloc[:3])
+    running.update(frame.iloc[3:])
+
+    assert running.result()["mode"]["month"] == frame["month"].mode()[0] == "Jan"
+    assert aggregate_financials({"month": frame["month"].to_numpy(dtype=object)}, aggregations)["mode"]["month"] == "Jan"
+
+
+
+def test_statistics_carry_the_aggregates_over():
+    aggregations = INDUSTRY_PIPELINES["retail"]["aggregations"]
+    frame = synthetic_frame("retail", 100, seed=91)
+
+    earlier = RunningAggregator(aggregations)
+    earlier.update(frame.iloc[:60])
+    later = RunningAggregator(aggregations, earlier.statistics())
+    later.update(frame.iloc[60:])
+
+    assert later.rows == 100
+    assert_same_aggregates(later.result(), pandas_aggregates(frame, aggregations))
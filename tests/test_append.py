@@ -0,0 +1,38 @@
+import io
+import pytest
+from app.services.ingestion import FinancialUpload
+from app.services.pipeline import analyze_upload
+from benchmarks.synthetic import synthetic_frame
+from conftest import csv_bytes, upload
+
+
+@pytest.mark.parametrize("industry, endpoint", [("retail", "retail"), ("agriculture", "agricultural")])
+def test_appended_rows_give_the_analysis_of_the_whole_file(client, industry, endpoint):
+    frame = synthetic_frame(industry, 36, seed=120)
+    first = upload(client, endpoint, csv_bytes(industry, frame=frame.iloc[:30])).json()
+
+    response = upload(client, f"{endpoint}/{first['record_id']}/append", csv_bytes(industry, frame=frame.iloc[30:]))
+
+    assert response.status_code == 200
+    body = response.json()
+    whole = analyze_upload(FinancialUpload(io.BytesIO(csv_bytes(industry, frame=frame)), "upload.csv", industry), industry)
+    assert (body["record_id"], body["new_rows"], body["total_rows"]) == (first["record_id"], 6, 36)
+    assert body["metrics"] == pytest.approx(whole["metrics"], rel=1e-9)
+    assert (body["health_score"], body["credit_risk"]) == (whole["health_score"], whole["credit_risk"])
+    assert body["forecast"] == whole["forecast"]
+
+
+def test_new_rows_need_the_saved_columns(client):
+    frame = synthetic_frame("manufacturing", 24, seed=121)
+    first = upload(client, "manufacturing", csv_bytes("manufacturing", frame=frame.iloc[:18])).json()
+
+    split = frame.iloc[18:].drop(columns="overhead_cost").assign(power_cost=1.0, rent_cost=1.0, maintenance_cost=1.0)
+    response = upload(client, f"manufacturing/{first['record_id']}/append", csv_bytes("manufacturing", frame=split))
+
+    assert response.status_code == 400
+
+
+def test_only_the_owner_can_append(client):
+    response = upload(client, f"retail/{10 ** 9}/append", csv_bytes("retail"))
+
+    assert response.status_code == 404
@@ -0,0 +1,46 @@
+import sys
+import pytest
+import backfill
+from app.services.persistence import ANALYSIS_MODELS
+from benchmarks.synthetic import synthetic_frame
+
+
+def run_backfill(monkeypatch, directory, user_id: int):
+    monkeypatch.setattr(sys, "argv", ["backfill.py", str(directory), "--industry", "retail", "--user-id", str(user_id), "--workers", "1"])
+    backfill.main()
+
+
+@pytest.fixture
+def history(tmp_path):
+    (tmp_path / "2023").mkdir()
+    synthetic_frame("retail", 12, seed=80).to_csv(tmp_path / "2023" / "a.csv", index=False)
+    synthetic_frame("retail", 12, seed=81).to_parquet(tmp_path / "2023" / "b.parquet", index=False)
+    # the same data twice
+    synthetic_frame("retail", 12, seed=80).to_csv(tmp_path / "a_copy.csv", index=False)
+
+    bad = synthetic_frame("retail", 12, seed=82)
+    bad.loc[3, "total_revenue"] = -1.0
+    bad.to_csv(tmp_path / "bad.csv", index=False)
+    (tmp_path / "notes.txt").write_text("not an upload")
+    return tmp_path
+
+
+def test_a_directory_is_saved_once_and_a_rerun_saves_nothing(monkeypatch, capsys, db, user, history):
+    run_backfill(monkeypatch, history, user.id)
+    first = capsys.readouterr().out
+
+    assert "Found 4 files" in first
+    assert "3 analyzed, 2 saved, 1 already stored, 1 failed" in first
+    assert f"FAILED {history / 'bad.csv'}: Uploaded file failed validation" in first
+    assert "total_revenue is below 0 (1 rows, first 5)" in first
+    assert db.query(ANALYSIS_MODELS["retail"]).filter_by(user_id=user.id).count() == 2
+
+    run_backfill(monkeypatch, history, user.id)
+
+    assert "3 analyzed, 0 saved, 3 already stored, 1 failed" in capsys.readouterr().out
+    assert db.query(ANALYSIS_MODELS["retail"]).filter_by(user_id=user.id).count() == 2
+
+
+def test_an_unknown_user_stops_the_backfill(monkeypatch, history):
+    with pytest.raises(SystemExit, match="No user"):
+        run_backfill(monkeypatch, history, 10 ** 9)
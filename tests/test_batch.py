@@ -0,0 +1,83 @@
+import io
+import os
+import subprocess
+import sys
+import zipfile
+import pytest
+from app.services import ingestion
+from app.services.ingestion import FinancialUpload
+from app.services.pipeline import analyze_upload
+from benchmarks.synthetic import synthetic_frame
+from conftest import csv_bytes
+
+
+def zip_bytes(members: dict):
+    file = io.BytesIO()
+    with zipfile.ZipFile(file, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return file.getvalue()
+
+
+def post_batch(client, files: dict, industry: str = "manufacturing"):
+    return client.post(
+        f"/analyze/{industry}/batch",
+        files=[("files", (name, io.BytesIO(data))) for name, data in files.items()],
+    )
+
+
+def test_every_file_and_zip_member_is_analyzed(client):
+    data = {f"{i}.csv": csv_bytes("manufacturing", rows=24, seed=100 + i) for i in range(3)}
+
+    response = post_batch(client, {"0.csv": data["0.csv"], "rest.zip": zip_bytes({"1.csv": data["1.csv"], "dir/2.csv": data["2.csv"]})})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["files"], body["analyzed"], body["failed"]) == (3, 3, 0)
+
+    results = {r["filename"]: r for r in body["results"]}
+    assert set(results) == {"0.csv", "1.csv", "dir/2.csv"}
+    for name, result in results.items():
+        expected = analyze_upload(FinancialUpload(io.BytesIO(data[name.split("/")[-1]]), name, "manufacturing"), "manufacturing")
+        assert result["health_score"] == expected["health_score"]
+        assert result["total_revenue"] == pytest.approx(expected["metrics"]["total_revenue"])
+        assert result["record_id"]
+
+
+def test_one_bad_file_does_not_fail_the_batch(client):
+    bad = csv_bytes("manufacturing", frame=synthetic_frame("manufacturing", 12).drop(columns="total_revenue"))
+
+    response = post_batch(client, {"good.csv": csv_bytes("manufacturing", seed=110), "bad.csv": bad})
+
+    body = response.json()
+    assert (body["analyzed"], body["failed"]) == (1, 1)
+    results = {r["filename"]: r for r in body["results"]}
+    assert "total_revenue" in results["bad.csv"]["error"]
+    assert "record_id" in results["good.csv"]
+
+
+def test_a_batch_over_the_extracted_size_cap_is_rejected(client, monkeypatch):
+    data = csv_bytes("manufacturing", rows=100)
+    monkeypatch.setattr(ingestion, "UPLOAD_MAX_BATCH_BYTES", len(data) + 10)
+
+    response = post_batch(client, {"files.zip": zip_bytes({"1.csv": data, "2.csv": data})})
+
+    assert response.status_code == 413
+
+
+def test_unsupported_files_are_rejected(client):
+    response = post_batch(client, {"notes.txt": b"hello"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("web_concurrency", ["1", "4"])
+def test_batch_workers_are_split_between_web_server_workers(web_concurrency):
+    env = {**os.environ, "WEB_CONCURRENCY": web_concurrency}
+    env.pop("BATCH_WORKERS", None)
+    workers = subprocess.run(
+        [sys.executable, "-c", "from app.services.pipeline import BATCH_WORKERS; print(BATCH_WORKERS)"],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+
+    assert int(workers) == max(1, (os.cpu_count() or 1) // int(web_concurrency))
@@ -0,0 +1,111 @@
+import json
+import numpy as np
+import pytest
+from app.services import credit, persistence
+from app.services.metrics import METRIC_PLANS
+from app.services.pipeline import score_metrics
+from app.services.persistence import ANALYSIS_MODELS, rescore_financial_analyses
+from conftest import csv_bytes, upload
+
+
+def training_data(rows: int = 4000, seed: int = 0):
+    # defaults driven by the debt service ratio only
+    rng = np.random.default_rng(seed)
+    metrics = {name: rng.normal(size=rows) for name in METRIC_PLANS["retail"]["numeric"]}
+    metrics["debt_service_ratio"] = rng.uniform(0, 1, rows)
+    defaults = rng.random(rows) < 1 / (1 + np.exp(-(8 * metrics["debt_service_ratio"] - 5)))
+    return metrics, defaults
+
+
+@pytest.fixture
+def retail_model(monkeypatch):
+    metrics, defaults = training_data()
+    model = credit.compile_credit_model("retail", credit.fit_credit_model("retail", metrics, defaults))
+    monkeypatch.setitem(credit.CREDIT_MODELS, "retail", model)
+    monkeypatch.setattr(persistence, "CREDIT_MODELS_VERSION", "test-model")
+    return model
+
+
+def test_fit_finds_the_metric_that_drives_defaults():
+    metrics, defaults = training_data()
+    entry = credit.fit_credit_model("retail", metrics, defaults)
+    coefficients = dict(zip(entry["features"], entry["coefficients"]))
+
+    assert coefficients["debt_service_ratio"] > 1
+    assert all(abs(value) < 0.2 for name, value in coefficients.items() if name != "debt_service_ratio")
+
+
+def test_fit_needs_both_outcomes():
+    metrics, _ = training_data(100)
+
+    with pytest.raises(ValueError):
+        credit.fit_credit_model("retail", metrics, np.zeros(100))
+
+
+def test_text_features_are_rejected_when_the_models_load(tmp_path):
+    entry = {"features": ["season"], "mean": [0], "scale": [1], "coefficients": [1], "intercept": 0}
+    path = tmp_path / "credit_models.json"
+    path.write_text(json.dumps({"agriculture": entry}))
+
+    with pytest.raises(ValueError, match="numeric"):
+        credit.load_credit_models(str(path))
+
+
+def test_models_file_version_changes_with_its_content(tmp_path):
+    metrics, defaults = training_data()
+    entry = credit.fit_credit_model("retail", metrics, defaults)
+    path = tmp_path / "credit_models.json"
+
+    path.write_text(json.dumps({"retail": entry}))
+    models, version = credit.load_credit_models(str(path))
+    path.write_text(json.dumps({"retail": {**entry, "intercept": entry["intercept"] + 1}}))
+    _, retrained = credit.load_credit_models(str(path))
+
+    assert set(models) == {"retail"}
+    assert version != retrained
+    assert credit.load_credit_models(str(tmp_path / "missing.json")) == ({}, None)
+
+
+def test_scalar_and_batch_risks_agree(retail_model):
+    metrics, _ = training_data(2000, seed=1)
+    scores = np.random.default_rng(2).integers(0, 101, 2000)
+
+    batch = credit.retail_credit_risks(scores, metrics)
+    scalar = [credit.retail_credit_risk(int(score), {name: float(values[i]) for name, values in metrics.items()})
+              for i, score in enumerate(scores)]
+
+    assert batch.tolist() == scalar
+    assert set(scalar) == {"Low", "Medium", "High"}
+
+
+def test_rules_decide_without_a_model_or_a_usable_metric(retail_model):
+    metrics = {name: 0.0 for name in METRIC_PLANS["retail"]["numeric"]}
+
+    assert credit.ecommerce_credit_risk(80, metrics) == "Low"
+    assert credit.retail_credit_risk(80, {**metrics, "debt_service_ratio": float("nan")}) == "Low"
+    assert credit.retail_credit_risk(80) == "Low"
+
+
+def test_sql_rescore_applies_the_model(client, db, retail_model):
+    record_ids = [upload(client, "retail", csv_bytes("retail", seed=seed)).json()["record_id"] for seed in range(20)]
+
+    rescore_financial_analyses(db)
+    db.expire_all()
+
+    for record_id in record_ids:
+        record = db.get(ANALYSIS_MODELS["retail"], record_id)
+        metrics = {name: getattr(record, name) for name in METRIC_PLANS["retail"]["names"]}
+        assert (record.health_score, record.health_status, record.credit_risk) == score_metrics("retail", metrics)
+        assert record.credit_model_version == "test-model"
+
+
+def test_a_re_upload_after_retraining_is_scored_again(client, monkeypatch):
+    data = csv_bytes("retail", seed=40)
+    first = upload(client, "retail", data).json()
+    again = upload(client, "retail", data).json()
+
+    monkeypatch.setattr(persistence, "CREDIT_MODELS_VERSION", "retrained")
+    retrained = upload(client, "retail", data).json()
+
+    assert again["record_id"] == first["record_id"]
+    assert retrained["record_id"] != first["record_id"]
@@ -0,0 +1,75 @@
+import io
+import json
+from app.services import scoring
+from app.services.persistence import ANALYSIS_MODELS
+from benchmarks.synthetic import synthetic_frame
+from conftest import EXPLANATION, csv_bytes, upload
+
+
+def records_of(db, content_hash: str):
+    model = ANALYSIS_MODELS["logistics"]
+    return db.query(model).filter(model.content_hash == content_hash).count()
+
+
+def post_batch(client, files: dict):
+    return client.post(
+        "/analyze/logistics/batch",
+        files=[("files", (name, io.BytesIO(data))) for name, data in files.items()],
+    )
+
+
+def test_the_same_data_is_saved_once(client, db):
+    frame = synthetic_frame("logistics", 12, seed=50)
+
+    first = upload(client, "logistics", csv_bytes("logistics", frame=frame)).json()
+    # other column order and extra columns, the same parsed data
+    again = upload(client, "logistics", csv_bytes("logistics", frame=frame.assign(notes="x")[frame.columns[::-1].tolist() + ["notes"]])).json()
+
+    assert again["record_id"] == first["record_id"]
+    record = db.get(ANALYSIS_MODELS["logistics"], first["record_id"])
+    assert records_of(db, record.content_hash) == 1
+
+
+def test_another_language_is_another_analysis(client):
+    data = csv_bytes("logistics", seed=51)
+
+    english = upload(client, "logistics", data, language="en").json()
+    hindi = upload(client, "logistics", data, language="hi").json()
+
+    assert hindi["record_id"] != english["record_id"]
+
+
+def test_a_failed_explanation_gets_another_try(client, monkeypatch):
+    import app.main as main
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("LLM down")
+
+    data = csv_bytes("logistics", seed=52)
+    monkeypatch.setattr(main, "generate_logistics_financial_explanation", fail)
+    failed = upload(client, "logistics", data).json()
+    monkeypatch.setattr(main, "generate_logistics_financial_explanation", lambda *args, **kwargs: EXPLANATION)
+
+    assert upload(client, "logistics", data).json()["record_id"] != failed["record_id"]
+
+
+def test_new_scoring_rules_make_a_new_analysis(client, tmp_path, monkeypatch):
+    data = csv_bytes("logistics", seed=53)
+    first = upload(client, "logistics", data).json()
+
+    with open(scoring.SCORING_RULES_PATH, encoding="utf-8") as file:
+        config = json.load(file)
+    path = tmp_path / "scoring_rules.json"
+    path.write_text(json.dumps({**config, "version": config["version"] + 1}))
+    monkeypatch.setattr(scoring, "SCORING_RULES", scoring.ScoringRules(str(path)))
+
+    assert upload(client, "logistics", data).json()["record_id"] != first["record_id"]
+
+
+def test_batch_duplicates_share_one_record(client):
+    data = csv_bytes("logistics", seed=54)
+
+    first = post_batch(client, {"a.csv": data, "b.csv": data}).json()["results"]
+    again = post_batch(client, {"c.csv": data}).json()["results"]
+
+    assert first[0]["record_id"] == first[1]["record_id"] == again[0]["record_id"]
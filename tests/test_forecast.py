@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from app.services.forecast import (
+    TREND_DAMPING, MIN_HISTORY_MONTHS, cash_flow_forecasts, smoothing_forecasts, smoothing_operators,
+)
+
+
+def holt(series, alpha: float, beta: float):
+    # damped Holt, one month at a time: the one-step forecasts and the final level and trend
+    level, trend = series[1], series[1] - series[0]
+    one_step = []
+    for value in series[2:]:
+        forecast = level + TREND_DAMPING * trend
+        one_step.append(forecast)
+        new_level = alpha * value + (1 - alpha) * forecast
+        trend = beta * (new_level - level) + (1 - beta) * TREND_DAMPING * trend
+        level = new_level
+    return np.array(one_step), level, trend
+
+
+def history(revenue, expenses=None, emi: float = 1000.0, start: int = 2023 * 12):
+    months = len(revenue)
+    expenses = np.full(months, 50_000.0) if expenses is None else np.asarray(expenses, dtype="float64")
+    return list(range(start, start + months)), np.asarray(revenue, dtype="float64"), expenses, np.full(months, emi)
+
+
+def test_the_smoothing_matrices_are_holt_one_month_at_a_time():
+    series = np.random.default_rng(0).uniform(50, 150, 10)
+    alphas, betas, one_step, level, trend = smoothing_operators(len(series))
+
+    for p in range(len(alphas)):
+        expected_steps, expected_level, expected_trend = holt(series, alphas[p], betas[p])
+        assert one_step[p, 2:] @ series == pytest.approx(expected_steps)
+        assert level[p] @ series == pytest.approx(expected_level)
+        assert trend[p] @ series == pytest.approx(expected_trend)
+
+
+def test_a_steady_trend_is_carried_on():
+    forecasts, _, _ = smoothing_forecasts(np.array([100.0 + 10 * i for i in range(12)])[None], 3)
+
+    # 210 in the last month, the trend damped a little more every month ahead
+    assert forecasts[0] == pytest.approx([220.0, 230.0, 240.0], rel=0.02)
+    assert (np.diff(forecasts[0]) < 10).all()
+
+
+def test_businesses_fitted_together_get_their_own_forecasts():
+    rng = np.random.default_rng(1)
+    histories = [history(rng.uniform(80_000, 120_000, months)) for months in (6, 12, 12, 2)]
+
+    together = cash_flow_forecasts(histories)
+
+    assert together[3] is None
+    for i, one in enumerate(histories[:3]):
+        assert together[i] == cash_flow_forecasts([one])[0]
+
+
+def test_emi_coverage_counts_the_months_that_do_not_pay_the_emi():
+    (forecast,) = cash_flow_forecasts([history([60_000.0] * 12, emi=20_000.0)], horizon=3)
+
+    assert [month["net_cash_flow"] for month in forecast["months"]] == pytest.approx([10_000.0] * 3)
+    assert forecast["min_emi_coverage"] == pytest.approx(0.5)
+    assert forecast["months_below_emi"] == 3
+    assert forecast["months"][0]["period"] == "2024-01"
+
+
+def test_short_histories_and_bad_horizons():
+    assert cash_flow_forecasts([history([100.0] * (MIN_HISTORY_MONTHS - 1))]) == [None]
+    with pytest.raises(ValueError):
+        cash_flow_forecasts([history([100.0] * 12)], horizon=24)
+
+
+def test_the_forecast_endpoint_checks_the_horizon(client):
+    assert client.get("/forecast/retail", params={"horizon": 24}).status_code == 422
+    assert client.get("/forecast/retail", params={"horizon": 6}).status_code == 200
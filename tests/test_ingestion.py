@@ -0,0 +1,252 @@
+import gc
+import gzip
+import io
+import os
+import pandas as pd
+import pytest
+import zstandard
+from app.services import analysis, ingestion
+from app.services.ingestion import PARSE_PLANS, UPLOAD_LIMITS, FinancialUpload, UploadTooLarge, parse_small_csv, read_csv
+from app.services.pipeline import analyze_upload
+from app.services.templates import TEMPLATE_MAP, REQUIRED_COLUMNS
+from app.services.validation import UploadValidationError
+from benchmarks.synthetic import synthetic_frame
+from conftest import csv_bytes, upload
+
+
+INDUSTRIES = sorted(TEMPLATE_MAP)
+
+WHOLE_FRAME_ANALYSES = {
+    "agriculture": analysis.analyze_agricultural_financials,
+    "ecommerce": analysis.analyze_ecommerce_financials,
+    "logistics": analysis.analyze_logistics_financials,
+    "manufacturing": analysis.analyze_manufacturing_financials,
+    "retail": analysis.analyze_retail_financials,
+}
+
+
+def analyze(data: bytes, industry: str, filename: str = "upload.csv", **options):
+    return analyze_upload(FinancialUpload(io.BytesIO(data), filename, industry, **options), industry)
+
+
+def xlsx_bytes(frame):
+    file = io.BytesIO()
+    frame.to_excel(file, index=False, engine="openpyxl")
+    return file.getvalue()
+
+
+def arrow_bytes(frame, filename: str):
+    file = io.BytesIO()
+    if filename.endswith(".parquet"):
+        frame.to_parquet(file, index=False, row_group_size=8)
+    else:
+        frame.to_feather(file, chunksize=8)
+    return file.getvalue()
+
+
+def assert_same_analysis(result, expected):
+    assert result["metrics"] == pytest.approx(expected["metrics"], rel=1e-9)
+    for key in ("year", "rows", "content_hash", "health_score", "credit_risk"):
+        assert result[key] == expected[key]
+
+
+@pytest.mark.parametrize("industry", INDUSTRIES)
+def test_streamed_analysis_matches_the_whole_file(industry):
+    data = csv_bytes(industry, rows=50, seed=1)
+
+    whole = analyze(data, industry, stream=False)
+    streamed = analyze(data, industry, stream=True, chunksize=7)
+
+    assert_same_analysis(streamed, whole)
+    assert streamed["metrics"] == pytest.approx(WHOLE_FRAME_ANALYSES[industry](pd.read_csv(io.BytesIO(data))), rel=1e-9)
+
+
+def test_streaming_reads_at_most_a_chunk_at_a_time():
+    upload = FinancialUpload(io.BytesIO(csv_bytes("retail", rows=50)), "upload.csv", "retail", stream=True, chunksize=7)
+
+    assert [len(chunk) for chunk in upload.chunks()] == [7] * 7 + [1]
+
+
+def test_only_plan_columns_are_read_with_their_dtypes():
+    frame = synthetic_frame("retail", 20).assign(notes="free text", extra_amount=1.5)
+    upload = FinancialUpload(io.BytesIO(csv_bytes("retail", frame=frame)), "upload.csv", "retail", stream=False)
+
+    assert set(upload.columns) == REQUIRED_COLUMNS["retail"]
+    dtypes = upload.frame().dtypes
+    for col in upload.columns:
+        assert str(dtypes[col]) == PARSE_PLANS["retail"]["dtype"][col]
+
+
+def test_extra_and_reordered_columns_do_not_change_the_analysis():
+    frame = synthetic_frame("retail", 20)
+    wide = frame.assign(notes="free text")[["notes", *reversed(frame.columns)]]
+
+    assert_same_analysis(analyze(csv_bytes("retail", frame=wide), "retail"), analyze(csv_bytes("retail", frame=frame), "retail"))
+
+
+def test_a_missing_required_column_is_rejected():
+    data = csv_bytes("retail", frame=synthetic_frame("retail", 20).drop(columns="total_revenue"))
+
+    with pytest.raises(ValueError, match="total_revenue"):
+        analyze(data, "retail")
+
+
+@pytest.mark.parametrize("industry", INDUSTRIES)
+def test_csv_engines_read_the_same_frame(industry):
+    data = csv_bytes(industry, rows=50, seed=2)
+    plan = PARSE_PLANS[industry]
+    columns = [col for col in pd.read_csv(io.BytesIO(data), nrows=0).columns if col in plan["columns"]]
+    options = {"usecols": columns, "dtype": {col: plan["dtype"][col] for col in columns}}
+
+    # straight to pyarrow, so a failure is not hidden by the fallback
+    pyarrow_frame = pd.read_csv(io.BytesIO(data), engine="pyarrow", **options)
+    c_frame = read_csv(io.BytesIO(data), engine="c", **options)
+
+    pd.testing.assert_frame_equal(pyarrow_frame, c_frame)
+
+
+def test_a_file_pyarrow_fails_on_is_read_with_the_c_engine(monkeypatch):
+    read = pd.read_csv
+    engines = []
+
+    def read_with(source, engine, **kwargs):
+        engines.append(engine)
+        if engine == "pyarrow":
+            source.read()
+            raise ValueError("pyarrow failed")
+        return read(source, engine=engine, **kwargs)
+
+    monkeypatch.setattr(pd, "read_csv", read_with)
+    frame = read_csv(io.BytesIO(csv_bytes("retail")), engine="pyarrow")
+
+    assert engines == ["pyarrow", "c"]
+    assert len(frame) == 12
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_xlsx_uploads_match_the_csv_analysis(stream):
+    frame = synthetic_frame("agriculture", 30, seed=4)
+
+    result = analyze(xlsx_bytes(frame), "agriculture", filename="upload.xlsx", stream=stream, chunksize=7)
+
+    assert_same_analysis(result, analyze(csv_bytes("agriculture", frame=frame), "agriculture"))
+
+
+def test_xlsx_streaming_skips_unused_columns_and_blank_rows():
+    frame = synthetic_frame("retail", 10).assign(notes="free text")
+    # -1 is not in the index, so that row is blank
+    data = xlsx_bytes(frame.reindex([*range(5), -1, *range(5, 10)]))
+
+    upload = FinancialUpload(io.BytesIO(data), "upload.xlsx", "retail", stream=True, chunksize=4)
+    chunks = list(upload.chunks())
+
+    assert "notes" not in chunks[0].columns
+    assert sum(len(chunk) for chunk in chunks) == 10
+
+
+@pytest.mark.parametrize("filename", ["upload.parquet", "upload.arrow", "upload.feather"])
+@pytest.mark.parametrize("stream", [False, True])
+def test_parquet_and_arrow_uploads_match_the_csv_analysis(filename, stream):
+    frame = synthetic_frame("logistics", 30, seed=5).assign(notes="free text")
+
+    result = analyze(arrow_bytes(frame, filename), "logistics", filename=filename, stream=stream, chunksize=7)
+
+    assert_same_analysis(result, analyze(csv_bytes("logistics", frame=frame), "logistics"))
+
+
+def test_parquet_row_cap_is_checked_from_the_metadata(monkeypatch):
+    monkeypatch.setitem(UPLOAD_LIMITS, "logistics", {**UPLOAD_LIMITS["logistics"], "max_rows": 20})
+    data = arrow_bytes(synthetic_frame("logistics", 30), "upload.parquet")
+
+    with pytest.raises(UploadTooLarge):
+        FinancialUpload(io.BytesIO(data), "upload.parquet", "logistics")
+
+
+def test_the_spooled_file_is_removed_with_the_upload():
+    data = arrow_bytes(synthetic_frame("logistics", 30), "upload.parquet")
+    upload = FinancialUpload(io.BytesIO(data), "upload.parquet", "logistics")
+    path = upload.path
+
+    assert os.path.exists(path)
+    del upload
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+COMPRESSORS = {
+    "upload.csv.gz": gzip.compress,
+    "upload.csv.zst": zstandard.ZstdCompressor().compress,
+}
+
+
+@pytest.mark.parametrize("filename", sorted(COMPRESSORS))
+def test_compressed_csvs_are_streamed_and_match_the_csv_analysis(filename):
+    data = csv_bytes("ecommerce", rows=30, seed=6)
+    file = FinancialUpload(io.BytesIO(COMPRESSORS[filename](data)), filename, "ecommerce")
+
+    assert file.stream
+    assert_same_analysis(analyze_upload(file, "ecommerce"), analyze(data, "ecommerce"))
+
+
+def test_the_endpoint_accepts_compressed_csvs(client):
+    data = csv_bytes("ecommerce", rows=30, seed=7)
+
+    plain = upload(client, "ecommerce", data)
+    compressed = upload(client, "ecommerce", gzip.compress(data), filename="upload.csv.gz")
+
+    assert plain.status_code == compressed.status_code == 200
+    # the same parsed data, so the same saved analysis
+    for key in ("record_id", "total_revenue", "health_score", "credit_risk"):
+        assert compressed.json()[key] == plain.json()[key]
+
+
+def read_slowly(monkeypatch):
+    monkeypatch.setattr(ingestion, "UPLOAD_FAST_PATH_MAX_ROWS", 0)
+
+
+@pytest.mark.parametrize("industry", INDUSTRIES)
+def test_the_small_csv_fast_path_matches_pandas(industry, monkeypatch):
+    data = csv_bytes(industry, rows=24, seed=8)
+
+    fast = FinancialUpload(io.BytesIO(data), "upload.csv", industry)
+    assert fast.arrays is not None
+    fast_result = analyze_upload(fast, industry)
+
+    read_slowly(monkeypatch)
+    slow = FinancialUpload(io.BytesIO(data), "upload.csv", industry)
+    assert slow.arrays is None
+
+    assert_same_analysis(fast_result, analyze_upload(slow, industry))
+    pd.testing.assert_frame_equal(fast.frame(), slow.frame())
+
+
+def test_the_fast_path_reports_the_same_bad_cells(monkeypatch):
+    frame = synthetic_frame("retail", 24, seed=9).astype({"emi_amount": object})
+    frame.loc[2, "emi_amount"] = "NA"
+    frame.loc[5, "emi_amount"] = -1.0
+    data = csv_bytes("retail", frame=frame)
+
+    with pytest.raises(UploadValidationError) as fast:
+        analyze(data, "retail")
+    read_slowly(monkeypatch)
+    with pytest.raises(UploadValidationError) as slow:
+        analyze(data, "retail")
+
+    assert fast.value.report == slow.value.report
+
+
+@pytest.mark.parametrize("data", [
+    b"a,b\n1,2,3\n",
+    b"total_revenue,total_revenue\n1,2\n",
+    "total_revenue\n1\n".encode("utf-16"),
+])
+def test_files_the_fast_path_is_unsure_of_go_to_pandas(data):
+    assert parse_small_csv(data, PARSE_PLANS["retail"]) is None
+
+
+def test_cells_that_are_not_plain_numbers_go_to_pandas():
+    frame = synthetic_frame("retail", 12).astype({"emi_amount": object})
+    frame.loc[0, "emi_amount"] = "1,000"
+
+    assert parse_small_csv(csv_bytes("retail", frame=frame), PARSE_PLANS["retail"]) is None
+    assert parse_small_csv(csv_bytes("retail"), PARSE_PLANS["retail"]) is not None
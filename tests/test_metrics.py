@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from app.services.analysis import aggregate_financials
+from app.services.metrics import (
+    METRIC_PLANS, METRIC_REGISTRY, build_metric_plan, check_metric_names, ratio, round_metric, run_metric_plan,
+)
+from benchmarks.synthetic import synthetic_frame
+from conftest import csv_bytes, upload
+
+
+INDUSTRIES = list(METRIC_REGISTRY)
+
+
+def stacked(aggregates: list):
+    # the aggregates of several businesses as one set of arrays, as portfolio mode builds them
+    return {
+        kind: {col: np.array([one[kind][col] for one in aggregates], dtype="float64" if kind != "mode" else object) for col in aggregates[0][kind]}
+        for kind in ("sum", "mean", "mode")
+    }
+
+
+@pytest.mark.parametrize("industry", INDUSTRIES)
+def test_array_metrics_match_one_business_at_a_time(industry):
+    plan = METRIC_PLANS[industry]
+    aggregates = [aggregate_financials(synthetic_frame(industry, 30, seed=seed), plan["aggregations"]) for seed in range(150, 155)]
+
+    together = run_metric_plan(plan, stacked(aggregates))
+
+    assert list(together) == plan["names"]
+    for i, one in enumerate(aggregates):
+        alone = run_metric_plan(plan, one)
+        assert {name: np.asarray(values)[i].item() for name, values in together.items()} == alone
+
+
+def test_round_metric_rounds_ties_like_round():
+    values = [0.125, 0.135, 2.675, 1.005, -0.125, 1234.565, float("nan")]
+
+    rounded = round_metric(np.array(values))
+
+    assert rounded[:-1].tolist() == [round(value, 2) for value in values[:-1]]
+    assert np.isnan(rounded[-1])
+
+
+def test_ratio_falls_back_to_the_default_without_a_positive_denominator():
+    assert ratio(1.0, 4.0) == 0.25
+    assert ratio(1.0, 0.0) == 0
+    assert ratio(1.0, -2.0, default=7) == 7
+    assert ratio(np.array([1.0, 1.0, 1.0]), np.array([4.0, 0.0, -2.0])).tolist() == [0.25, 0.0, 0.0]
+
+
+def test_a_bad_registry_entry_fails_when_the_plan_is_built(monkeypatch):
+    entry = METRIC_REGISTRY["retail"]
+
+    monkeypatch.setitem(METRIC_REGISTRY, "retail", {**entry, "metrics": [*entry["metrics"], ("no_such_metric", 2, None)]})
+    with pytest.raises(ValueError, match="no_such_metric"):
+        build_metric_plan("retail")
+
+    aggregations = {**entry["aggregations"], "mean": [*entry["aggregations"]["mean"], entry["aggregations"]["sum"][0]]}
+    monkeypatch.setitem(METRIC_REGISTRY, "retail", {**entry, "aggregations": aggregations})
+    with pytest.raises(ValueError, match="more than once"):
+        build_metric_plan("retail")
+
+
+def test_unknown_metric_names_are_rejected():
+    check_metric_names("retail", METRIC_PLANS["retail"]["numeric"])
+    with pytest.raises(ValueError, match="no_such_metric"):
+        check_metric_names("retail", ["profit_margin", "no_such_metric"])
+
+
+def test_a_saved_analysis_is_read_back_by_response_group(client):
+    body = upload(client, "retail", csv_bytes("retail", seed=150)).json()
+
+    saved = client.get(f"/retail/analyses/{body['record_id']}").json()
+
+    for group, names in METRIC_PLANS["retail"]["groups"].items():
+        assert list(saved[group]) == names
+        assert saved[group] == pytest.approx({name: body[name] for name in names})
@@ -0,0 +1,63 @@
+import numpy as np
+from app.models.peer import PeerMetricSketch
+from app.services.peers import QuantileSketch, update_peer_sketches
+from benchmarks.synthetic import synthetic_frame
+from conftest import csv_bytes, upload
+
+
+def sketch_of(values):
+    sketch = QuantileSketch()
+    sketch.update(values)
+    return sketch
+
+
+def test_a_single_peer_ranks_an_equal_value_in_the_middle():
+    sketch = sketch_of([5.0])
+
+    assert sketch.rank(5.0) == 0.5
+    assert sketch.rank(4.0) == 0.0
+    assert sketch.rank(6.0) == 1.0
+
+
+def test_ties_get_the_midrank():
+    assert sketch_of([1.0, 2.0, 2.0, 3.0]).rank(2.0) == 0.5
+    assert sketch_of([2.0, 2.0, 2.0]).rank(2.0) == 0.5
+
+
+def test_ranks_and_quantiles_stay_close_to_exact_ones():
+    values = np.random.default_rng(0).lognormal(size=20_000)
+    sketch = sketch_of(values)
+
+    for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+        value = np.quantile(values, q)
+        assert abs(sketch.rank(value) - q) < 0.01
+        assert abs(sketch.quantile(q) - value) / value < 0.02
+
+
+def test_sketch_state_round_trips_through_json():
+    sketch = sketch_of(np.arange(1000.0))
+    again = QuantileSketch(sketch.state())
+
+    assert again.count == 1000
+    assert again.rank(500.0) == sketch.rank(500.0)
+
+
+def test_update_creates_and_adds_to_the_rows(db):
+    update_peer_sketches(db, "retail", [(2090, {"profit": 1.0}), (2090, {"profit": 3.0})])
+    update_peer_sketches(db, "retail", [(2090, {"profit": 2.0})])
+    db.commit()
+
+    row = db.query(PeerMetricSketch).filter_by(industry="retail", year=2090, metric="profit").one()
+    assert row.count == 3
+
+
+def test_an_analysis_is_not_ranked_against_itself(client):
+    frame = synthetic_frame("retail", 12, seed=3).assign(year=2091)
+
+    first = upload(client, "retail", csv_bytes("retail", frame=frame), language="en").json()
+    # another language is not a duplicate, so this is saved and ranked as a second analysis
+    second = upload(client, "retail", csv_bytes("retail", frame=frame), language="hi").json()
+
+    assert first["benchmarks"] is None
+    assert second["benchmarks"]["peers"] == 1
+    assert {rank["percentile"] for rank in second["benchmarks"]["metrics"].values()} == {50.0}
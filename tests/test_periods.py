@@ -0,0 +1,49 @@
+import io
+import pytest
+from app.services.ingestion import FinancialUpload
+from app.services.pipeline import PERIOD_KEYS, analyze_upload, analyze_upload_periods
+from benchmarks.synthetic import synthetic_frame
+from conftest import csv_bytes, upload
+
+
+def file_of(industry: str, frame, **options):
+    return FinancialUpload(io.BytesIO(csv_bytes(industry, frame=frame)), "upload.csv", industry, **options)
+
+
+@pytest.mark.parametrize("industry, period", [
+    ("retail", "year"),
+    ("retail", "month"),
+    ("agriculture", "season"),
+])
+@pytest.mark.parametrize("stream", [False, True])
+def test_each_period_matches_an_analysis_of_its_rows_alone(industry, period, stream):
+    frame = synthetic_frame(industry, 60, seed=60)
+    keys = PERIOD_KEYS[period]
+
+    results = analyze_upload_periods(file_of(industry, frame, stream=stream, chunksize=9), industry, period)
+
+    assert len(results) == len(frame.groupby(keys))
+    for result in results:
+        rows = frame[(frame["year"] == result["year"]) & (frame[keys[-1]].astype(str) == str(result[keys[-1]]))]
+        alone = analyze_upload(file_of(industry, rows.reset_index(drop=True)), industry)
+        assert result["metrics"] == pytest.approx(alone["metrics"], rel=1e-9)
+        assert result["health_score"] == alone["health_score"]
+
+
+def test_the_endpoint_saves_one_analysis_per_period(client):
+    frame = synthetic_frame("retail", 24, seed=61)
+
+    response = upload(client, "retail/periods", csv_bytes("retail", frame=frame), period="year")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["periods"] == body["analyzed"] == frame["year"].nunique()
+    assert len({r["record_id"] for r in body["results"]}) == body["periods"]
+
+
+# retail uploads have no season column
+@pytest.mark.parametrize("period", ["decade", "season"])
+def test_unknown_or_missing_periods_are_rejected(client, period):
+    response = upload(client, "retail/periods", csv_bytes("retail"), period=period)
+
+    assert response.status_code == 400
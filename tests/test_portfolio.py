@@ -0,0 +1,53 @@
+import io
+import numpy as np
+import pytest
+from app.services.ingestion import FinancialUpload
+from app.services.pipeline import analyze_portfolio, analyze_upload
+from benchmarks.synthetic import synthetic_frame
+from conftest import csv_bytes, upload
+
+
+def portfolio_frame(industry: str, rows: int, seed: int):
+    frame = synthetic_frame(industry, rows, seed=seed)
+    return frame.assign(business_id=np.random.default_rng(seed).choice([f"B{i}" for i in range(5)], rows))
+
+
+def file_of(industry: str, frame, **options):
+    return FinancialUpload(io.BytesIO(csv_bytes(industry, frame=frame)), "upload.csv", industry, **options)
+
+
+@pytest.mark.parametrize("industry", ["agriculture", "manufacturing", "retail"])
+@pytest.mark.parametrize("stream", [False, True])
+def test_each_business_matches_an_analysis_of_its_rows_alone(industry, stream):
+    frame = portfolio_frame(industry, 120, seed=100)
+
+    results = analyze_portfolio(file_of(industry, frame, stream=stream, chunksize=25), industry)
+
+    assert [r["business_id"] for r in results] == frame["business_id"].unique().tolist()
+    for result in results:
+        rows = frame[frame["business_id"] == result["business_id"]].reset_index(drop=True)
+        alone = analyze_upload(file_of(industry, rows), industry)
+        assert result["metrics"] == pytest.approx(alone["metrics"], rel=1e-9)
+        for key in ("year", "rows", "health_score", "health_status", "credit_risk"):
+            assert result[key] == alone[key]
+
+
+def test_a_business_without_revenue_gets_an_error_alone():
+    frame = portfolio_frame("retail", 60, seed=101)
+    frame.loc[frame["business_id"] == frame["business_id"][0], "total_revenue"] = 0.0
+
+    results = analyze_portfolio(file_of("retail", frame), "retail")
+
+    assert "error" in results[0]
+    assert all("error" not in r for r in results[1:])
+
+
+def test_the_endpoint_saves_one_analysis_per_business(client):
+    data = csv_bytes("retail", frame=portfolio_frame("retail", 60, seed=102))
+
+    saved = upload(client, "retail/portfolio", data).json()
+    preview = upload(client, "retail/portfolio", data, save="false").json()
+
+    assert saved["businesses"] == saved["analyzed"] == len(saved["results"])
+    assert all(r["record_id"] for r in saved["results"])
+    assert all(r["record_id"] is None for r in preview["results"])
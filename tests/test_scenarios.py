@@ -0,0 +1,80 @@
+import io
+import numpy as np
+import pytest
+from app.services.ingestion import FinancialUpload
+from app.services.pipeline import INDUSTRY_PIPELINES, analyze_upload
+from app.services.scenarios import ALL_COSTS, MAX_SCENARIOS, scenario_changes
+from benchmarks.synthetic import synthetic_frame
+from conftest import csv_bytes, upload
+
+
+PARAMETERS = ["fuel_cost", "total_revenue", ALL_COSTS]
+
+
+def analyze(frame):
+    return analyze_upload(FinancialUpload(io.BytesIO(csv_bytes("logistics", frame=frame)), "upload.csv", "logistics"), "logistics")
+
+
+def run(client, record_id: int, **request):
+    return client.post(f"/scenarios/logistics/{record_id}", json=request)
+
+
+def test_the_grid_holds_every_combination_then_the_listed_scenarios():
+    names, changes = scenario_changes({"fuel_cost": [0, 15], "total_revenue": [0, -10, -20]}, [{ALL_COSTS: 5}], PARAMETERS)
+
+    assert names == ["fuel_cost", "total_revenue", ALL_COSTS]
+    assert changes.tolist() == [
+        [0, 0, 0], [0, -10, 0], [0, -20, 0],
+        [15, 0, 0], [15, -10, 0], [15, -20, 0],
+        [0, 0, 5],
+    ]
+
+
+@pytest.mark.parametrize("grid, scenarios", [
+    ({"no_such_column": [1]}, []),
+    ({}, [{"total_revenue": -100}]),
+    ({"fuel_cost": []}, []),
+    ({}, []),
+    ({"fuel_cost": list(range(MAX_SCENARIOS + 1))}, []),
+])
+def test_bad_requests_are_rejected(grid, scenarios):
+    with pytest.raises(ValueError):
+        scenario_changes(grid, scenarios, PARAMETERS)
+
+
+def test_a_scenario_matches_an_upload_with_the_changed_columns(client):
+    frame = synthetic_frame("logistics", 24, seed=140)
+    record_id = upload(client, "logistics", csv_bytes("logistics", frame=frame)).json()["record_id"]
+
+    body = run(client, record_id, scenarios=[{}, {"fuel_cost": 15, "total_revenue": -10}, {ALL_COSTS: 10}]).json()
+
+    unchanged, fuel_and_revenue, all_costs = body["results"]
+    assert unchanged == body["baseline"]
+    assert unchanged["metrics"] == pytest.approx(analyze(frame)["metrics"], rel=1e-9)
+
+    changed = frame.assign(fuel_cost=frame["fuel_cost"] * 1.15, total_revenue=frame["total_revenue"] * 0.9)
+    expected = analyze(changed)
+    assert fuel_and_revenue["metrics"] == pytest.approx(expected["metrics"], rel=1e-6)
+    assert fuel_and_revenue["health_score"] == expected["health_score"]
+
+    costs = INDUSTRY_PIPELINES["logistics"]["cost_columns"]
+    expected = analyze(frame.assign(**{col: frame[col] * 1.1 for col in costs}))
+    assert all_costs["metrics"] == pytest.approx(expected["metrics"], rel=1e-6)
+
+
+def test_a_grid_runs_in_one_request(client):
+    record_id = upload(client, "logistics", csv_bytes("logistics", seed=141)).json()["record_id"]
+
+    body = run(client, record_id, grid={"fuel_cost": list(np.arange(0, 50, 5.0)), "total_revenue": [0, -10, -20, -30]}).json()
+
+    assert body["scenarios"] == 40
+    # less revenue never makes the margin better
+    margins = np.array([r["metrics"]["profit_margin"] for r in body["results"]]).reshape(10, 4)
+    assert (np.diff(margins, axis=1) < 0).all()
+
+
+def test_bad_scenarios_get_a_400(client):
+    record_id = upload(client, "logistics", csv_bytes("logistics", seed=142)).json()["record_id"]
+
+    assert run(client, record_id, scenarios=[{"total_revenue": -100}]).status_code == 400
+    assert run(client, 10 ** 9, scenarios=[{}]).status_code == 404
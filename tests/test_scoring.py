@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from app.services import credit
+from app.services.metrics import METRIC_PLANS
+from app.services.pipeline import INDUSTRY_PIPELINES, score_metrics, score_metrics_batch
+from app.services.scoring import health_scores, health_status, score_rules
+
+
+def rule_metrics(industry: str, size: int = 2000, seed: int = 160):
+    # every metric on, just under or just over one of its rule thresholds, so that scores
+    # land on every status and on the cutoffs themselves
+    rng = np.random.default_rng(seed)
+    metrics = {name: rng.normal(size=size) for name in METRIC_PLANS[industry]["numeric"]}
+    for metric, _, threshold, _ in score_rules(industry):
+        metrics[metric] = threshold + rng.choice([-1.0, -0.01, 0.0, 0.01, 1.0], size)
+    return metrics
+
+
+def one_by_one(industry: str, metrics: dict):
+    size = len(next(iter(metrics.values())))
+    return list(zip(*(score_metrics(industry, {name: float(values[i]) for name, values in metrics.items()}) for i in range(size))))
+
+
+@pytest.mark.parametrize("industry", list(INDUSTRY_PIPELINES))
+def test_batch_scores_match_the_scalar_functions(industry):
+    metrics = rule_metrics(industry)
+
+    scores, statuses, risks = score_metrics_batch(industry, metrics)
+
+    expected_scores, expected_statuses, expected_risks = one_by_one(industry, metrics)
+    assert scores.tolist() == list(expected_scores)
+    assert statuses.tolist() == list(expected_statuses)
+    assert risks.tolist() == list(expected_risks)
+
+
+def test_statuses_and_risks_at_the_cutoffs():
+    # one point off for every whole number above the margin, so a margin of m scores m + 1
+    rules = [("profit_margin", "<", float(k), 1) for k in range(100)]
+    metrics = {"profit_margin": np.array([99.5, 74.5, 73.5, 49.5, 48.5, -1.0])}
+
+    scores, statuses = health_scores(metrics, rules)
+
+    assert scores.tolist() == [100, 75, 74, 50, 49, 0]
+    assert statuses.tolist() == [health_status(score) for score in scores.tolist()] == ["Healthy", "Healthy", "Watch", "Watch", "Stressed", "Stressed"]
+    assert credit.credit_risks(scores).tolist() == [credit.retail_credit_risk(score) for score in scores.tolist()]
+
+
+def test_batch_risks_use_the_default_model_like_the_scalar_ones(monkeypatch):
+    # defaults driven by the debt service ratio
+    metrics = rule_metrics("retail", size=4000, seed=161)
+    metrics["debt_service_ratio"] = np.random.default_rng(161).uniform(0, 1, 4000)
+    defaults = np.random.default_rng(162).random(4000) < 1 / (1 + np.exp(-(8 * metrics["debt_service_ratio"] - 5)))
+    model = credit.compile_credit_model("retail", credit.fit_credit_model("retail", metrics, defaults))
+    monkeypatch.setitem(credit.CREDIT_MODELS, "retail", model)
+    metrics = {name: values[:500] for name, values in metrics.items()}
+
+    _, _, risks = score_metrics_batch("retail", metrics)
+
+    assert risks.tolist() == list(one_by_one("retail", metrics)[2])
+    assert set(risks.tolist()) == {"Low", "Medium", "High"}
@@ -0,0 +1,131 @@
+import json
+import logging
+import os
+import pytest
+from app.services import persistence, scoring
+from app.services.metrics import METRIC_PLANS
+from app.services.persistence import ANALYSIS_MODELS, rescore_financial_analyses
+from app.services.pipeline import score_metrics
+from conftest import csv_bytes, upload
+
+ENDPOINTS = {"agriculture": "agricultural", "manufacturing": "manufacturing", "retail": "retail", "logistics": "logistics", "ecommerce": "ecommerce"}
+
+
+def default_rules():
+    with open(scoring.SCORING_RULES_PATH, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def write_rules(path, config):
+    # a new modification time on every write, however fast the writes are
+    mtime = os.stat(path).st_mtime_ns if path.exists() else 0
+    path.write_text(json.dumps(config) if isinstance(config, dict) else config)
+    os.utime(path, ns=(mtime + 10 ** 9, mtime + 10 ** 9))
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "scoring_rules.json"
+    write_rules(path, default_rules())
+    return path
+
+
+def raised(config, version=2, threshold=50):
+    config = json.loads(json.dumps(config))
+    config["version"] = version
+    config["industries"]["retail"][0]["threshold"] = threshold
+    return config
+
+
+def test_a_new_version_is_loaded_without_a_restart(rules_file):
+    rules = scoring.ScoringRules(str(rules_file), check_seconds=0)
+
+    write_rules(rules_file, raised(default_rules()))
+
+    assert rules.current()["version"] == 2
+    assert rules.current()["industries"]["retail"][0][2] == 50
+
+
+@pytest.mark.parametrize("edit", [
+    "{not json",
+    raised(default_rules(), version=1),
+    raised(default_rules(), version=0),
+    {**default_rules(), "industries": {"retail": []}},
+])
+def test_a_bad_edit_keeps_the_loaded_rules(rules_file, edit):
+    rules = scoring.ScoringRules(str(rules_file), check_seconds=0)
+    loaded = rules.current()
+
+    write_rules(rules_file, edit)
+
+    assert rules.current() == loaded
+    assert rules.error
+
+
+def test_a_version_never_goes_down(rules_file):
+    rules = scoring.ScoringRules(str(rules_file), check_seconds=0)
+    write_rules(rules_file, raised(default_rules(), version=3))
+    rules.current()
+
+    write_rules(rules_file, raised(default_rules(), version=2))
+
+    assert rules.current()["version"] == 3
+    assert "older" in rules.error
+
+
+def test_a_bad_file_is_logged_once_until_it_changes(rules_file, caplog):
+    rules = scoring.ScoringRules(str(rules_file), check_seconds=0)
+    write_rules(rules_file, "{not json")
+
+    with caplog.at_level(logging.WARNING, logger="app.services.scoring"):
+        for _ in range(5):
+            rules.current()
+        write_rules(rules_file, "{still not json")
+        rules.current()
+
+    assert len(caplog.records) == 2
+
+    write_rules(rules_file, raised(default_rules()))
+    assert rules.current()["version"] == 2 and rules.error is None
+
+
+def test_rules_reject_unknown_metrics_and_comparisons():
+    config = default_rules()
+    config["industries"]["retail"][0]["metric"] = "no_such_metric"
+    with pytest.raises(ValueError):
+        scoring.compile_rules(config)
+
+    config = default_rules()
+    config["industries"]["retail"][0]["comparison"] = "!="
+    with pytest.raises(ValueError):
+        scoring.compile_rules(config)
+
+
+def test_sql_rescore_matches_python_scoring(client, db, rules_file, monkeypatch):
+    for industry, endpoint in ENDPOINTS.items():
+        for seed in range(8):
+            assert upload(client, endpoint, csv_bytes(industry, rows=3, seed=seed)).status_code == 200
+
+    # every rule of every industry made easier to break
+    config = default_rules()
+    config["version"] = 99
+    for rules in config["industries"].values():
+        for rule in rules:
+            rule["threshold"] = rule["threshold"] * (1.5 if rule["comparison"] in ("<", "<=") else 0.5)
+    write_rules(rules_file, config)
+    rules = scoring.ScoringRules(str(rules_file), check_seconds=0)
+    monkeypatch.setattr(scoring, "SCORING_RULES", rules)
+    monkeypatch.setattr(persistence, "SCORING_RULES", rules)
+
+    assert all(rows > 0 for rows in rescore_financial_analyses(db).values())
+    assert all(rows == 0 for rows in rescore_financial_analyses(db).values())
+
+    db.expire_all()
+    for industry, model in ANALYSIS_MODELS.items():
+        for record in db.query(model).all():
+            metrics = {name: getattr(record, name) for name in METRIC_PLANS[industry]["names"]}
+            if industry == "agriculture":
+                # stored as text
+                metrics["storage_risk_score"] = float(metrics["storage_risk_score"])
+            assert record.rules_version == 99
+            assert (record.health_score, record.health_status, record.credit_risk) == score_metrics(industry, metrics)
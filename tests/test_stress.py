@@ -0,0 +1,44 @@
+import numpy as np
+from app.services.stress import _spread
+from conftest import csv_bytes, upload
+
+
+def saved_retail_analysis(client):
+    response = upload(client, "retail", csv_bytes("retail"))
+    assert response.status_code == 200
+    return response.json()["record_id"]
+
+
+def test_revenue_shock_of_minus_100_is_rejected(client):
+    record_id = saved_retail_analysis(client)
+
+    response = client.get(f"/stress/retail/{record_id}", params={"revenue_shock": -100, "simulations": 500, "seed": 1})
+
+    assert response.status_code == 422
+
+
+def test_revenue_shock_next_to_the_bound_returns_finite_spreads(client):
+    record_id = saved_retail_analysis(client)
+
+    response = client.get(f"/stress/retail/{record_id}", params={"revenue_shock": -99.99, "simulations": 500, "seed": 1})
+
+    assert response.status_code == 200
+    result = response.json()
+    for name in ("health_score", "debt_service_ratio", "profit_margin", "revenue_change_percentage"):
+        assert all(value is None or np.isfinite(value) for value in result[name].values())
+
+
+def test_stress_is_reproducible_with_a_seed(client):
+    record_id = saved_retail_analysis(client)
+    params = {"simulations": 500, "seed": 7}
+
+    first = client.get(f"/stress/retail/{record_id}", params=params).json()
+    second = client.get(f"/stress/retail/{record_id}", params=params).json()
+
+    assert first == second
+    assert 0 <= first["probability_any_downgrade"] <= 1
+
+
+def test_spread_leaves_out_non_finite_paths():
+    assert _spread([1.0, np.inf, 3.0, np.nan])["mean"] == 2.0
+    assert _spread([np.inf, np.nan]) == {"mean": None, "p5": None, "p50": None, "p95": None}
@@ -0,0 +1,59 @@
+import io
+import pytest
+from app.services.ingestion import FinancialUpload
+from app.services.pipeline import analyze_upload
+from app.services.trends import MONTH_NAMES, month_number
+from benchmarks.synthetic import synthetic_frame
+from conftest import csv_bytes
+
+
+def monthly_frame(revenue: list, seed: int = 130):
+    # two rows per month from January 2023, sharing that month's revenue
+    months = len(revenue)
+    frame = synthetic_frame("retail", 2 * months, seed=seed)
+    frame["year"] = [2023 + (i // 2) // 12 for i in range(2 * months)]
+    frame["month"] = [MONTH_NAMES[(i // 2) % 12] for i in range(2 * months)]
+    frame["total_revenue"] = [revenue[i // 2] / 2 for i in range(2 * months)]
+    return frame
+
+
+def trends_of(frame, **options):
+    upload = FinancialUpload(io.BytesIO(csv_bytes("retail", frame=frame)), "upload.csv", "retail", **options)
+    return analyze_upload(upload, "retail")["trends"]
+
+
+@pytest.mark.parametrize("label, number", [("Jan", 1), ("january", 1), ("SEPT", 9), ("9", 9), ("09", 9), (12.0, 12), ("Smarch", 0)])
+def test_month_labels(label, number):
+    assert month_number(label) == number
+
+
+def test_monthly_series_and_growth():
+    revenue = [100_000, 200_000, 100_000, 150_000]
+    trends = trends_of(monthly_frame(revenue))
+
+    assert [month["period"] for month in trends["months"]] == ["2023-01", "2023-02", "2023-03", "2023-04"]
+    assert [month["total_revenue"] for month in trends["months"]] == revenue
+    assert [month["revenue_growth_percentage"] for month in trends["months"]] == [None, 100.0, -50.0, 50.0]
+    assert trends["average_revenue_growth_percentage"] == pytest.approx(100 / 3, abs=0.01)
+
+
+def test_seasonality_over_two_years():
+    # every July is twice the other months
+    revenue = [200_000 if i % 12 == 6 else 100_000 for i in range(24)]
+    trends = trends_of(monthly_frame(revenue))
+
+    assert trends["peak_month"] == "Jul"
+    assert trends["months"][6]["seasonality_index"] == pytest.approx(2 * 12 / 13, abs=0.01)
+
+
+def test_streamed_trends_match_the_whole_file():
+    frame = monthly_frame([100_000 + 5_000 * i for i in range(18)]).sample(frac=1, random_state=0)
+
+    assert trends_of(frame, stream=True, chunksize=5) == trends_of(frame)
+
+
+def test_uploads_with_unknown_months_get_no_trends():
+    frame = monthly_frame([100_000] * 6)
+    frame.loc[3, "month"] = "Q1"
+
+    assert trends_of(frame) is None
@@ -0,0 +1,82 @@
+import io
+import pytest
+from app.services.ingestion import UPLOAD_LIMITS, FinancialUpload, UploadTooLarge
+from conftest import csv_bytes, upload
+
+
+BOUNDARY = "upload-boundary"
+
+
+def multipart_body(data: bytes, filename: str = "upload.csv"):
+    return (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+    ).encode() + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def post_chunked(client, endpoint: str, body: bytes, size: int = 16 * 1024):
+    # a generator body is sent with Transfer-Encoding: chunked and no Content-Length
+    chunks = (body[i:i + size] for i in range(0, len(body), size))
+    return client.post(
+        f"/analyze/{endpoint}",
+        content=chunks,
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+
+
+@pytest.fixture
+def retail_limits(monkeypatch):
+    def set_limits(**limits):
+        monkeypatch.setitem(UPLOAD_LIMITS, "retail", {**UPLOAD_LIMITS["retail"], **limits})
+    return set_limits
+
+
+def test_a_body_over_the_byte_cap_is_rejected_from_its_content_length(client, retail_limits):
+    retail_limits(max_bytes=1000)
+
+    response = upload(client, "retail", csv_bytes("retail", rows=2000))
+
+    assert response.status_code == 413
+    # the middleware's answer, before the body was spooled
+    assert response.json()["detail"].startswith("Upload is larger than")
+
+
+def test_a_chunked_body_is_rejected_once_it_passes_the_byte_cap(client, retail_limits):
+    retail_limits(max_bytes=1000)
+
+    response = post_chunked(client, "retail", multipart_body(csv_bytes("retail", rows=2000)))
+
+    assert response.status_code == 413
+    assert response.json()["detail"].startswith("Upload is larger than")
+
+
+def test_a_chunked_body_under_the_byte_cap_is_analyzed(client):
+    response = post_chunked(client, "retail", multipart_body(csv_bytes("retail", seed=20)))
+
+    assert response.status_code == 200
+
+
+def test_the_file_byte_cap_is_checked_before_parsing(retail_limits):
+    retail_limits(max_bytes=1000)
+
+    with pytest.raises(UploadTooLarge):
+        FinancialUpload(io.BytesIO(csv_bytes("retail", rows=100)), "upload.csv", "retail")
+
+
+def test_a_streamed_upload_stops_at_the_chunk_over_the_row_cap(retail_limits):
+    retail_limits(max_rows=25)
+    file = FinancialUpload(io.BytesIO(csv_bytes("retail", rows=100)), "upload.csv", "retail", stream=True, chunksize=10)
+
+    chunks = file.chunks()
+    assert [len(next(chunks)) for _ in range(2)] == [10, 10]
+    with pytest.raises(UploadTooLarge):
+        next(chunks)
+
+
+@pytest.mark.parametrize("stream", ["false", "true"])
+def test_an_upload_over_the_row_cap_is_rejected(client, retail_limits, stream):
+    retail_limits(max_rows=25)
+
+    response = upload(client, "retail", csv_bytes("retail", rows=100), stream=stream)
+
+    assert response.status_code == 413
@@ -0,0 +1,148 @@
+import gzip
+import io
+import pytest
+from openpyxl import Workbook
+from app.services.ingestion import FinancialUpload
+from app.services.validation import MAX_ROWS_PER_ERROR, UploadValidationError
+from benchmarks.synthetic import synthetic_frame
+from conftest import upload
+
+
+def retail_frame(bad=(2, 4)):
+    # five rows, total_revenue below 0 in the rows at the bad positions
+    frame = synthetic_frame("retail", 5, seed=1)
+    frame.loc[list(bad), "total_revenue"] = -5.0
+    return frame
+
+
+def retail_lines(bad=(2, 4)):
+    return retail_frame(bad).to_csv(index=False).splitlines()
+
+
+def with_blank_rows(lines):
+    # file rows: 1 header, 2 row 0, 3 blank, 4 row 1, 5 empty cells, 6 row 2, 7 row 3, 8 blank, 9 row 4
+    empty = "," * (lines[0].count(","))
+    return "\n".join([lines[0], lines[1], "", lines[2], empty, lines[3], lines[4], "", lines[5]]) + "\n"
+
+
+def failed_rows(response):
+    assert response.status_code == 422
+    (error,) = response.json()["errors"]
+    assert (error["column"], error["check"]) == ("total_revenue", "min")
+    return error["rows"]
+
+
+@pytest.mark.parametrize("stream", ["false", "true"])
+def test_blank_rows_count_in_the_reported_row_numbers(client, stream):
+    data = with_blank_rows(retail_lines()).encode()
+
+    assert failed_rows(upload(client, "retail", data, stream=stream)) == [6, 9]
+
+
+def test_blank_lines_above_the_header_count_too(client):
+    data = ("\n\n" + with_blank_rows(retail_lines())).encode()
+
+    assert failed_rows(upload(client, "retail", data)) == [8, 11]
+    assert failed_rows(upload(client, "retail", data, stream="true")) == [8, 11]
+
+
+def test_compressed_uploads_report_the_same_rows(client):
+    data = gzip.compress(with_blank_rows(retail_lines()).encode())
+
+    assert failed_rows(upload(client, "retail", data, filename="upload.csv.gz")) == [6, 9]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_xlsx_blank_rows_count_in_the_reported_row_numbers(stream):
+    workbook = Workbook()
+    sheet = workbook.active
+    frame = retail_frame()
+    rows = frame.values.tolist()
+    for row in [list(frame.columns), rows[0], [], rows[1], [None] * len(frame.columns), rows[2], rows[3], [], rows[4]]:
+        sheet.append(row)
+    file = io.BytesIO()
+    workbook.save(file)
+
+    upload = FinancialUpload(file, "upload.xlsx", "retail", stream=stream, chunksize=2)
+    with pytest.raises(UploadValidationError) as raised:
+        list(upload.checked_chunks())
+    assert raised.value.report[0]["rows"] == [6, 9]
+
+
+def test_row_numbers_carry_across_chunks():
+    file = io.BytesIO(with_blank_rows(retail_lines(bad=(0, 1, 2, 3, 4))).encode())
+
+    upload = FinancialUpload(file, "upload.csv", "retail", stream=True, chunksize=2)
+    with pytest.raises(UploadValidationError) as raised:
+        list(upload.checked_chunks())
+    assert raised.value.report[0]["rows"] == [2, 4, 6, 7, 9]
+
+
+def test_rows_of_empty_cells_are_skipped_like_blank_lines(client):
+    data = with_blank_rows(retail_lines(bad=())).encode()
+
+    fast = upload(client, "retail", data)
+    streamed = upload(client, "retail", data, stream="true")
+
+    assert fast.status_code == streamed.status_code == 200
+
+
+def test_batch_results_carry_the_validation_report(client):
+    bad = with_blank_rows(retail_lines()).encode()
+    good = with_blank_rows(retail_lines(bad=())).encode()
+
+    response = client.post("/analyze/retail/batch", files=[
+        ("files", ("bad.csv", io.BytesIO(bad))),
+        ("files", ("good.csv", io.BytesIO(good))),
+    ])
+
+    assert response.status_code == 200
+    results = {r["filename"]: r for r in response.json()["results"]}
+    assert results["bad.csv"]["error"] == "Uploaded file failed validation"
+    assert results["bad.csv"]["errors"] == upload(client, "retail", bad).json()["errors"]
+    assert "errors" not in results["good.csv"]
+
+
+def test_every_failed_check_is_reported_with_its_row_count(client):
+    frame = synthetic_frame("retail", 30, seed=2).astype({"quantity_sold": object, "year": float})
+    frame.loc[0:24, "total_revenue"] = -1.0
+    frame.loc[3, "discount_percentage"] = 150
+    frame.loc[4, "year"] = 2023.5
+    frame.loc[5, "store_type"] = None
+    frame.loc[6, "quantity_sold"] = "many"
+
+    response = upload(client, "retail", frame.to_csv(index=False).encode())
+
+    assert response.status_code == 422
+    errors = {(error["column"], error["check"]): error for error in response.json()["errors"]}
+    assert set(errors) == {
+        ("total_revenue", "min"),
+        ("discount_percentage", "max"),
+        ("year", "integer"),
+        ("store_type", "null"),
+        ("quantity_sold", "type"),
+    }
+    # every row is counted, only the first rows are listed
+    assert errors[("total_revenue", "min")]["count"] == 25
+    assert errors[("total_revenue", "min")]["rows"] == list(range(2, 2 + MAX_ROWS_PER_ERROR))
+    assert errors[("quantity_sold", "type")]["rows"] == [8]
+
+
+@pytest.mark.parametrize("stream", ["false", "true"])
+def test_text_in_a_number_column_is_reported_when_streaming_too(client, stream):
+    frame = synthetic_frame("retail", 30, seed=3).astype({"emi_amount": object})
+    frame.loc[[2, 20], "emi_amount"] = "n/a yet"
+
+    response = upload(client, "retail", frame.to_csv(index=False).encode(), stream=stream)
+
+    (error,) = response.json()["errors"]
+    assert (error["column"], error["check"], error["rows"]) == ("emi_amount", "type", [4, 22])
+
+
+def test_revenue_that_adds_up_to_zero_is_rejected(client):
+    frame = synthetic_frame("retail", 12, seed=4).assign(total_revenue=0.0)
+
+    response = upload(client, "retail", frame.to_csv(index=False).encode())
+
+    assert response.status_code == 422
+    assert response.json()["errors"][0]["check"] == "total"
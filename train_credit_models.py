@@ -0,0 +1,66 @@
+import os
+import json
+import argparse
+import pandas as pd
+from sqlalchemy import select
+from app.database.db import SessionLocal
+from app.services.metrics import METRIC_PLANS
+from app.services.credit import CREDIT_MODELS_PATH, fit_credit_model
+from app.services.pipeline import resolve_industry
+from app.services.persistence import ANALYSIS_MODELS
+
+
+"""
+This file is used to train the probability of default models of credit.py on the metrics of
+stored analyses, with the known outcome of each business:
+
+    python train_credit_models.py <labels.csv> [--output app/services/credit_models.json]
+
+labels.csv has one row per analysis with a known outcome: industry, analysis_id and defaulted
+(1 when the business defaulted, 0 when it repaid). Every industry in the file gets a new model;
+the models of the other industries are kept. The app loads the models when it starts, and
+`python rescore.py` applies them to the saved analyses.
+"""
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("labels")
+parser.add_argument("--output", default=CREDIT_MODELS_PATH)
+args = parser.parse_args()
+
+labels = pd.read_csv(args.labels)
+missing = {"industry", "analysis_id", "defaulted"} - set(labels.columns)
+if missing:
+    raise SystemExit(f"Missing label columns: {missing}")
+
+models = {}
+if os.path.exists(args.output):
+    with open(args.output, encoding="utf-8") as file:
+        models = json.load(file)
+
+db = SessionLocal()
+try:
+    for name, group in labels.groupby("industry"):
+        industry = resolve_industry(str(name))
+        model = ANALYSIS_MODELS[industry]
+        features = METRIC_PLANS[industry]["numeric"]
+
+        rows = db.execute(
+            select(model.id, *[getattr(model, feature) for feature in features])
+            .where(model.id.in_(group["analysis_id"].astype(int).tolist()))
+        ).all()
+        frame = pd.DataFrame(rows, columns=["analysis_id", *features]).merge(group, on="analysis_id")
+
+        models[industry] = fit_credit_model(
+            industry,
+            {feature: frame[feature].to_numpy("float64") for feature in features},
+            frame["defaulted"].to_numpy("float64"),
+            features,
+        )
+        print(f"{industry}: trained on {models[industry]['trained_on']} analyses, default rate {models[industry]['default_rate']}")
+finally:
+    db.close()
+
+with open(args.output, "w", encoding="utf-8") as file:
+    json.dump(models, file, indent=2)
+print(f"Saved {args.output}")